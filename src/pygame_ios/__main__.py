@@ -1,12 +1,49 @@
+import contextlib
 import io
 import json
 import os
+import re
 import shutil
 import sys
-import zipfile
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 import requests
 
+from pygame_ios.assetpack import PACK_NAME, is_asset, write_pack
+from pygame_ios.atlas import DEFAULT_MAX_SIZE, DEFAULT_PADDING, find_images, pack_atlas
+from pygame_ios.audio import (
+    BANK_SUFFIX,
+    DEFAULT_CHANNELS,
+    DEFAULT_FREQUENCY,
+    DEFAULT_MAX_LENGTH,
+    DEFAULT_SIZE,
+    describe_format,
+    find_sounds,
+    pack_sounds,
+)
+from pygame_ios.batch import REPORT_VERSION, BatchError, BatchJob, load_batch
+from pygame_ios.cache import TemplateCache
+from pygame_ios.extract import extract_template, is_extracted_from, load_stamp
+from pygame_ios.ignore import IgnoreRules
+from pygame_ios.install import InstallError, install_packages, read_requirements
+from pygame_ios.mapfile import MAP_SUFFIX, compile_map, load_map
+from pygame_ios.network import RETRIES, get_session, retry_delay
+from pygame_ios.prune import load_keep_rules, prune_files
+from pygame_ios.precompile import TEMPLATE_PYTHON_VERSION, bytecode_path, find_python, precompile_tree
+from pygame_ios.sync import (
+    MANIFEST_NAME,
+    SyncStats,
+    collect_project_files,
+    compiled_sources,
+    format_size,
+    record_bytecode,
+    size_report,
+    sync_files,
+)
+from pygame_ios.watch import DEFAULT_INTERVAL, watch_project
+
 BASE_API_PATH = "https://api.github.com/repos/seekerluke/pygame-ios-templates/releases/"
 BASE_DOWNLOAD_PATH = (
     "https://github.com/seekerluke/pygame-ios-templates/releases/download/"
@@ -15,101 +52,976 @@ FOLDER_NAME = "pygame-ios-template"
 
 VERSIONS_JSON_PATH = "https://raw.githubusercontent.com/seekerluke/pygame-ios-templates/refs/heads/main/patches/pygame-ce.json"
 
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# what a failed release metadata request can raise, including a response without the expected JSON
+METADATA_ERRORS = (requests.exceptions.RequestException, KeyError, ValueError)
+METADATA_NAMES = {"latest": "latest release", "supported": "supported versions"}
+
+# Point this at another server (for example a local stand-in for testing) to replace the GitHub URLs above
+# It must serve releases/latest, releases/download/<tag>/<zip> and pygame-ce.json
+BASE_URL_ENV = "PYGAME_IOS_BASE_URL"
+
+
+def get_api_path() -> str:
+    base_url = os.environ.get(BASE_URL_ENV)
+    return f"{base_url.rstrip('/')}/releases/" if base_url else BASE_API_PATH
+
+
+def get_download_path() -> str:
+    base_url = os.environ.get(BASE_URL_ENV)
+    return f"{base_url.rstrip('/')}/releases/download/" if base_url else BASE_DOWNLOAD_PATH
+
+
+def get_versions_json_path() -> str:
+    base_url = os.environ.get(BASE_URL_ENV)
+    return f"{base_url.rstrip('/')}/pygame-ce.json" if base_url else VERSIONS_JSON_PATH
+
+
+# Removes a flag like --offline from sys.argv, so positional arguments keep their indices
+def pop_flag(name: str) -> bool:
+    if name in sys.argv:
+        sys.argv.remove(name)
+        return True
+    return False
+
+
+# Removes an option and its value like --jobs 4 from sys.argv, returning the value
+def pop_option(name: str, default: str | None = None) -> str | None:
+    if name not in sys.argv:
+        return default
+    index = sys.argv.index(name)
+    if index + 1 >= len(sys.argv):
+        print(f"Missing value for {name}.")
+        sys.exit(1)
+    value = sys.argv[index + 1]
+    del sys.argv[index : index + 2]
+    return value
+
 
 def check_args():
     result = len(sys.argv) >= 4
     if not result:
         print(
-            "Usage: pygame-ios project_folder main_python_script pygame_ce_version [local_template_path]"
+            "Usage: pygame-ios project_folder main_python_script pygame_ce_version [local_template_path] [--offline] [--update-template] [--jobs N] [--precompile [--optimize N] [--strip-sources]] [--watch [--watch-interval SECONDS]] [--prune] [--pack-assets]"
         )
     return result
 
 
-def get_supported_pygame_versions() -> list[str]:
+# Both requests send the cached ETag, so unchanged metadata only costs a 304 response
+# They return None for a 304, or the new value and its ETag
+def request_latest_release(etag: str | None) -> tuple[str, str | None] | None:
+    headers = {"If-None-Match": etag} if etag else {}
+    response = get_session().get(os.path.join(get_api_path(), "latest"), headers=headers)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    return json.loads(response.content)["tag_name"], response.headers.get("ETag")
+
+
+def request_supported_versions(etag: str | None) -> tuple[list[str], str | None] | None:
+    headers = {"If-None-Match": etag} if etag else {}
+    response = get_session().get(get_versions_json_path(), headers=headers)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    return json.loads(response.content)["supportedVersions"], response.headers.get("ETag")
+
+
+# Returns the latest release tag and the supported pygame-ce versions
+# Cached values are used until they're older than the metadata TTL, then both are requested at once
+# When a request fails, the cached value is used however old it is. The supported versions are None
+# if they have never been fetched, the latest release raises the request's exception instead
+def get_release_metadata(cache: TemplateCache, refresh: bool = False) -> tuple[str, list[str] | None]:
+    entries = {"latest": cache.latest_release, "supported": cache.supported_versions}
+    requests_by_name = {"latest": request_latest_release, "supported": request_supported_versions}
+    stale = [name for name, entry in entries.items() if refresh or not cache.is_fresh(entry)]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = {
+            name: pool.submit(requests_by_name[name], entries[name]["etag"] if entries[name] else None)
+            for name in stale
+        }
+
+    # the cache is only written here, on the calling thread
+    setters = {"latest": cache.set_latest_release, "supported": cache.set_supported_versions}
+    for name, future in futures.items():
+        entry = entries[name]
+        try:
+            result = future.result()
+        except METADATA_ERRORS as e:
+            if entry is None and name == "latest":
+                raise
+            if entry is not None:
+                print(f"Could not update the cached {METADATA_NAMES[name]}: {e}")
+            continue
+        if result is None:
+            # unchanged, only the time it was checked moves
+            result = (entry["tag"] if name == "latest" else entry["versions"], entry["etag"])
+        setters[name](*result)
+
+    supported = cache.supported_versions
+    return cache.latest_release["tag"], supported["versions"] if supported else None
+
+
+def is_supported_version(pygame_version: str, supported: list[str]) -> bool:
+    return pygame_version.removeprefix("v") in {version.removeprefix("v") for version in supported}
+
+
+def print_supported_versions(supported: list[str] | None):
+    print("Supported versions:")
+    for version in supported or ["Failed to fetch supported versions."]:
+        print(version)
+
+
+# total is None, or not positive, when the server didn't send the size
+def print_progress(done: int, total: int | None, start_time: float, end: str = ""):
+    elapsed = max(time.perf_counter() - start_time, 1e-6)
+    speed = done / elapsed / (1024 * 1024)
+    if total is not None and total > 0:
+        line = f"{done / (1024 * 1024):.1f}/{total / (1024 * 1024):.1f} MB ({done * 100 // total}%), {speed:.1f} MB/s"
+    else:
+        line = f"{done / (1024 * 1024):.1f} MB, {speed:.1f} MB/s"
+    print(f"\r{line}", end=end, flush=True)
+
+
+# Returns what If-Range can compare to tell if the remote file changed, a strong ETag or the Last-Modified date
+def range_validator(headers) -> str | None:
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+CONTENT_RANGE_PATTERN = re.compile(r"bytes (\d+)-\d+/(?:\d+|\*)")
+
+
+# Returns where the part of the file in a 206 response starts, or None if the Content-Range can't be read
+def content_range_start(headers) -> int | None:
+    match = CONTENT_RANGE_PATTERN.fullmatch(headers.get("Content-Range", "").strip())
+    return int(match.group(1)) if match else None
+
+
+# Streams a download to disk in chunks, so memory use stays flat regardless of the file size
+# An interrupted download leaves a .part file behind, which is resumed with a Range request,
+# right away if the connection dropped in the middle of the download, or the next time otherwise
+# The ETag or Last-Modified date of the download is kept next to it and sent as If-Range, so the
+# server sends the whole file instead if it changed since
+def download_file(url: str, dest_path: str, attempt: int = 0):
     try:
-        response = requests.get(VERSIONS_JSON_PATH)
+        _download_file(url, dest_path)
+    except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+        if attempt >= RETRIES:
+            raise
+        print(f"\nDownload interrupted ({e}), retrying.")
+        time.sleep(retry_delay(attempt))
+        download_file(url, dest_path, attempt + 1)
+
+
+def _download_file(url: str, dest_path: str):
+    part_path = f"{dest_path}.part"
+    validator_path = f"{part_path}.validator"
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+    resumed = 0
+    headers = {}
+    try:
+        with open(validator_path) as f:
+            validator = f.read().strip()
+        resumed = os.path.getsize(part_path)
+    except OSError:
+        # without a validator there is no telling if the partial file is still part of the remote file
+        validator = None
+    if resumed and validator:
+        headers = {"Range": f"bytes={resumed}-", "If-Range": validator}
+
+    with get_session().get(url, headers=headers, stream=True) as response:
+        if response.status_code == 416:
+            # the partial file doesn't fit the remote file anymore, start over
+            os.remove(part_path)
+            os.remove(validator_path)
+            return _download_file(url, dest_path)
         response.raise_for_status()
-        json_data = json.loads(response.content)
-        return json_data["supportedVersions"]
-    except requests.exceptions.HTTPError:
-        return ["Failed to fetch supported versions."]
 
+        # the whole file is sent again when it changed, or when the server ignores Range
+        if response.status_code != 206:
+            if resumed:
+                print("The remote file changed or can't be resumed, downloading it again.")
+            resumed = 0
+            validator = range_validator(response.headers)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(validator_path)
+            if validator:
+                with open(validator_path, "w") as f:
+                    f.write(validator)
+        elif content_range_start(response.headers) != resumed:
+            # appending a part that doesn't start where the partial file ends would corrupt it
+            print("The server sent a different part of the file than asked for, downloading it again.")
+            response.close()
+            os.remove(part_path)
+            os.remove(validator_path)
+            return _download_file(url, dest_path)
+        else:
+            print(f"Resuming download from {resumed / (1024 * 1024):.1f} MB.")
 
-def get_latest_repository_version():
-    response = requests.get(os.path.join(BASE_API_PATH, "latest"))
-    response.raise_for_status()
-    json_data = json.loads(response.content)
-    return json_data["tag_name"]
+        remaining = response.headers.get("Content-Length")
+        total = resumed + int(remaining) if remaining and remaining.isdigit() else None
+        done = resumed
+        interactive = sys.stdout.isatty()
+        start_time = time.perf_counter()
+        last_print = start_time
 
+        with open(part_path, "ab" if resumed else "wb") as f:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                done += len(chunk)
+                if interactive and time.perf_counter() - last_print > 0.2:
+                    print_progress(done - resumed, total and total - resumed, start_time)
+                    last_print = time.perf_counter()
 
-def download_template(current_dir: str):
-    template_dir = os.path.join(current_dir, FOLDER_NAME)
-    if os.path.isdir(template_dir):
-        print("pygame-ios template already exists. Skipping.")
-        return
+        print_progress(done - resumed, total and total - resumed, start_time, end="\n")
+
+    os.replace(part_path, dest_path)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(validator_path)
+
+
+def fetch_template(cache: TemplateCache, pygame_version: str, offline: bool = False) -> str:
+    version_number_prefixed = f"v{pygame_version}"
+
+    if offline:
+        tag = cache.find_offline(pygame_version)
+        if tag is None:
+            print(
+                f"No cached Xcode template for pygame-ce {version_number_prefixed}. Run without --offline first."
+            )
+            sys.exit(1)
+    else:
+        try:
+            tag, supported = get_release_metadata(cache)
+        except METADATA_ERRORS as e:
+            print(f"Could not find the latest Xcode template release: {e}")
+            sys.exit(1)
+
+        # checked before anything is downloaded, so an unsupported version fails right away
+        # a cached list may predate the version being added, so it's checked again before giving up
+        if supported is not None and not is_supported_version(pygame_version, supported):
+            try:
+                tag, supported = get_release_metadata(cache, refresh=True)
+            except METADATA_ERRORS:
+                pass
+        if supported is not None and not is_supported_version(pygame_version, supported):
+            print(f"There is no Xcode template for pygame-ce version {version_number_prefixed}.")
+            print_supported_versions(supported)
+            sys.exit(0)
+
+    cached_path = cache.get(tag, pygame_version)
+    if cached_path:
+        print(f"Using cached Xcode template for pygame-ce {version_number_prefixed} ({tag}).")
+        return cached_path
 
-    version_number_prefixed = f"v{sys.argv[3]}"
     download_path = os.path.join(
-        BASE_DOWNLOAD_PATH,
-        get_latest_repository_version(),
-        f"pygame-ios-template-{sys.argv[3]}.zip",
+        get_download_path(),
+        tag,
+        f"pygame-ios-template-{pygame_version}.zip",
     )
 
     try:
         print(f"Downloading Xcode template for pygame-ce {version_number_prefixed}...")
-        response = requests.get(download_path)
-        response.raise_for_status()
+        download_file(download_path, cache.template_path(tag, pygame_version))
     except requests.exceptions.HTTPError:
         print(
             f"Xcode template for pygame-ce version {version_number_prefixed} does not exist. It might not be supported yet."
         )
 
-        print("Supported versions:")
-        for version in get_supported_pygame_versions():
-            print(version)
+        # the cached list may be older than the release, look again
+        try:
+            _, supported = get_release_metadata(cache, refresh=True)
+        except METADATA_ERRORS:
+            supported = cache.supported_versions["versions"] if cache.supported_versions else None
+        print_supported_versions(supported)
 
         sys.exit(0)
 
-    print("Extracting...")
-    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
-        zf.extractall(template_dir)
+    return cache.add(tag, pygame_version)
+
 
-    print("Xcode template downloaded successfully.")
+# Extracts the template, or updates an existing one that was extracted from a different zip, like the
+# template of another pygame-ce version. Files that are already on disk unchanged aren't written again
+# Files changed since the template was extracted, like the Xcode project after setting up signing, are
+# only replaced with update, and so are the files of templates extracted by older versions of pygame-ios
+# Returns False if the template was left as it is
+def extract_template_zip(zip_path: str, template_dir: str, jobs: int | None = None, update: bool = False) -> bool:
+    if not update and is_extracted_from(zip_path, template_dir):
+        print("pygame-ios template is up to date.")
+        return False
 
+    existed = os.path.isdir(template_dir)
+    if existed and not update and load_stamp(template_dir) is None:
+        # there is no telling which of its files were edited by hand
+        print("Using the existing pygame-ios template as it is, it was extracted by an older version of pygame-ios.")
+        print("Pass --update-template to replace its files with the ones in the zip, this undoes any changes you made to them.")
+        return False
 
-def use_local_template(current_dir: str, local_path: str):
+    print("Updating the existing pygame-ios template..." if existed else "Extracting...")
+    try:
+        stats = extract_template(zip_path, template_dir, jobs, overwrite=update)
+    except ValueError as e:
+        print(f"Could not extract the template: {e}")
+        sys.exit(1)
+    print(stats.summary())
+    if stats.kept_files:
+        print(f"Kept {len(stats.kept_files)} files you changed since the template was extracted:")
+        for name in sorted(stats.kept_files):
+            print(f"  {name}")
+        print("Pass --update-template to replace them with the ones in the zip.")
+    if existed and (stats.extracted_files or stats.removed_files):
+        # the zip may have replaced synced project files, so the next sync copies everything again
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(template_dir, MANIFEST_NAME))
+    return True
+
+
+def download_template(
+    current_dir: str, pygame_version: str, offline: bool = False, jobs: int | None = None, update: bool = False
+):
     template_dir = os.path.join(current_dir, FOLDER_NAME)
-    if os.path.isdir(template_dir):
-        print("pygame-ios template already exists. Skipping.")
+    try:
+        zip_path = fetch_template(TemplateCache(), pygame_version, offline)
+    except SystemExit:
+        if not os.path.isdir(template_dir):
+            raise
+        # fetch_template has already printed why
+        print("Using the existing pygame-ios template as it is.")
         return
 
+    if extract_template_zip(zip_path, template_dir, jobs, update):
+        print("Xcode template downloaded successfully.")
+
+
+def use_local_template(current_dir: str, local_path: str, jobs: int | None = None, update: bool = False):
+    template_dir = os.path.join(current_dir, FOLDER_NAME)
     print("Using local template.")
-    print("Extracting...")
-    with zipfile.ZipFile(local_path) as zf:
-        zf.extractall(template_dir)
+    if extract_template_zip(local_path, template_dir, jobs, update):
+        print(f"Used local template from {local_path}.")
 
-    print(f"Used local template from {local_path}.")
 
+# template_dir is the Xcode template folder, FOLDER_NAME inside the project unless a batch build says otherwise
+def sync_project(
+    project_folder_path: str,
+    main_script: str,
+    prune: bool = False,
+    pack_assets: bool = False,
+    template_dir: str | None = None,
+    ignore_names: set[str] | None = None,
+    bytecode: dict | None = None,
+) -> SyncStats:
+    template_dir = template_dir or os.path.join(project_folder_path, FOLDER_NAME)
+    dest_dir = os.path.join(template_dir, "pygame-ios", "app", "pygame-ios")
 
-def copy_project_files(project_folder_path: str):
-    dest_dir = os.path.join(
-        project_folder_path, FOLDER_NAME, "pygame-ios", "app", "pygame-ios"
-    )
+    # don't copy the Xcode template into the Xcode template, or anything matched by .pygameiosignore
+    rules = IgnoreRules.for_project(project_folder_path)
+    files = collect_project_files(project_folder_path, main_script, ignore_names or {FOLDER_NAME}, rules)
+
+    # optionally drop modules and assets that the entry script never uses
+    dropped = {}
+    if prune:
+        files, dropped = prune_files(files, load_keep_rules(project_folder_path))
+
+    # assets go into a single pack instead of being copied one by one
+    generated = set()
+    if pack_assets:
+        assets = {rel: src for rel, src in files.items() if is_asset(rel)}
+        files = {rel: src for rel, src in files.items() if not is_asset(rel)}
+        generated.add(PACK_NAME)
+
+    # only files that changed since the last run are copied, the manifest lives outside the app folder
+    stats = sync_files(files, dest_dir, os.path.join(template_dir, MANIFEST_NAME), generated, bytecode)
+    stats.dropped = dropped
 
-    # remove old files first
-    shutil.rmtree(dest_dir)
-    shutil.copytree(
-        project_folder_path,
-        dest_dir,
-        # don't copy the Xcode template into the Xcode template
-        ignore=lambda src, names: [FOLDER_NAME],
+    if pack_assets:
+        pack_path = os.path.join(dest_dir, PACK_NAME)
+        if write_pack(assets, pack_path):
+            print(f"Packed {len(assets)} assets into {PACK_NAME}.")
+        stats.sizes[PACK_NAME] = os.path.getsize(pack_path)
+
+    return stats
+
+
+def print_pruned_files(project_folder_path: str, main_script: str, dropped: dict[str, str]):
+    if not dropped:
+        print("Pruning didn't drop any files.")
+        return
+
+    total = 0
+    print(f"Pruning dropped {len(dropped)} files:")
+    for rel, reason in sorted(dropped.items()):
+        size = os.path.getsize(os.path.join(project_folder_path, rel))
+        total += size
+        print(f"  {rel} ({format_size(size)}, {reason})")
+    print(
+        f"Dropped {format_size(total)} in total. Add patterns to .pygameioskeep to keep files that {main_script} loads in other ways."
     )
 
-    new_main_path = os.path.join(dest_dir, sys.argv[2])
-    new_main_path_name = os.path.join(dest_dir, "__main__.py")
-    os.rename(new_main_path, new_main_path_name)
+
+def copy_project_files(
+    project_folder_path: str,
+    main_script: str,
+    prune: bool = False,
+    pack_assets: bool = False,
+    bytecode: dict | None = None,
+):
+    if not os.path.isfile(os.path.join(project_folder_path, main_script)):
+        print(f"Entry script {main_script} was not found in {project_folder_path}.")
+        sys.exit(1)
+
+    stats = sync_project(project_folder_path, main_script, prune, pack_assets, bytecode=bytecode)
 
     print("Copied project files to Xcode template.")
+    print(stats.summary())
+    if prune:
+        print_pruned_files(project_folder_path, main_script, stats.dropped)
+    print(size_report(stats.sizes))
+
+
+# With precompile, the changed modules are compiled again after every sync, like a full run would
+def watch_project_files(
+    project_folder_path: str,
+    main_script: str,
+    interval: float,
+    prune: bool = False,
+    pack_assets: bool = False,
+    precompile: bool = False,
+    optimize: int = 0,
+    strip_sources: bool = False,
+    jobs: int | None = None,
+):
+    bytecode = bytecode_settings(precompile, optimize, strip_sources)
+
+    def sync() -> SyncStats:
+        stats = sync_project(project_folder_path, main_script, prune, pack_assets, bytecode=bytecode)
+        if precompile and stats.copied_files:
+            # the packages don't change while watching, only the app's modules are checked
+            precompile_project(project_folder_path, optimize, strip_sources, jobs, packages=False)
+        return stats
+
+    def on_sync(stats: SyncStats, elapsed: float):
+        if stats.copied_files or stats.removed_files:
+            print(f"Synced changes in {elapsed * 1000:.0f} ms. {stats.summary()}")
+
+    print(f"Watching {project_folder_path} for changes. Press Ctrl+C to stop.")
+    try:
+        watch_project(
+            project_folder_path,
+            sync,
+            {FOLDER_NAME},
+            IgnoreRules.for_project(project_folder_path),
+            interval=interval,
+            on_sync=on_sync,
+        )
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+
+# The precompile settings sync_project records with the bytecode, or None without --precompile
+def bytecode_settings(precompile: bool, optimize: int, strip_sources: bool) -> dict | None:
+    return {"optimize": optimize, "strip_sources": strip_sources} if precompile else None
+
+
+def precompile_project(
+    project_folder_path: str,
+    optimize: int,
+    strip_sources: bool,
+    jobs: int | None = None,
+    template_dir: str | None = None,
+    packages: bool = True,
+):
+    python = find_python()
+    if python is None:
+        major, minor = TEMPLATE_PYTHON_VERSION
+        print(
+            f"Python {major}.{minor} is needed to precompile for the template, but python{major}.{minor} was not found. Skipping."
+        )
+        return
+
+    manifest_path = os.path.join(template_dir or os.path.join(project_folder_path, FOLDER_NAME), MANIFEST_NAME)
+    template_dir = os.path.join(template_dir or os.path.join(project_folder_path, FOLDER_NAME), "pygame-ios")
+    folders = [os.path.join("app", "pygame-ios")]
+    if packages:
+        folders += ["app_packages.iphoneos", "app_packages.iphonesimulator"]
+    for folder in folders:
+        path = os.path.join(template_dir, folder)
+        if not os.path.isdir(path):
+            continue
+
+        start_time = time.perf_counter()
+        # the app's sources are checked against the hashes in the sync manifest, the packages only
+        # change through install, which removes their bytecode along with them
+        is_app = folder == os.path.join("app", "pygame-ios")
+        compiled = compiled_sources(manifest_path, path) if is_app else None
+        stats = precompile_tree(path, python, optimize, strip_sources, jobs or 0, compiled)
+        if is_app:
+            # so the next sync keeps the bytecode of the files it doesn't copy again
+            record_bytecode(
+                manifest_path,
+                path,
+                bytecode_settings(True, optimize, strip_sources),
+                lambda source: bytecode_path(source, optimize, strip_sources).replace(os.sep, "/"),
+            )
+        if not stats.modules:
+            continue
+        print(
+            f"Precompiled {stats.modules} modules in {folder} ({time.perf_counter() - start_time:.1f}s, "
+            f"{stats.up_to_date} up to date)."
+        )
+        if stats.stripped:
+            print(f"Removed {stats.stripped} sources from {folder}.")
+        if stats.failed:
+            print(f"Some modules in {folder} failed to compile, see the errors above.")
+
+
+def install_cli():
+    requirements = []
+    while (requirements_path := pop_option("-r")) is not None:
+        requirements.extend(read_requirements(requirements_path))
+    wheelhouse = pop_option("--wheelhouse")
+    project_folder_path = os.path.abspath(pop_option("--project", "."))
+    requirements.extend(sys.argv[2:])
+
+    if not requirements:
+        print(
+            "Usage: pygame-ios install [package ...] [-r requirements.txt] [--wheelhouse DIR] [--project project_folder]"
+        )
+        return
+
+    template_dir = os.path.join(project_folder_path, FOLDER_NAME, "pygame-ios")
+    if not os.path.isdir(template_dir):
+        print(f"No Xcode template found in {project_folder_path}. Run pygame_ios on your project first.")
+        sys.exit(1)
+
+    try:
+        stats = install_packages(
+            template_dir,
+            requirements,
+            os.path.abspath(wheelhouse) if wheelhouse else None,
+        )
+    except InstallError as e:
+        print(e)
+        sys.exit(1)
+
+    for requirement in stats.skipped:
+        print(f"Already installed: {requirement}")
+    if stats.installed:
+        print(f"Installed {', '.join(stats.installed)} for both device and simulator.")
+        print(f"Linked {stats.linked_files} files, copied {stats.copied_files} files.")
+
+
+def compile_map_cli():
+    spritesheet = pop_option("--spritesheet")
+    if len(sys.argv) < 3:
+        print("Usage: pygame-ios compile-map map.json [output.pgmap] [--spritesheet spritesheet.png]")
+        return
+
+    json_path = sys.argv[2]
+    if not os.path.isfile(json_path):
+        print(f"Map {json_path} does not exist.")
+        sys.exit(1)
+    map_path = sys.argv[3] if len(sys.argv) > 3 else os.path.splitext(json_path)[0] + MAP_SUFFIX
+
+    try:
+        compile_map(json_path, map_path, spritesheet)
+    except (ValueError, KeyError) as e:
+        print(f"Could not compile {json_path}: {e}")
+        sys.exit(1)
+
+    compiled = load_map(map_path)
+    print(
+        f"Compiled {json_path} to {map_path} ({format_size(os.path.getsize(json_path))} -> "
+        f"{format_size(os.path.getsize(map_path))}): {compiled.width}x{compiled.height} tiles, "
+        f"{len(compiled.layers)} layers, {len(compiled.entities)} entities."
+    )
+    if not compiled.spritesheet_size:
+        print("No spritesheet was found, pass --spritesheet to include one.")
+
+
+# Parses --grid player.png=16x16 and --colorkey player.png=ff00ff style options into a dict
+def pop_named_options(name: str, parse) -> dict:
+    values = {}
+    while (option := pop_option(name)) is not None:
+        image, _, value = option.partition("=")
+        try:
+            values[image] = parse(value)
+        except ValueError:
+            print(f"Invalid value for {name}: {option}")
+            sys.exit(1)
+    return values
+
+
+def parse_grid(value: str) -> tuple[int, int]:
+    width, height = (int(part) for part in value.lower().split("x"))
+    if width <= 0 or height <= 0:
+        raise ValueError(value)
+    return width, height
+
+
+def parse_color(value: str) -> tuple[int, int, int]:
+    value = value.removeprefix("#")
+    if len(value) != 6:
+        raise ValueError(value)
+    return tuple(int(value[i : i + 2], 16) for i in range(0, 6, 2))
+
+
+def pack_atlas_cli():
+    output = pop_option("--output")
+    max_size = int(pop_option("--max-size", str(DEFAULT_MAX_SIZE)))
+    padding = int(pop_option("--padding", str(DEFAULT_PADDING)))
+    grids = pop_named_options("--grid", parse_grid)
+    colorkeys = pop_named_options("--colorkey", parse_color)
+    paths = sys.argv[2:]
+    if not paths:
+        print(
+            "Usage: pygame-ios pack-atlas image_or_folder ... [--output atlas.json] [--max-size 2048] [--padding 2] [--grid image.png=16x16] [--colorkey image.png=ff00ff]"
+        )
+        return
+
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"{path} does not exist.")
+            sys.exit(1)
+    if output is None:
+        folder = paths[0] if os.path.isdir(paths[0]) else os.path.dirname(paths[0])
+        output = os.path.join(folder, "atlas.json")
+
+    # images are named by their path relative to the index, like the game loads them
+    root = os.path.dirname(os.path.abspath(output))
+    try:
+        images = find_images(paths, root, output)
+        if not images:
+            print("No images to pack.")
+            sys.exit(1)
+        report = pack_atlas(images, output, max_size, padding, grids, colorkeys)
+    except (ValueError, OSError) as e:
+        print(f"Could not pack the atlas: {e}")
+        sys.exit(1)
+
+    folder = os.path.dirname(output)
+    stem = os.path.splitext(os.path.basename(output))[0]
+    page_size = sum(os.path.getsize(os.path.join(folder, f"{stem}{n}.png")) for n in range(len(report.pages)))
+    source_size = sum(os.path.getsize(path) for path in images.values())
+    print(
+        f"Packed {len(images)} images ({format_size(source_size)}) into {len(report.pages)} "
+        f"page{'s' if len(report.pages) != 1 else ''} ({format_size(page_size)}), index written to {output}."
+    )
+    for number, (width, height, count) in enumerate(report.pages):
+        print(f"  {stem}{number}.png: {width}x{height}, {count} images")
+    print(f"Packing efficiency: {report.efficiency:.1%} of the atlas pixels are used by images.")
+
+
+def pack_sounds_cli():
+    output = pop_option("--output")
+    frequency = int(pop_option("--frequency", str(DEFAULT_FREQUENCY)))
+    size = int(pop_option("--size", str(DEFAULT_SIZE)))
+    channels = int(pop_option("--channels", str(DEFAULT_CHANNELS)))
+    max_length = float(pop_option("--max-length", str(DEFAULT_MAX_LENGTH)))
+    stream_pcm = pop_flag("--stream-pcm")
+    paths = sys.argv[2:]
+    if not paths:
+        print(
+            "Usage: pygame-ios pack-sounds sound_or_folder ... [--output sounds.sndbank] [--frequency 44100] [--size -16] [--channels 2] [--max-length SECONDS] [--stream-pcm]"
+        )
+        return
+
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"{path} does not exist.")
+            sys.exit(1)
+    if output is None:
+        folder = paths[0] if os.path.isdir(paths[0]) else os.path.dirname(paths[0])
+        output = os.path.join(folder, "sounds" + BANK_SUFFIX)
+
+    # sounds are named by their path relative to the bank, like the game loads them
+    root = os.path.dirname(os.path.abspath(output))
+    try:
+        sounds = find_sounds(paths, root)
+        if not sounds:
+            print("No sounds to pack.")
+            sys.exit(1)
+        packed, tracks = pack_sounds(sounds, output, frequency, size, channels, max_length, stream_pcm)
+    except (ValueError, OSError) as e:
+        print(f"Could not pack the sounds: {e}")
+        sys.exit(1)
+
+    target = describe_format(frequency, size, channels)
+    converted = [sound.name for sound in packed if sound.converted]
+    print(
+        f"Packed {len(packed)} sounds ({format_size(sum(sound.source_size for sound in packed))} -> "
+        f"{format_size(sum(sound.size for sound in packed))} of {target} PCM) into {output}."
+    )
+    if converted:
+        print(f"Converted at build time instead of when the game loads them: {', '.join(converted)}")
+    for track in tracks:
+        print(
+            f"{track.name} is {track.seconds:.0f} seconds long and streamed as music, decoding it takes "
+            f"{track.decode_cost:.2%} of a CPU core on this machine while it plays."
+        )
+        # PCM doesn't cost CPU, but it's many times bigger, and all of it goes into the app
+        growth = (
+            f"{format_size(track.pcm_size)} instead of {format_size(track.source_size)}, "
+            f"{track.pcm_size / max(track.source_size, 1):.0f}x the size"
+        )
+        if track.converted_path:
+            print(f"  Converted it to {track.converted_path}, which is {growth}. Use it instead if the CPU time matters more.")
+        elif not stream_pcm:
+            print(f"  Pass --stream-pcm to convert it to a WAV in the mixer format, which streams without decoding but is {growth}.")
+
+
+# Runs in a batch worker process, extracts a template zip once for all jobs that use it
+def extract_batch_template(zip_path: str, staging_dir: str) -> float:
+    start_time = time.perf_counter()
+    extract_template(zip_path, staging_dir)
+    return time.perf_counter() - start_time
+
+
+# Runs in a batch worker process, builds one job and returns its part of the report
+# Everything it prints goes into the report instead of being mixed with the other jobs' output
+# zip_path is the job's template, or None if it couldn't be fetched and the existing one is used
+def build_batch_job(job: BatchJob, staging_dir: str | None, zip_path: str | None) -> dict:
+    result = {
+        "name": job.name,
+        "project": job.project,
+        "script": job.script,
+        "pygame_ce": job.pygame_ce,
+        "output": job.output,
+        "status": "ok",
+        "error": None,
+        "stages": {},
+    }
+    stages = result["stages"]
+    log = io.StringIO()
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        try:
+            # like a single build, an existing template folder is updated if it came from another zip
+            stage_start = time.perf_counter()
+            if os.path.isdir(job.output):
+                if zip_path is None:
+                    print("Using the existing pygame-ios template as it is.")
+                else:
+                    extract_template_zip(zip_path, job.output, update=job.update_template)
+            else:
+                # copying the extracted template is much faster than inflating the zip again
+                shutil.copytree(staging_dir, job.output, symlinks=True)
+            stages["template"] = time.perf_counter() - stage_start
+
+            stage_start = time.perf_counter()
+            stats = sync_project(
+                job.project,
+                job.script,
+                job.prune,
+                job.pack_assets,
+                job.output,
+                job.ignore_names,
+                bytecode_settings(job.precompile, job.optimize, job.strip_sources),
+            )
+            stages["sync"] = time.perf_counter() - stage_start
+            print(stats.summary())
+            print(size_report(stats.sizes))
+            result["copied_files"] = stats.copied_files
+            result["app_size"] = sum(stats.sizes.values())
+
+            if job.precompile:
+                stage_start = time.perf_counter()
+                precompile_project(job.project, job.optimize, job.strip_sources, template_dir=job.output)
+                stages["precompile"] = time.perf_counter() - stage_start
+        except (Exception, SystemExit) as e:
+            result["status"] = "failed"
+            result["error"] = str(e) or type(e).__name__
+    stages["total"] = time.perf_counter() - start_time
+    result["log"] = log.getvalue()
+    return result
+
+
+def failed_job(job: BatchJob, error: str) -> dict:
+    return {
+        "name": job.name,
+        "project": job.project,
+        "script": job.script,
+        "pygame_ce": job.pygame_ce,
+        "output": job.output,
+        "status": "failed",
+        "error": error,
+        "stages": {},
+        "log": "",
+    }
+
+
+# Builds every job on a process pool, sharing the download and extraction of templates between jobs
+def run_batch(jobs: list[BatchJob], workers: int | None, offline: bool) -> dict:
+    start_time = time.perf_counter()
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job.template_key, []).append(job)
+
+    # downloads happen here, one after another, the template cache index isn't shared between processes
+    templates = {}
+    cache = None
+    for key, group in groups.items():
+        template = {
+            "source": group[0].template or f"pygame-ce {group[0].pygame_ce} release",
+            "zip": group[0].template,
+            "jobs": [job.name for job in group],
+            "stages": {},
+            "error": None,
+        }
+        templates[key] = template
+        if template["zip"] is None:
+            cache = cache or TemplateCache()
+            stage_start = time.perf_counter()
+            try:
+                template["zip"] = fetch_template(cache, group[0].pygame_ce, offline)
+            except SystemExit:
+                # fetch_template has already printed why
+                template["error"] = f"Could not fetch the template for pygame-ce {group[0].pygame_ce}"
+            except Exception as e:
+                template["error"] = f"Could not fetch the template for pygame-ce {group[0].pygame_ce}: {e}"
+            template["stages"]["fetch"] = time.perf_counter() - stage_start
+            if template["error"] and all(os.path.isdir(job.output) for job in group):
+                # the jobs can still build into the templates they already have
+                print(f"{template['error']}, using the existing templates as they are.")
+                template["error"] = None
+
+    results = {}
+    staging_root = tempfile.mkdtemp(prefix="pygame-ios-batch-")
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            running = {}
+
+            def start_jobs(group: list[BatchJob], staging_dir: str | None, zip_path: str | None):
+                for job in group:
+                    running[pool.submit(build_batch_job, job, staging_dir, zip_path)] = ("job", job)
+
+            for number, (key, group) in enumerate(groups.items()):
+                template = templates[key]
+                if template["error"]:
+                    for job in group:
+                        results[job.name] = failed_job(job, template["error"])
+                elif template["zip"] is None or all(os.path.isdir(job.output) for job in group):
+                    start_jobs(group, None, template["zip"])
+                else:
+                    staging_dir = os.path.join(staging_root, str(number))
+                    future = pool.submit(extract_batch_template, template["zip"], staging_dir)
+                    running[future] = ("template", key, staging_dir)
+
+            # a template's jobs start as soon as it's extracted, while other templates are still extracting
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, *details = running.pop(future)
+                    if kind == "job":
+                        job = details[0]
+                        try:
+                            results[job.name] = future.result()
+                        except Exception as e:
+                            results[job.name] = failed_job(job, f"The worker process failed: {e}")
+                        continue
+
+                    key, staging_dir = details
+                    try:
+                        templates[key]["stages"]["extract"] = future.result()
+                    except Exception as e:
+                        templates[key]["error"] = f"Could not extract {templates[key]['zip']}: {e}"
+                        for job in groups[key]:
+                            results[job.name] = failed_job(job, templates[key]["error"])
+                        continue
+                    start_jobs(groups[key], staging_dir, templates[key]["zip"])
+    finally:
+        shutil.rmtree(staging_root, ignore_errors=True)
+
+    job_results = [results[job.name] for job in jobs]
+    return {
+        "version": REPORT_VERSION,
+        "total_seconds": time.perf_counter() - start_time,
+        "succeeded": sum(result["status"] == "ok" for result in job_results),
+        "failed": sum(result["status"] != "ok" for result in job_results),
+        "templates": list(templates.values()),
+        "jobs": job_results,
+    }
+
+
+def batch_cli():
+    offline = pop_flag("--offline")
+    jobs_option = pop_option("--jobs")
+    report_path = pop_option("--report")
+    if len(sys.argv) < 3:
+        print("Usage: pygame-ios batch build.toml [--jobs N] [--report report.json] [--offline]")
+        return
+
+    try:
+        jobs, settings = load_batch(sys.argv[2], FOLDER_NAME)
+    except BatchError as e:
+        print(e)
+        sys.exit(1)
+    workers = int(jobs_option) if jobs_option else settings["jobs"]
+    report_path = report_path or settings["report"]
+
+    processes = workers or os.cpu_count() or 1
+    print(f"Building {len(jobs)} jobs with {processes} process{'es' if processes != 1 else ''}...")
+    report = run_batch(jobs, workers, offline)
+
+    for template in report["templates"]:
+        stages = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in template["stages"].items())
+        count = len(template["jobs"])
+        print(f"Template {template['source']} for {count} job{'s' if count != 1 else ''}{f' ({stages})' if stages else ''}.")
+    for result in report["jobs"]:
+        stages = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in result["stages"].items())
+        if result["status"] == "ok":
+            print(f"  {result['name']}: built into {result['output']} ({stages}).")
+        else:
+            print(f"  {result['name']}: failed, {result['error']}")
+    print(f"Built {report['succeeded']} of {len(jobs)} jobs in {report['total_seconds']:.1f}s.")
+
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"Wrote the report to {report_path}.")
+    if report["failed"]:
+        sys.exit(1)
+
+
+def format_age(seconds: float) -> str:
+    if seconds < 60:
+        return "just now"
+    for unit, length in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= length:
+            count = int(seconds // length)
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+
+
+def versions_cli():
+    refresh = pop_flag("--refresh")
+    cache = TemplateCache()
+    # answered from the cache, GitHub is only asked when there's nothing cached yet or with --refresh
+    if refresh or cache.latest_release is None or cache.supported_versions is None:
+        try:
+            get_release_metadata(cache, refresh)
+        except METADATA_ERRORS as e:
+            print(f"Could not fetch the template releases: {e}")
+            sys.exit(1)
+
+    now = time.time()
+    latest = cache.latest_release
+    print(f"Latest template release: {latest['tag']} (checked {format_age(now - latest['checked'])})")
+
+    supported = cache.supported_versions
+    if supported is None:
+        print("The supported pygame-ce versions could not be fetched.")
+    else:
+        cached = {entry["version"] for entry in cache.index["templates"].values()}
+        print(f"Supported pygame-ce versions (checked {format_age(now - supported['checked'])}):")
+        for version in supported["versions"]:
+            print(f"  {version}{'  (template cached)' if version.removeprefix('v') in cached else ''}")
+    if not refresh:
+        print("Run pygame_ios versions --refresh to check GitHub again.")
 
 
 def finalise():
@@ -119,6 +1031,30 @@ def finalise():
 
 
 def cli():
+    if len(sys.argv) > 1 and sys.argv[1] == "install":
+        return install_cli()
+    if len(sys.argv) > 1 and sys.argv[1] == "compile-map":
+        return compile_map_cli()
+    if len(sys.argv) > 1 and sys.argv[1] == "versions":
+        return versions_cli()
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        return batch_cli()
+    if len(sys.argv) > 1 and sys.argv[1] == "pack-atlas":
+        return pack_atlas_cli()
+    if len(sys.argv) > 1 and sys.argv[1] == "pack-sounds":
+        return pack_sounds_cli()
+
+    offline = pop_flag("--offline")
+    update_template = pop_flag("--update-template")
+    jobs = int(pop_option("--jobs", "0")) or None
+    precompile = pop_flag("--precompile")
+    optimize = int(pop_option("--optimize", "0"))
+    strip_sources = pop_flag("--strip-sources")
+    watch = pop_flag("--watch")
+    prune = pop_flag("--prune")
+    pack_assets = pop_flag("--pack-assets")
+    watch_interval = float(pop_option("--watch-interval", str(DEFAULT_INTERVAL)))
+
     if not check_args():
         return  # early exit
 
@@ -126,13 +1062,29 @@ def cli():
 
     if len(sys.argv) > 4:
         local_template_path = os.path.realpath(sys.argv[4])
-        use_local_template(project_folder_path, local_template_path)
+        use_local_template(project_folder_path, local_template_path, jobs, update_template)
     else:
-        download_template(project_folder_path)
+        download_template(project_folder_path, sys.argv[3], offline, jobs, update_template)
 
-    copy_project_files(project_folder_path)
+    bytecode = bytecode_settings(precompile, optimize, strip_sources)
+    copy_project_files(project_folder_path, sys.argv[2], prune, pack_assets, bytecode)
+    if precompile:
+        precompile_project(project_folder_path, optimize, strip_sources, jobs)
     finalise()
 
+    if watch:
+        watch_project_files(
+            project_folder_path,
+            sys.argv[2],
+            watch_interval,
+            prune,
+            pack_assets,
+            precompile,
+            optimize,
+            strip_sources,
+            jobs,
+        )
+
 
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,240 @@
+"""Packed asset archives, and loading assets from them at runtime.
+
+A pack is one file holding many assets: a header, a table of contents, then every asset stored
+uncompressed and aligned. At runtime the pack is memory-mapped, so opening an asset doesn't touch
+the filesystem and reading it doesn't copy more than the caller asks for.
+
+Games load assets through open_assets(), which falls back to loose files when there's no pack,
+so the same code works on desktop and on iOS:
+
+    assets = open_assets(os.path.dirname(__file__))
+    player_image = assets.load_image("assets/player.png").convert_alpha()
+"""
+
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+
+PACK_NAME = "assets.pack"
+MAGIC = b"PGIOPACK"
+VERSION = 1
+ALIGNMENT = 64
+
+# magic, version, reserved, entry count, table of contents size, source signature
+HEADER = struct.Struct("<8sHHII32s")
+# offset, size, name length, followed by the UTF-8 name
+ENTRY = struct.Struct("<QQH")
+
+
+# Files that Python imports rather than the game loading them as assets
+CODE_SUFFIXES = (".py", ".pyc", ".so", ".dylib")
+
+
+def is_asset(name: str) -> bool:
+    return not name.endswith(CODE_SUFFIXES)
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# Sizes and modification times of the sources, used to skip rebuilding a pack that is up to date
+def source_signature(files: dict[str, str]) -> bytes:
+    digest = hashlib.sha256()
+    for name, path in sorted(files.items()):
+        st = os.stat(path)
+        digest.update(f"{name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.digest()
+
+
+def read_signature(pack_path: str) -> bytes | None:
+    try:
+        with open(pack_path, "rb") as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, version, _, _, _, signature = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return signature
+
+
+# Writes a pack from a mapping of asset names (relative paths with forward slashes) to source paths
+# Returns False without writing anything if the pack is already up to date
+def write_pack(files: dict[str, str], pack_path: str) -> bool:
+    signature = source_signature(files)
+    if read_signature(pack_path) == signature:
+        return False
+
+    names = sorted(files)
+    encoded_names = [name.encode("utf-8") for name in names]
+    toc_size = sum(ENTRY.size + len(name) for name in encoded_names)
+
+    offset = _align(HEADER.size + toc_size)
+    entries = []
+    for name in names:
+        size = os.path.getsize(files[name])
+        entries.append((offset, size))
+        offset = _align(offset + size)
+
+    tmp_path = pack_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(names), toc_size, signature))
+        for name, (offset, size) in zip(encoded_names, entries):
+            f.write(ENTRY.pack(offset, size, len(name)))
+            f.write(name)
+        for name, (offset, size) in zip(names, entries):
+            f.write(b"\0" * (offset - f.tell()))
+            with open(files[name], "rb") as src:
+                written = f.write(src.read())
+            if written != size:
+                raise OSError(f"{files[name]} changed while it was being packed")
+    os.replace(tmp_path, pack_path)
+    return True
+
+
+class PackFile(io.RawIOBase):
+    # Read-only file object over a slice of the pack, pygame can load images and sounds from it
+    def __init__(self, view: memoryview, name: str):
+        super().__init__()
+        self.view = view
+        self.name = name
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), len(self.view) - self.position)
+        if size <= 0:
+            return 0
+        buffer[:size] = self.view[self.position : self.position + size]
+        self.position += size
+        return size
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self.view) if size < 0 else min(len(self.view), self.position + size)
+        data = self.view[self.position : end].tobytes()
+        self.position = max(self.position, end)
+        return data
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self.position = offset
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    # Same as BytesIO.getbuffer, the whole asset without copying
+    def getbuffer(self) -> memoryview:
+        return self.view
+
+
+class _AssetLoaders:
+    # pygame is only imported when it's used, so packs can be built without it
+    def load_image(self, name: str):
+        import pygame
+
+        return pygame.image.load(self.open(name), name)
+
+    def load_sound(self, name: str):
+        import pygame
+
+        return pygame.mixer.Sound(self.open(name))
+
+    # music is streamed while it plays, the file object is kept alive by the mixer
+    def load_music(self, name: str):
+        import pygame
+
+        pygame.mixer.music.load(self.open(name), name)
+
+    def load_json(self, name: str):
+        return json.loads(str(self.buffer(name), "utf-8"))
+
+
+class AssetPack(_AssetLoaders):
+    def __init__(self, pack_path: str):
+        self.path = pack_path
+        with open(pack_path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = memoryview(self.mmap)
+
+        magic, version, _, count, toc_size, _ = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{pack_path} is not a pygame-ios asset pack")
+
+        self.entries = {}
+        position = HEADER.size
+        for _ in range(count):
+            offset, size, name_length = ENTRY.unpack_from(self.data, position)
+            position += ENTRY.size
+            name = self.data[position : position + name_length].tobytes().decode("utf-8")
+            position += name_length
+            self.entries[name] = (offset, size)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def names(self) -> list[str]:
+        return list(self.entries)
+
+    # The raw bytes of an asset as a memoryview into the mapped pack, nothing is copied
+    def buffer(self, name: str) -> memoryview:
+        try:
+            offset, size = self.entries[name]
+        except KeyError:
+            raise FileNotFoundError(f"{name} is not in {self.path}") from None
+        return self.data[offset : offset + size]
+
+    def open(self, name: str) -> PackFile:
+        return PackFile(self.buffer(name), name)
+
+    def read(self, name: str) -> bytes:
+        return self.buffer(name).tobytes()
+
+
+class LooseAssets(_AssetLoaders):
+    # Same interface as AssetPack, reading from the files in a folder
+    def __init__(self, root: str):
+        self.path = root
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.path, *name.split("/"))
+
+    def __contains__(self, name: str) -> bool:
+        return os.path.isfile(self._path(name))
+
+    def buffer(self, name: str) -> memoryview:
+        return memoryview(self.read(name))
+
+    def open(self, name: str):
+        return open(self._path(name), "rb")
+
+    def read(self, name: str) -> bytes:
+        with open(self._path(name), "rb") as f:
+            return f.read()
+
+
+# Uses the pack in root if there is one (on iOS after building with --pack-assets), otherwise loose files
+def open_assets(root: str, pack_name: str = PACK_NAME) -> AssetPack | LooseAssets:
+    pack_path = os.path.join(root, pack_name)
+    if os.path.isfile(pack_path):
+        return AssetPack(pack_path)
+    return LooseAssets(root)
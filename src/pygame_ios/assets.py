@@ -0,0 +1,190 @@
+"""Loads images and sounds on background threads, so a game can draw frames while it starts.
+
+    assets = AssetManager(open_assets(os.path.dirname(__file__)))
+    player = assets.image("assets/player.png")
+    footstep = assets.sound("assets/footstep1.wav")
+
+    def tick():
+        if assets.pump():
+            ...everything has loaded, player.result() is the converted surface...
+        else:
+            draw_loading_screen(assets.progress())
+
+Files are read and decoded on a thread pool, pygame releases the GIL while SDL decodes them.
+Converting images to the display's pixel format has to happen on the main thread once the display
+exists, so pump() does that and then completes the futures. Callbacks added to the futures with
+add_done_callback run on the main thread too.
+
+Loaded images and sounds are kept in a cache, so asking for them again doesn't load them again.
+The least recently used ones are dropped from it when it gets bigger than the memory budget.
+"""
+
+import os
+import queue
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pygame
+
+from pygame_ios.assetpack import open_assets
+
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+
+def default_workers() -> int:
+    return min(4, os.cpu_count() or 1)
+
+
+# Rough size in memory of a decoded image or sound
+def asset_size(asset) -> int:
+    if isinstance(asset, pygame.Surface):
+        return asset.get_pitch() * asset.height
+    if isinstance(asset, pygame.mixer.Sound):
+        frequency, audio_format, channels = pygame.mixer.get_init()
+        return int(asset.get_length() * frequency) * channels * (abs(audio_format) // 8)
+    return 0
+
+
+class AssetManager:
+    # source is a folder or an asset source from pygame_ios.assetpack.open_assets
+    # With workers=0, assets are loaded on the calling thread as soon as they're requested
+    def __init__(self, source, workers: int | None = None, budget: int = DEFAULT_BUDGET):
+        self.source = open_assets(source) if isinstance(source, str) else source
+        if workers is None:
+            workers = default_workers()
+        self.executor = ThreadPoolExecutor(workers, "asset-loader") if workers else None
+        self.budget = budget
+
+        # loaded on a worker and waiting for pump, as (key, future, finish, result, error)
+        self.finished = queue.SimpleQueue()
+        # images that can't be converted until the display is created
+        self.deferred = []
+        self.pending = {}
+        self.requested = 0
+        self.completed = 0
+
+        self.cache = OrderedDict()
+        self.cache_size = 0
+
+    def image(self, name: str, alpha: bool = True, colorkey=None) -> Future:
+        def finish(surface: pygame.Surface) -> pygame.Surface:
+            surface = surface.convert_alpha() if alpha else surface.convert()
+            if colorkey is not None:
+                surface.set_colorkey(colorkey)
+            return surface
+
+        return self._request(("image", name, alpha, colorkey), self.source.load_image, (name,), finish)
+
+    def sound(self, name: str) -> Future:
+        return self._request(("sound", name), self.source.load_sound, (name,))
+
+    def json(self, name: str) -> Future:
+        return self._request(None, self.source.load_json, (name,))
+
+    # Runs any function on a worker, its result isn't cached
+    def run(self, function, *args) -> Future:
+        return self._request(None, function, args)
+
+    def _request(self, key, function, args, finish=None) -> Future:
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            future = Future()
+            future.set_result(self.cache[key][0])
+            return future
+        if key in self.pending:
+            return self.pending[key]
+
+        future = Future()
+        # results that aren't cached get a key of their own, so they're never shared
+        if key is None:
+            key = object()
+        self.pending[key] = future
+        self.requested += 1
+        if self.executor is None:
+            self._load(key, future, finish, function, args)
+        else:
+            self.executor.submit(self._load, key, future, finish, function, args)
+        return future
+
+    # Runs on a worker thread
+    def _load(self, key, future, finish, function, args):
+        try:
+            self.finished.put((key, future, finish, function(*args), None))
+        except Exception as e:
+            self.finished.put((key, future, finish, None, e))
+
+    # Converts, caches and delivers one loaded asset, returns False if it has to wait for the display
+    def _deliver(self, item) -> bool:
+        key, future, finish, result, error = item
+        if error is None and finish is not None:
+            if pygame.display.get_surface() is None:
+                return False
+            try:
+                result = finish(result)
+            except Exception as e:
+                error = e
+
+        del self.pending[key]
+        self.completed += 1
+        if error is not None:
+            future.set_exception(error)
+            return True
+        if isinstance(key, tuple):
+            self._store(key, result)
+        future.set_result(result)
+        return True
+
+    def _store(self, key, asset):
+        size = asset_size(asset)
+        if size > self.budget:
+            return
+        self.cache[key] = (asset, size)
+        self.cache_size += size
+        while self.cache_size > self.budget:
+            _, (_, evicted_size) = self.cache.popitem(last=False)
+            self.cache_size -= evicted_size
+
+    # Delivers the assets that finished loading, call it once per frame on the main thread
+    # max_time limits the seconds spent converting images, so loading doesn't cause dropped frames
+    # Returns True when nothing is loading anymore
+    def pump(self, max_time: float | None = None) -> bool:
+        start = time.perf_counter()
+        if self.deferred and pygame.display.get_surface() is not None:
+            deferred, self.deferred = self.deferred, []
+            for item in deferred:
+                self._deliver(item)
+
+        while True:
+            if max_time is not None and time.perf_counter() - start > max_time:
+                break
+            try:
+                item = self.finished.get_nowait()
+            except queue.Empty:
+                break
+            if not self._deliver(item):
+                self.deferred.append(item)
+        return not self.pending
+
+    # Blocks until the futures are done, or everything that was requested if futures is None
+    def wait(self, futures=None):
+        futures = list(self.pending.values()) if futures is None else list(futures)
+        self.pump()
+        while not all(future.done() for future in futures):
+            if self.deferred and len(self.deferred) == len(self.pending):
+                raise RuntimeError("Images can't be converted before the display is created")
+            item = self.finished.get()
+            if not self._deliver(item):
+                self.deferred.append(item)
+
+    # Fraction of the requested assets that have been delivered, from 0 to 1
+    def progress(self) -> float:
+        return self.completed / self.requested if self.requested else 1.0
+
+    def clear_cache(self):
+        self.cache.clear()
+        self.cache_size = 0
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
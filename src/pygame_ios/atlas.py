@@ -0,0 +1,353 @@
+"""Texture atlases: many sprite images packed into a few power of two pages, and loading them at runtime.
+
+pack_atlas() packs images into pages with the MaxRects algorithm, leaving padding between them so
+scaling and filtering never pick up pixels from a neighbouring sprite. It writes the pages as PNGs
+next to a small JSON index, and the game loads them once and cuts them into subsurfaces:
+
+    atlas = load_atlas("assets/atlas.json", assets)
+    shadow = atlas.get("shadow.png")
+    walk_frames = atlas.frames("player.png")
+
+The index maps every image name to [page, x, y, width, height], followed by the frame width and
+height when the image was packed with a frame grid:
+
+    {"version": 1, "pages": ["atlas0.png"], "sprites": {"player.png": [0, 0, 0, 64, 48, 16, 16]}}
+"""
+
+import json
+import os
+import posixpath
+import re
+from typing import NamedTuple
+
+VERSION = 1
+DEFAULT_MAX_SIZE = 2048
+DEFAULT_PADDING = 2
+IMAGE_SUFFIXES = (".png", ".bmp", ".gif", ".jpg", ".jpeg", ".tga", ".webp")
+
+
+class AtlasPage(NamedTuple):
+    width: int
+    height: int
+    # name -> (x, y) of the images on this page
+    positions: dict
+
+
+class AtlasReport(NamedTuple):
+    # (width, height, image count) of every page
+    pages: list
+    # pixels covered by images, and by all pages together
+    used_pixels: int
+    total_pixels: int
+
+    @property
+    def efficiency(self) -> float:
+        return self.used_pixels / self.total_pixels if self.total_pixels else 0.0
+
+
+# MaxRects bin, keeps every maximal free rectangle and places each image in the one it fits best
+class MaxRectsBin:
+    def __init__(self, width: int, height: int):
+        self.free = [(0, 0, width, height)]
+
+    # Best short side fit, returns the position or None if the rect doesn't fit anywhere
+    def insert(self, width: int, height: int) -> tuple[int, int] | None:
+        best = None
+        for free_x, free_y, free_width, free_height in self.free:
+            if width <= free_width and height <= free_height:
+                leftover_x = free_width - width
+                leftover_y = free_height - height
+                score = (min(leftover_x, leftover_y), max(leftover_x, leftover_y))
+                if best is None or score < best[0]:
+                    best = (score, free_x, free_y)
+        if best is None:
+            return None
+
+        _, x, y = best
+        self._place(x, y, width, height)
+        return x, y
+
+    # Splits every free rect that overlaps the placed one into the parts around it
+    def _place(self, x: int, y: int, width: int, height: int):
+        right = x + width
+        bottom = y + height
+        split = []
+        for free in self.free:
+            free_x, free_y, free_width, free_height = free
+            free_right = free_x + free_width
+            free_bottom = free_y + free_height
+            if x >= free_right or right <= free_x or y >= free_bottom or bottom <= free_y:
+                split.append(free)
+                continue
+            if x > free_x:
+                split.append((free_x, free_y, x - free_x, free_height))
+            if right < free_right:
+                split.append((right, free_y, free_right - right, free_height))
+            if y > free_y:
+                split.append((free_x, free_y, free_width, y - free_y))
+            if bottom < free_bottom:
+                split.append((free_x, bottom, free_width, free_bottom - bottom))
+
+        # drop free rects that are inside another one, they can never give a better fit
+        self.free = [
+            rect
+            for i, rect in enumerate(split)
+            if not any(
+                j != i
+                and other[0] <= rect[0]
+                and other[1] <= rect[1]
+                and other[0] + other[2] >= rect[0] + rect[2]
+                and other[1] + other[3] >= rect[1] + rect[3]
+                and (other != rect or j < i)
+                for j, other in enumerate(split)
+            )
+        ]
+
+
+def _powers_of_two(limit: int) -> list[int]:
+    sizes = []
+    size = 1
+    while size <= limit:
+        sizes.append(size)
+        size *= 2
+    return sizes
+
+
+# Packs as many of the sizes as fit into a width x height page, in order, returns their positions
+# The bin is padding bigger than the page, so images can touch the right and bottom edges
+def _fill_page(sizes: list, width: int, height: int, padding: int) -> dict:
+    packer = MaxRectsBin(width + padding, height + padding)
+    positions = {}
+    for name, (image_width, image_height) in sizes:
+        position = packer.insert(image_width + padding, image_height + padding)
+        if position is not None:
+            positions[name] = position
+    return positions
+
+
+# Returns the pages with the position of every image, sizes maps names to (width, height)
+# Each page is the smallest power of two size that fits the remaining images, when they don't fit
+# in one max_size page, it's filled as much as possible and the rest go on the next page
+def pack_rects(sizes: dict, max_size: int = DEFAULT_MAX_SIZE, padding: int = DEFAULT_PADDING) -> list[AtlasPage]:
+    for name, (width, height) in sizes.items():
+        if width > max_size or height > max_size:
+            raise ValueError(f"{name} is {width}x{height}, bigger than the maximum atlas size of {max_size}")
+
+    # big images first, they're the hardest to fit
+    remaining = sorted(sizes.items(), key=lambda item: (max(item[1]), item[1][0] * item[1][1]), reverse=True)
+    candidates = sorted(
+        ((width, height) for width in _powers_of_two(max_size) for height in _powers_of_two(max_size)),
+        key=lambda size: (size[0] * size[1], abs(size[0] - size[1]), -size[0]),
+    )
+
+    pages = []
+    while remaining:
+        area = sum(width * height for _, (width, height) in remaining)
+        widest = max(width for _, (width, _) in remaining)
+        tallest = max(height for _, (_, height) in remaining)
+        for width, height in candidates:
+            if width * height < area or width < widest or height < tallest:
+                continue
+            positions = _fill_page(remaining, width, height, padding)
+            if len(positions) == len(remaining):
+                break
+        else:
+            width = height = max_size
+            positions = _fill_page(remaining, width, height, padding)
+        pages.append(AtlasPage(width, height, positions))
+        remaining = [item for item in remaining if item[0] not in positions]
+    return pages
+
+
+def report_pages(pages: list[AtlasPage], sizes: dict) -> AtlasReport:
+    return AtlasReport(
+        [(page.width, page.height, len(page.positions)) for page in pages],
+        sum(width * height for width, height in sizes.values()),
+        sum(page.width * page.height for page in pages),
+    )
+
+
+# Packs surfaces into transparent pages named stem0.png, stem1.png..., returns the index, the page
+# surfaces and a report. grids maps names to the (width, height) of their animation frames
+# Images with a colorkey lose the keyed pixels, they become transparent in the page
+def build_atlas(
+    images: dict,
+    max_size: int = DEFAULT_MAX_SIZE,
+    padding: int = DEFAULT_PADDING,
+    grids: dict | None = None,
+    stem: str = "atlas",
+) -> tuple[dict, list, AtlasReport]:
+    import pygame
+
+    grids = grids or {}
+    sizes = {name: image.size for name, image in images.items()}
+    pages = pack_rects(sizes, max_size, padding)
+
+    surfaces = []
+    sprites = {}
+    for number, page in enumerate(pages):
+        surface = pygame.Surface((page.width, page.height), pygame.SRCALPHA)
+        surface.fblits([(images[name], position) for name, position in page.positions.items()])
+        surfaces.append(surface)
+        for name, (x, y) in page.positions.items():
+            sprites[name] = [number, x, y, *sizes[name], *grids.get(name, ())]
+
+    index = {
+        "version": VERSION,
+        "pages": [f"{stem}{number}.png" for number in range(len(pages))],
+        "sprites": {name: sprites[name] for name in sorted(sprites)},
+    }
+    return index, surfaces, report_pages(pages, sizes)
+
+
+# Image files in the given files and folders, keyed by their path relative to root with / separators
+# Pages of an existing atlas named like the index are skipped, so packing a folder twice works
+def find_images(paths: list[str], root: str, index_path: str) -> dict[str, str]:
+    stem = os.path.splitext(os.path.basename(index_path))[0]
+    page_pattern = re.compile(re.escape(stem) + r"\d+\.png")
+    index_dir = os.path.abspath(os.path.dirname(index_path))
+
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(IMAGE_SUFFIXES):
+                        if os.path.abspath(dirpath) == index_dir and page_pattern.fullmatch(filename):
+                            continue
+                        found.append(os.path.join(dirpath, filename))
+        else:
+            found.append(path)
+
+    images = {}
+    for path in found:
+        name = os.path.relpath(path, root).replace(os.sep, "/")
+        if name.startswith("../"):
+            name = os.path.basename(path)
+        if name in images:
+            raise ValueError(f"{path} and {images[name]} would both be called {name} in the atlas")
+        images[name] = path
+    return images
+
+
+# Builds an atlas from image files, writes its pages next to index_path and returns the report
+# colorkeys maps names to the color that becomes transparent, like the player's magenta background
+def pack_atlas(
+    image_paths: dict[str, str],
+    index_path: str,
+    max_size: int = DEFAULT_MAX_SIZE,
+    padding: int = DEFAULT_PADDING,
+    grids: dict | None = None,
+    colorkeys: dict | None = None,
+) -> AtlasReport:
+    import pygame
+
+    grids = grids or {}
+    colorkeys = colorkeys or {}
+    for name in [*grids, *colorkeys]:
+        if name not in image_paths:
+            raise ValueError(f"{name} is not one of the packed images")
+
+    images = {}
+    for name, path in image_paths.items():
+        image = pygame.image.load(path)
+        if name in colorkeys:
+            image.set_colorkey(colorkeys[name])
+        images[name] = image
+    for name, (width, height) in grids.items():
+        image_width, image_height = images[name].size
+        if image_width % width or image_height % height:
+            raise ValueError(f"{name} is {image_width}x{image_height}, which isn't a grid of {width}x{height} frames")
+
+    stem = os.path.splitext(os.path.basename(index_path))[0]
+    index, surfaces, report = build_atlas(images, max_size, padding, grids, stem)
+
+    index_dir = os.path.dirname(index_path)
+    if index_dir:
+        os.makedirs(index_dir, exist_ok=True)
+    for page_name, surface in zip(index["pages"], surfaces):
+        pygame.image.save(surface, os.path.join(index_dir, page_name))
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    return report
+
+
+class Atlas:
+    # pages are the page surfaces in the order of index["pages"], already converted for blitting
+    def __init__(self, index: dict, pages: list):
+        if index.get("version") != VERSION:
+            raise ValueError("Unsupported atlas index version")
+        self.pages = pages
+        self.sprites = index["sprites"]
+        # subsurfaces are created once, they share pixels with the page
+        self.surfaces = {}
+        self.frame_lists = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sprites
+
+    def names(self) -> list[str]:
+        return list(self.sprites)
+
+    # The page and source rect of an image, for blit(page, pos, rect)
+    def rect(self, name: str):
+        import pygame
+
+        page, x, y, width, height = self.sprites[name][:5]
+        return self.pages[page], pygame.Rect(x, y, width, height)
+
+    # A subsurface of the page showing only this image
+    def get(self, name: str):
+        surface = self.surfaces.get(name)
+        if surface is None:
+            page, rect = self.rect(name)
+            surface = self.surfaces[name] = page.subsurface(rect)
+        return surface
+
+    # Source rects of the image's frames on its page, left to right then top to bottom
+    # frame_size is only needed for images that were packed without a grid
+    def frame_rects(self, name: str, frame_size: tuple[int, int] | None = None) -> list:
+        import pygame
+
+        page, x, y, width, height, *grid = self.sprites[name]
+        if frame_size is None:
+            if not grid:
+                raise ValueError(f"{name} was packed without a frame grid")
+            frame_size = grid
+        frame_width, frame_height = frame_size
+        return [
+            pygame.Rect(x + frame_x, y + frame_y, frame_width, frame_height)
+            for frame_y in range(0, height - frame_height + 1, frame_height)
+            for frame_x in range(0, width - frame_width + 1, frame_width)
+        ]
+
+    # Subsurfaces of the image's frames, in the same order as frame_rects
+    def frames(self, name: str, frame_size: tuple[int, int] | None = None) -> list:
+        key = (name, frame_size)
+        frames = self.frame_lists.get(key)
+        if frames is None:
+            page = self.pages[self.sprites[name][0]]
+            frames = self.frame_lists[key] = [page.subsurface(rect) for rect in self.frame_rects(name, frame_size)]
+        return frames
+
+
+# Reads the index and decodes the pages without converting them, so it can run on an asset loader thread
+# assets is an asset source from pygame_ios.assetpack.open_assets, without one index_name is a file path
+def read_atlas(index_name: str, assets=None) -> tuple[dict, list]:
+    if assets is None:
+        from pygame_ios.assetpack import LooseAssets
+
+        assets = LooseAssets(os.path.dirname(index_name))
+        index_name = os.path.basename(index_name)
+
+    index = assets.load_json(index_name)
+    folder = posixpath.dirname(index_name)
+    pages = [assets.load_image(posixpath.join(folder, page)) for page in index["pages"]]
+    return index, pages
+
+
+# Loads an atlas and converts its pages, the display has to exist
+def load_atlas(index_name: str, assets=None) -> Atlas:
+    index, pages = read_atlas(index_name, assets)
+    return Atlas(index, [page.convert_alpha() for page in pages])
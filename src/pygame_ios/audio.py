@@ -0,0 +1,353 @@
+"""Sound effects converted to the mixer's format at build time, and playing them on reserved channels.
+
+pack_sounds() decodes sound effects and converts them to raw PCM in exactly the format the game
+opens the mixer with, then stores them in one bank file. Sounds made from the bank skip decoding,
+resampling and channel conversion. pygame.mixer.Sound always copies the samples it's given, so every
+sound still takes its size in memory once. The bank creates each Sound once and hands out that one:
+
+    pygame.mixer.pre_init(DEFAULT_FREQUENCY, DEFAULT_SIZE, DEFAULT_CHANNELS, allowedchanges=0)
+    pygame.init()
+    bank = open_sound_bank("assets/sounds.sndbank", assets)
+    footsteps = reserve_channels(2)
+    footsteps.play(bank.sound("footstep1.wav"))
+
+Long music tracks are streamed instead of being stored in the bank. pack_sounds() reports how much
+CPU decoding them costs, and can convert them to WAV files in the mixer format, which stream
+without being decoded but are many times bigger than compressed files.
+"""
+
+import mmap
+import os
+import struct
+import time
+import wave
+from typing import NamedTuple
+
+BANK_SUFFIX = ".sndbank"
+MAGIC = b"PGIOSND\0"
+VERSION = 1
+ALIGNMENT = 64
+
+# pygame's default mixer format, sizes are in bits and negative for signed samples
+DEFAULT_FREQUENCY = 44100
+DEFAULT_SIZE = -16
+DEFAULT_CHANNELS = 2
+# sounds up to this many seconds long go in the bank, longer ones are streamed as music
+DEFAULT_MAX_LENGTH = 10.0
+SOUND_SUFFIXES = (".wav", ".ogg", ".mp3", ".flac", ".opus")
+
+# magic, version, reserved, frequency, size, channels, sound count, table of contents size
+HEADER = struct.Struct("<8sHHihHII")
+# offset, size, name length, followed by the UTF-8 name
+ENTRY = struct.Struct("<QQH")
+
+
+class PackedSound(NamedTuple):
+    name: str
+    seconds: float
+    # size of the source file and of the PCM data
+    source_size: int
+    size: int
+    # the source was decoded, or didn't match the mixer format
+    converted: bool
+
+
+class StreamedTrack(NamedTuple):
+    name: str
+    seconds: float
+    # CPU time spent decoding and converting it, per second of audio
+    decode_cost: float
+    # path of the WAV it was converted to, or None
+    converted_path: str | None
+    # size of the source file, and of its samples in the mixer format, which is the size of the WAV
+    source_size: int
+    pcm_size: int
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def describe_format(frequency: int, size: int, channels: int) -> str:
+    layout = {1: "mono", 2: "stereo"}.get(channels, f"{channels} channels")
+    return f"{frequency} Hz {layout} {abs(size)}-bit"
+
+
+# Sound files in the given files and folders, keyed by their path relative to root with / separators
+def find_sounds(paths: list[str], root: str) -> dict[str, str]:
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                found.extend(
+                    os.path.join(dirpath, filename)
+                    for filename in sorted(filenames)
+                    if filename.lower().endswith(SOUND_SUFFIXES)
+                )
+        else:
+            found.append(path)
+
+    sounds = {}
+    for path in found:
+        name = os.path.relpath(path, root).replace(os.sep, "/")
+        if name.startswith("../"):
+            name = os.path.basename(path)
+        if name in sounds:
+            raise ValueError(f"{path} and {sounds[name]} would both be called {name} in the bank")
+        sounds[name] = path
+    return sounds
+
+
+# (frequency, size, channels) of a PCM WAV file, or None for anything SDL has to decode
+def wav_format(path: str) -> tuple[int, int, int] | None:
+    try:
+        with wave.open(path) as f:
+            width = f.getsampwidth()
+            # 8-bit WAVs are unsigned, wider ones are signed
+            return f.getframerate(), 8 if width == 1 else -8 * width, f.getnchannels()
+    except (wave.Error, EOFError):
+        return None
+
+
+# Opens the mixer in the target format, SDL converts every sound loaded from then on to it
+# The build doesn't play anything, so it runs without a sound card
+def _init_mixer(frequency: int, size: int, channels: int) -> tuple[int, int, int]:
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+
+    pygame.mixer.quit()
+    try:
+        pygame.mixer.init(frequency, size, channels, allowedchanges=0)
+    except (pygame.error, ValueError) as e:
+        raise ValueError(f"The mixer can't be opened as {describe_format(frequency, size, channels)}: {e}")
+    return pygame.mixer.get_init()
+
+
+def _write_wav(path: str, samples: bytes, mixer_format: tuple[int, int, int]):
+    frequency, size, channels = mixer_format
+    if size not in (8, -16):
+        raise ValueError("Tracks can only be converted to WAV with 8-bit or signed 16-bit samples")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(abs(size) // 8)
+        f.setframerate(frequency)
+        f.writeframes(samples)
+
+
+# Writes the sounds up to max_length seconds long to a bank, in the given mixer format
+# Longer ones are returned as tracks, with stream_pcm they're written as WAVs in the mixer format
+# next to the bank. Returns the packed sounds and the tracks
+def pack_sounds(
+    sound_paths: dict[str, str],
+    bank_path: str,
+    frequency: int = DEFAULT_FREQUENCY,
+    size: int = DEFAULT_SIZE,
+    channels: int = DEFAULT_CHANNELS,
+    max_length: float = DEFAULT_MAX_LENGTH,
+    stream_pcm: bool = False,
+) -> tuple[list[PackedSound], list[StreamedTrack]]:
+    import pygame
+
+    mixer_format = _init_mixer(frequency, size, channels)
+    bank_dir = os.path.dirname(bank_path)
+    if bank_dir:
+        os.makedirs(bank_dir, exist_ok=True)
+    packed = []
+    tracks = []
+    samples = {}
+    for name, path in sorted(sound_paths.items()):
+        start = time.perf_counter()
+        try:
+            sound = pygame.mixer.Sound(path)
+        except pygame.error as e:
+            raise ValueError(f"{path} could not be decoded: {e}")
+        decode_time = time.perf_counter() - start
+        seconds = sound.get_length()
+
+        if seconds <= max_length:
+            samples[name] = sound.get_raw()
+            converted = wav_format(path) != mixer_format
+            packed.append(PackedSound(name, seconds, os.path.getsize(path), len(samples[name]), converted))
+            continue
+
+        raw = sound.get_raw()
+        converted_path = None
+        if stream_pcm:
+            converted_path = os.path.join(bank_dir, os.path.splitext(os.path.basename(path))[0] + ".wav")
+            if os.path.abspath(converted_path) == os.path.abspath(path):
+                if wav_format(path) != mixer_format:
+                    raise ValueError(f"Converting {path} would overwrite it, move it or pass another --output")
+                converted_path = None
+            else:
+                _write_wav(converted_path, raw, mixer_format)
+        tracks.append(
+            StreamedTrack(name, seconds, decode_time / seconds, converted_path, os.path.getsize(path), len(raw))
+        )
+
+    names = list(samples)
+    encoded_names = [name.encode("utf-8") for name in names]
+    toc_size = sum(ENTRY.size + len(name) for name in encoded_names)
+    offset = _align(HEADER.size + toc_size)
+    entries = []
+    for name in names:
+        entries.append((offset, len(samples[name])))
+        offset = _align(offset + len(samples[name]))
+
+    tmp_path = bank_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, *mixer_format, len(names), toc_size))
+        for name, (offset, sample_size) in zip(encoded_names, entries):
+            f.write(ENTRY.pack(offset, sample_size, len(name)))
+            f.write(name)
+        for name, (offset, _) in zip(names, entries):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(samples[name])
+    os.replace(tmp_path, bank_path)
+    return packed, tracks
+
+
+class SoundBank:
+    # data is the bank's bytes, like a mapped file or an asset pack buffer, Sounds copy their samples out of it
+    def __init__(self, data, name: str = "sound bank"):
+        self.name = name
+        self.data = memoryview(data)
+        magic, version, _, frequency, size, channels, count, _ = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{name} is not a pygame-ios sound bank")
+        self.format = (frequency, size, channels)
+
+        self.entries = {}
+        position = HEADER.size
+        for _ in range(count):
+            offset, sample_size, name_length = ENTRY.unpack_from(self.data, position)
+            position += ENTRY.size
+            sound_name = self.data[position : position + name_length].tobytes().decode("utf-8")
+            position += name_length
+            self.entries[sound_name] = (offset, sample_size)
+        self.sounds = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def names(self) -> list[str]:
+        return list(self.entries)
+
+    # The samples are only valid in the format the bank was built for, so the mixer has to match it
+    def check_mixer(self):
+        import pygame
+
+        mixer_format = pygame.mixer.get_init()
+        if mixer_format != self.format:
+            mixer = describe_format(*mixer_format) if mixer_format else "not initialised"
+            raise ValueError(
+                f"{self.name} was built for {describe_format(*self.format)}, but the mixer is {mixer}. "
+                "Call pygame.mixer.pre_init with the bank's format and allowedchanges=0 before pygame.init"
+            )
+
+    # Creates the Sound once from the bank's samples, which pygame copies, later calls return the same Sound
+    def sound(self, name: str):
+        import pygame
+
+        sound = self.sounds.get(name)
+        if sound is None:
+            self.check_mixer()
+            try:
+                offset, size = self.entries[name]
+            except KeyError:
+                raise FileNotFoundError(f"{name} is not in {self.name}") from None
+            sound = self.sounds[name] = pygame.mixer.Sound(buffer=self.data[offset : offset + size])
+        return sound
+
+
+# Opens a bank and creates all of its sounds, so it can run on an asset loader thread
+# assets is an asset source from pygame_ios.assetpack.open_assets, without one bank_name is a file path
+def open_sound_bank(bank_name: str, assets=None) -> SoundBank:
+    if assets is None:
+        with open(bank_name, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        data = assets.buffer(bank_name)
+    bank = SoundBank(data, bank_name)
+    for name in bank.names():
+        bank.sound(name)
+    return bank
+
+
+# Channels reserved for one kind of sound, like footsteps, so playing them never has to search for
+# a free channel and never cuts off other sounds. When all are busy, the oldest sound is replaced
+class ChannelPool:
+    def __init__(self, channels: list):
+        self.channels = channels
+        self.next = 0
+
+    def play(self, sound, loops: int = 0, volume: float | None = None):
+        for channel in self.channels:
+            if not channel.get_busy():
+                break
+        else:
+            channel = self.channels[self.next]
+            self.next = (self.next + 1) % len(self.channels)
+        if volume is not None:
+            channel.set_volume(volume)
+        channel.play(sound, loops)
+        return channel
+
+    def stop(self):
+        for channel in self.channels:
+            channel.stop()
+
+    # Stops the channels and gives them back, the next reserve_channels can reuse them
+    def release(self):
+        import pygame
+
+        if self in _reservations:
+            _reservations.remove(self)
+            if pygame.mixer.get_init():
+                self.stop()
+                pygame.mixer.set_reserved(_reserved_end())
+
+
+# pools returned by reserve_channels and not released yet. They only last as long as the mixer,
+# pygame.quit forgets them, and so does a mixer opened again with fewer channels than they use
+_reservations = []
+_quit_registered = False
+
+
+def _reserved_end() -> int:
+    return max((pool.channels[-1].id + 1 for pool in _reservations), default=0)
+
+
+def _forget_reservations():
+    _reservations.clear()
+
+
+# Reserves count mixer channels, Sound.play and find_channel won't use them anymore
+# Channels of released pools are reused first
+def reserve_channels(count: int) -> ChannelPool:
+    import pygame
+
+    global _quit_registered
+    if count < 1:
+        raise ValueError("At least one channel has to be reserved")
+    if not _quit_registered:
+        pygame.register_quit(_forget_reservations)
+        _quit_registered = True
+    num_channels = pygame.mixer.get_num_channels()
+    _reservations[:] = [pool for pool in _reservations if pool.channels[-1].id < num_channels]
+
+    # the first gap between the reserved channels that fits, or the end
+    first = 0
+    for pool in sorted(_reservations, key=lambda pool: pool.channels[0].id):
+        if pool.channels[0].id - first >= count:
+            break
+        first = pool.channels[-1].id + 1
+
+    reserved = max(_reserved_end(), first + count)
+    # leave pygame's default of 8 channels for everything else
+    if num_channels < reserved + 8:
+        pygame.mixer.set_num_channels(reserved + 8)
+    pygame.mixer.set_reserved(reserved)
+    pool = ChannelPool([pygame.mixer.Channel(i) for i in range(first, first + count)])
+    _reservations.append(pool)
+    return pool
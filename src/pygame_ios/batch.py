@@ -0,0 +1,165 @@
+"""Batch builds of many projects and pygame-ce versions, described in one TOML file.
+
+    jobs = 4
+    report = "build-report.json"
+
+    [defaults]
+    pygame_ce = "2.5.5"
+    precompile = true
+
+    [[job]]
+    name = "rpg"
+    project = "games/rpg"
+    script = "main.py"
+
+    [[job]]
+    name = "rpg-2.5.4"
+    project = "games/rpg"
+    script = "main.py"
+    pygame_ce = "2.5.4"
+    template = "templates/pygame-ios-template-2.5.4.zip"
+    output = "build/rpg-2.5.4"
+
+Every job takes its settings from [defaults] unless it sets them itself. Paths are relative to the
+TOML file. Jobs without a template zip, or with template = "", download the release template for
+their pygame-ce version. Each template is downloaded and extracted once, however many jobs use it.
+"""
+
+import os
+import tomllib
+from dataclasses import dataclass, field
+
+REPORT_VERSION = 1
+
+# settings of a job and their types, project, script and pygame_ce are required
+JOB_SETTINGS = {
+    "name": str,
+    "project": str,
+    "script": str,
+    "pygame_ce": str,
+    "template": str,
+    "output": str,
+    "precompile": bool,
+    "optimize": int,
+    "strip_sources": bool,
+    "prune": bool,
+    "pack_assets": bool,
+    "update_template": bool,
+}
+REQUIRED_SETTINGS = ("project", "script", "pygame_ce")
+
+
+class BatchError(Exception):
+    pass
+
+
+@dataclass
+class BatchJob:
+    name: str
+    project: str
+    script: str
+    pygame_ce: str
+    # Xcode template folder the job builds into
+    output: str
+    # local template zip, or None to use the release template
+    template: str | None = None
+    precompile: bool = False
+    optimize: int = 0
+    strip_sources: bool = False
+    prune: bool = False
+    pack_assets: bool = False
+    # replace files of an existing output that were changed since it was extracted, like --update-template
+    update_template: bool = False
+    # folder names left out of the project files, so no job copies another job's output
+    ignore_names: set[str] = field(default_factory=set)
+
+    # Jobs with the same key share one download and one extraction
+    @property
+    def template_key(self) -> str:
+        return f"zip:{self.template}" if self.template else f"release:{self.pygame_ce}"
+
+
+def _job_setting(settings: dict, key: str, where: str):
+    value = settings[key]
+    expected = JOB_SETTINGS[key]
+    # TOML has no separate version type, so allow pygame_ce = 2.5 style numbers too
+    if key == "pygame_ce" and isinstance(value, (int, float)):
+        value = str(value)
+    if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+        raise BatchError(f"{key} in {where} must be a {expected.__name__}")
+    return value
+
+
+# Parses and checks a batch file, returns the jobs and the top level settings
+def load_batch(batch_path: str, default_output_name: str) -> tuple[list[BatchJob], dict]:
+    try:
+        with open(batch_path, "rb") as f:
+            data = tomllib.load(f)
+    except OSError as e:
+        raise BatchError(f"Could not read {batch_path}: {e}") from None
+    except tomllib.TOMLDecodeError as e:
+        raise BatchError(f"{batch_path} is not valid TOML: {e}") from None
+
+    base_dir = os.path.dirname(os.path.abspath(batch_path))
+    defaults = data.get("defaults", {})
+    job_tables = data.get("job", [])
+    if not job_tables:
+        raise BatchError(f"{batch_path} doesn't define any [[job]] tables")
+    for key in defaults:
+        if key not in JOB_SETTINGS or key in ("name", "output"):
+            raise BatchError(f"Unknown setting {key} in [defaults]")
+
+    jobs = []
+    for number, table in enumerate(job_tables, 1):
+        where = f"job {number}"
+        settings = {**defaults, **table}
+        for key in settings:
+            if key not in JOB_SETTINGS:
+                raise BatchError(f"Unknown setting {key} in {where}")
+        for key in REQUIRED_SETTINGS:
+            if key not in settings:
+                raise BatchError(f"{where} doesn't set {key}")
+        values = {key: _job_setting(settings, key, where) for key in settings}
+
+        project = os.path.normpath(os.path.join(base_dir, values.pop("project")))
+        name = values.pop("name", None) or f"{os.path.basename(project)}-{values['pygame_ce']}"
+        where = f"job {name}"
+        if not os.path.isfile(os.path.join(project, values["script"])):
+            raise BatchError(f"Entry script {values['script']} of {where} was not found in {project}")
+        # template = "" goes back to the release template when [defaults] sets a zip
+        if not values.get("template"):
+            values.pop("template", None)
+        else:
+            values["template"] = os.path.realpath(os.path.join(base_dir, values["template"]))
+            if not os.path.isfile(values["template"]):
+                raise BatchError(f"Template {values['template']} of {where} does not exist")
+        output = values.pop("output", None)
+        output = os.path.join(base_dir, output) if output else os.path.join(project, default_output_name)
+        jobs.append(BatchJob(name, project, output=os.path.normpath(output), **values))
+
+    names = set()
+    outputs = {}
+    for job in jobs:
+        if job.name in names:
+            raise BatchError(f"There is more than one job called {job.name}")
+        names.add(job.name)
+        if job.output in outputs:
+            raise BatchError(
+                f"Jobs {outputs[job.output]} and {job.name} would both build into {job.output}, give them different outputs"
+            )
+        outputs[job.output] = job.name
+
+    # outputs inside a project folder would be copied into the app by every job building that project
+    for job in jobs:
+        job.ignore_names.add(default_output_name)
+        for output in outputs:
+            relative = os.path.relpath(output, job.project)
+            if relative != "." and not relative.startswith(".."):
+                job.ignore_names.add(relative.split(os.sep)[0])
+
+    settings = {"jobs": data.get("jobs"), "report": data.get("report")}
+    if settings["jobs"] is not None and (not isinstance(settings["jobs"], int) or settings["jobs"] < 1):
+        raise BatchError("jobs must be a whole number of at least 1")
+    if settings["report"] is not None:
+        settings["report"] = os.path.join(base_dir, settings["report"])
+    return jobs, settings
@@ -0,0 +1,307 @@
+"""Measures frame times of the examples without a device.
+
+Run it with `python -m pygame_ios.bench`. The examples run under SDL's dummy drivers with scripted
+input, and every frame is simulated as exactly 1/60 of a second with no frame rate limit.
+
+Save results with --json results.json, and compare later runs against them with
+--baseline results.json. Runs that are slower than the baseline by more than --tolerance
+exit with status 1, so this can run on CI.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from pygame_ios.bench.mapfile import generate_map
+
+FRAME_MS = 1000 / 60
+
+# walk right, down, left, up, then diagonally, then stand still, as (frames, held keys)
+RPG_SCRIPT = [
+    (90, (pygame.K_d,)),
+    (60, (pygame.K_s,)),
+    (90, (pygame.K_a,)),
+    (60, (pygame.K_w,)),
+    (45, (pygame.K_d, pygame.K_s)),
+    (45, (pygame.K_a, pygame.K_w)),
+    (30, ()),
+]
+RPG_SCRIPT_FRAMES = sum(frames for frames, _ in RPG_SCRIPT)
+
+# a finger drags the joystick for part of every FINGER_PERIOD frames
+FINGER_PERIOD = 120
+FINGER_FRAMES = 30
+
+
+class SkipScenario(Exception):
+    pass
+
+
+class FixedTimer:
+    # Replaces the timer of a FixedStepLoop, every frame takes exactly 1/60 s of game time
+    # It's read once per frame
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        self.now += FRAME_MS / 1000
+        return self.now
+
+
+class ScriptedKeys:
+    # Replaces pygame.key.get_pressed, which can't be changed with the dummy video driver
+    def __init__(self):
+        self.pressed = set()
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.pressed
+
+    def get_pressed(self) -> "ScriptedKeys":
+        return self
+
+
+def post_finger_events(frame: int):
+    phase = frame % FINGER_PERIOD
+    x = 0.1 + 0.05 * math.sin(phase / 5)
+    y = 0.8 + 0.05 * math.cos(phase / 5)
+    if phase == 0:
+        event_type = pygame.FINGERDOWN
+    elif phase < FINGER_FRAMES:
+        event_type = pygame.FINGERMOTION
+    elif phase == FINGER_FRAMES:
+        event_type = pygame.FINGERUP
+    else:
+        return
+    pygame.event.post(
+        pygame.event.Event(event_type, touch_id=0, finger_id=0, x=x, y=y, dx=0.0, dy=0.0, pressure=1.0)
+    )
+
+
+def rpg_input(frame: int, keys: ScriptedKeys):
+    position = frame % RPG_SCRIPT_FRAMES
+    for frames, held in RPG_SCRIPT:
+        if position < frames:
+            keys.pressed = set(held)
+            break
+        position -= frames
+    post_finger_events(frame)
+
+
+# Yields a function that runs one frame of the rpg example, map_size replaces the map with a generated one
+@contextmanager
+def rpg_scenario(map_size: int = 0, dirty_rects: bool = False):
+    from pygame_ios.examples import rpg
+
+    random.seed(0)
+    game = rpg.Game(dirty_rects)
+    game.wait_for_assets()
+    game.loop.timer = FixedTimer()
+    if map_size:
+        game.set_map(generate_map(map_size, len(game.tilemap.tiles)), game.map_image)
+
+    keys = ScriptedKeys()
+    get_pressed = pygame.key.get_pressed
+    pygame.key.get_pressed = keys.get_pressed
+
+    def frame(index: int) -> bool:
+        rpg_input(index, keys)
+        return game.loop.tick()
+
+    try:
+        yield frame
+    finally:
+        pygame.key.get_pressed = get_pressed
+        pygame.mixer.music.stop()
+        pygame.quit()
+
+
+# Yields a function that runs one frame of the pymunk example, starting with bodies balls in a grid
+@contextmanager
+def pymunk_scenario(bodies: int):
+    try:
+        from pygame_ios.examples import pymunk as example
+    except ImportError:
+        raise SkipScenario("pymunk is not installed") from None
+
+    random.seed(0)
+    # every ball stays in the scene, without the example's cap and without removing sleeping balls
+    simulation = example.Simulation(max_balls=None, remove_sleeping=False)
+    simulation.loop.timer = FixedTimer()
+
+    # spread the balls over the top 80% of the screen, small enough that they don't overlap
+    spacing = math.sqrt(simulation.w * simulation.h * 0.8 / bodies)
+    radius = max(int(spacing / 2) - 1, 2)
+    columns = max(int(simulation.w // spacing), 1)
+    for i in range(bodies):
+        row, column = divmod(i, columns)
+        position = (spacing * (column + 0.5), simulation.h - spacing * (row + 0.5))
+        example.create_ball(simulation.scene, position, radius)
+
+    def frame(index: int) -> bool:
+        return simulation.loop.tick()
+
+    try:
+        yield frame
+    finally:
+        pygame.quit()
+
+
+def percentile(sorted_times: list[float], fraction: float) -> float:
+    index = min(int(round(fraction * (len(sorted_times) - 1))), len(sorted_times) - 1)
+    return sorted_times[index]
+
+
+# Runs warmup frames, then times every frame after that
+def time_frames(frame, warmup: int, frames: int) -> list[float]:
+    for i in range(warmup):
+        frame(i)
+    times = []
+    perf_counter = time.perf_counter
+    for i in range(warmup, warmup + frames):
+        start = perf_counter()
+        frame(i)
+        times.append((perf_counter() - start) * 1000)
+    return times
+
+
+# Mean memory allocated during a frame, measured as the tracemalloc peak above the start of each frame
+def measure_allocations(frame, start: int, frames: int) -> float:
+    tracemalloc.start()
+    try:
+        total = 0
+        for i in range(start, start + frames):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            frame(i)
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / frames / 1024
+
+
+def run_scenario(scenario, args) -> dict:
+    with scenario as frame:
+        times = sorted(time_frames(frame, args.warmup, args.frames))
+        alloc_kb = None
+        if args.alloc_frames:
+            alloc_kb = measure_allocations(frame, args.warmup + args.frames, args.alloc_frames)
+    return {
+        "frames": len(times),
+        "mean_ms": statistics.fmean(times),
+        "p50_ms": percentile(times, 0.50),
+        "p95_ms": percentile(times, 0.95),
+        "p99_ms": percentile(times, 0.99),
+        "alloc_kb_per_frame": alloc_kb,
+    }
+
+
+def scenarios(args) -> list[tuple[str, object]]:
+    selected = []
+    if args.only in (None, "rpg"):
+        selected.append(("rpg", lambda: rpg_scenario()))
+        for size in args.map_sizes:
+            selected.append((f"rpg-{size}x{size}", lambda size=size: rpg_scenario(size)))
+        selected.append(("rpg-dirty", lambda: rpg_scenario(dirty_rects=True)))
+    if args.only in (None, "pymunk"):
+        for bodies in args.bodies:
+            selected.append((f"pymunk-{bodies}", lambda bodies=bodies: pymunk_scenario(bodies)))
+    return selected
+
+
+def environment() -> dict:
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "sdl": ".".join(map(str, pygame.get_sdl_version())),
+    }
+
+
+def print_results(results: dict):
+    print(f"{'scenario':<16} {'p50':>8} {'p95':>8} {'p99':>8} {'mean':>8} {'alloc/frame':>12}")
+    for name, result in results.items():
+        alloc = result["alloc_kb_per_frame"]
+        alloc_text = "-" if alloc is None else f"{alloc:8.1f} KB"
+        print(
+            f"{name:<16} {result['p50_ms']:5.2f} ms {result['p95_ms']:5.2f} ms "
+            f"{result['p99_ms']:5.2f} ms {result['mean_ms']:5.2f} ms {alloc_text:>12}"
+        )
+
+
+# Returns the names of scenarios whose p50 or p95 got slower than the baseline by more than tolerance
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    print(f"\nCompared to the baseline (tolerance {tolerance:.0%}):")
+    for name, result in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"  {name:<16} not in the baseline")
+            continue
+        changes = []
+        regressed = False
+        for key in ("p50_ms", "p95_ms"):
+            change = result[key] / base[key] - 1 if base[key] else 0.0
+            changes.append(f"{key.removesuffix('_ms')} {change:+.1%}")
+            regressed = regressed or change > tolerance
+        status = "REGRESSION" if regressed else "ok"
+        print(f"  {name:<16} {', '.join(changes):<28} {status}")
+        if regressed:
+            regressions.append(name)
+    if baseline.get("environment") != environment():
+        print("  The baseline was recorded in a different environment, differences may not be regressions.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600, help="timed frames per scenario")
+    parser.add_argument("--warmup", type=int, default=60, help="untimed frames before timing")
+    parser.add_argument("--alloc-frames", type=int, default=120, help="frames traced for allocations, 0 to skip")
+    parser.add_argument("--map-sizes", type=int, nargs="*", default=[256], help="generated rpg map sizes")
+    parser.add_argument("--bodies", type=int, nargs="*", default=[50, 200], help="ball counts for pymunk")
+    parser.add_argument("--only", choices=("rpg", "pymunk"))
+    parser.add_argument("--json", metavar="PATH", help="save the results to a JSON file")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against results saved with --json")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown, 0.15 is 15%%")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    for name, scenario in scenarios(args):
+        try:
+            results[name] = run_scenario(scenario(), args)
+        except SkipScenario as e:
+            print(f"Skipping {name}: {e}")
+
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"\nSaved results to {args.json}")
+
+    if baseline is not None and compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compares loading the rpg example's assets from loose files and from an asset pack.
+
+Run it with `python -m pygame_ios.bench.assetpack`. It runs headless using SDL's dummy drivers.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from pygame_ios.assetpack import AssetPack, LooseAssets, write_pack
+
+EXAMPLES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "examples")
+
+RPG_IMAGES = ["spritesheet.png", "health_pip.png", "player.png", "shadow.png"]
+RPG_SOUNDS = ["footstep1.wav", "footstep2.wav", "footstep3.wav"]
+
+
+# Loads everything Game.__init__ in the rpg example loads, the same way it uses them
+def load_rpg_assets(assets):
+    map_data = assets.load_json("assets/map.json")
+    images = [assets.load_image(f"assets/{name}") for name in RPG_IMAGES]
+    sounds = [assets.load_sound(f"assets/{name}") for name in RPG_SOUNDS]
+    assets.load_music("assets/TownTheme.mp3")
+    return map_data, images, sounds
+
+
+def measure(open_assets, runs: int) -> tuple[float, float]:
+    open_times = []
+    load_times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        assets = open_assets()
+        opened = time.perf_counter()
+        load_rpg_assets(assets)
+        end = time.perf_counter()
+        pygame.mixer.music.unload()
+        open_times.append(opened - start)
+        load_times.append(end - opened)
+    return statistics.median(open_times), statistics.median(load_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    assets_path = os.path.join(EXAMPLES_PATH, "assets")
+    files = {
+        f"assets/{name}": os.path.join(assets_path, name) for name in os.listdir(assets_path)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pack_path = os.path.join(tmp, "assets.pack")
+        write_pack(files, pack_path)
+
+        print(f"Loading the rpg example's assets, median of {args.runs} runs")
+        for name, open_assets in (
+            ("loose files:", lambda: LooseAssets(EXAMPLES_PATH)),
+            ("asset pack:", lambda: AssetPack(pack_path)),
+        ):
+            open_time, load_time = measure(open_assets, args.runs)
+            print(
+                f"  {name:<13} open {open_time * 1000:6.2f} ms, load {load_time * 1000:6.2f} ms, "
+                f"total {(open_time + load_time) * 1000:6.2f} ms"
+            )
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
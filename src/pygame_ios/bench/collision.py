@@ -0,0 +1,95 @@
+"""Measures collision queries against generated maps of growing size.
+
+Run it with `python -m pygame_ios.bench.collision`. Every map gets the same density of walls, and
+each query is a player-sized hitbox at a random position. A linear scan over one rect per collider
+tile, like the rpg example used to do, is shown for comparison.
+"""
+
+import argparse
+import random
+import time
+
+import pygame
+
+from pygame_ios.collision import SpatialGrid
+
+TILE_SIZE = 16
+HITBOX_SIZE = 10
+
+
+# Walls around the edge, rectangular buildings and single tile rocks, about a fifth of the map
+def generate_colliders(size: int) -> set[tuple[int, int]]:
+    rng = random.Random(size)
+    tiles = set()
+    for i in range(size):
+        tiles.update(((i, 0), (i, size - 1), (0, i), (size - 1, i)))
+    for _ in range(size * size // 100):
+        x, y = rng.randrange(size), rng.randrange(size)
+        w, h = rng.randint(2, 8), rng.randint(2, 6)
+        tiles.update((x + i, y + j) for i in range(w) for j in range(h) if x + i < size and y + j < size)
+    for _ in range(size * size // 50):
+        tiles.add((rng.randrange(size), rng.randrange(size)))
+    return tiles
+
+
+def random_hitboxes(size: int, count: int) -> list[pygame.FRect]:
+    rng = random.Random(count)
+    limit = size * TILE_SIZE - HITBOX_SIZE
+    return [
+        pygame.FRect(rng.uniform(0, limit), rng.uniform(0, limit), HITBOX_SIZE, HITBOX_SIZE)
+        for _ in range(count)
+    ]
+
+
+def linear_scan(rects: list[pygame.FRect], hitbox: pygame.FRect) -> list[pygame.FRect]:
+    return [rect for rect in rects if rect.colliderect(hitbox)]
+
+
+def per_call(function, args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for arg in args:
+            function(arg)
+        best = min(best, time.perf_counter() - start)
+    return best / len(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256, 512, 1024])
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--entities", type=int, default=1000, help="hitboxes per query_many call")
+    parser.add_argument("--max-linear", type=int, default=256, help="largest map to run the linear scan on")
+    args = parser.parse_args()
+
+    print(
+        f"{'map':>9} {'tiles':>8} {'merged':>8} {'build':>9} {'query':>9} "
+        f"{'query_many':>11} {'linear scan':>12}"
+    )
+    for size in args.sizes:
+        tiles = generate_colliders(size)
+
+        start = time.perf_counter()
+        grid = SpatialGrid.from_tiles(tiles, TILE_SIZE)
+        build_time = time.perf_counter() - start
+
+        hitboxes = random_hitboxes(size, args.queries)
+        query_time = per_call(grid.query, hitboxes)
+        batches = [hitboxes[i : i + args.entities] for i in range(0, len(hitboxes), args.entities)]
+        many_time = per_call(grid.query_many, batches) / args.entities
+
+        linear = "-"
+        if size <= args.max_linear:
+            flat = [pygame.FRect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE) for x, y in tiles]
+            sample = hitboxes[: max(args.queries // size, 10)]
+            linear = f"{per_call(lambda hitbox: linear_scan(flat, hitbox), sample) * 1e6:9.1f} us"
+
+        print(
+            f"{f'{size}x{size}':>9} {len(tiles):>8} {len(grid):>8} {build_time * 1000:6.1f} ms "
+            f"{query_time * 1e6:6.2f} us {many_time * 1e6:8.2f} us {linear:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Measures how much of the screen the rpg example redraws per frame, with and without dirty rects.
+
+Run it with `python -m pygame_ios.bench.dirty`. Each scene runs the example with scripted keyboard input
+under SDL's dummy drivers, once drawing full frames and once in dirty rect mode. In the idle scene
+the player stands still, in the pace scene they walk back and forth without moving the camera, and
+in the walk scene they walk around the map and the camera follows them.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from pygame_ios.bench.__main__ import RPG_SCRIPT, FixedTimer, ScriptedKeys
+
+# (frames, held keys) repeated for the whole run, like RPG_SCRIPT
+SCENES = {
+    "idle": [(1, ())],
+    # the camera is clamped to the left edge of the map near the spawn point
+    "pace": [(30, (pygame.K_d,)), (30, (pygame.K_a,))],
+    "walk": RPG_SCRIPT,
+}
+
+
+def held_keys(script, frame: int) -> tuple[int, ...]:
+    position = frame % sum(frames for frames, _ in script)
+    for frames, held in script:
+        if position < frames:
+            return held
+        position -= frames
+    return ()
+
+
+# Runs the rpg example and returns per frame times, full frame count and pixel counts
+def run_scene(script, dirty_rects: bool, warmup: int, frames: int) -> dict:
+    from pygame_ios.examples import rpg
+
+    random.seed(0)
+    game = rpg.Game(dirty_rects)
+    game.wait_for_assets()
+    game.loop.timer = FixedTimer()
+    keys = ScriptedKeys()
+    get_pressed = pygame.key.get_pressed
+    pygame.key.get_pressed = keys.get_pressed
+
+    canvas = game.pixel_canvas
+    canvas_pixels = canvas.width * canvas.height
+    times = []
+    full_frames = redrawn = updated = 0
+    try:
+        for i in range(warmup + frames):
+            keys.pressed = set(held_keys(script, i))
+            start = time.perf_counter()
+            game.loop.tick()
+            if i < warmup:
+                continue
+            times.append((time.perf_counter() - start) * 1000)
+            full_frames += canvas.redrawn_pixels == canvas_pixels
+            redrawn += canvas.redrawn_pixels
+            updated += canvas.updated_pixels
+    finally:
+        pygame.key.get_pressed = get_pressed
+        pygame.mixer.music.stop()
+        pygame.quit()
+
+    return {
+        "mean_ms": statistics.fmean(times),
+        "full_frames": full_frames / frames,
+        "redrawn": redrawn / frames / canvas_pixels,
+        "updated_pixels": updated / frames,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--scenes", nargs="+", choices=list(SCENES), default=list(SCENES))
+    args = parser.parse_args()
+
+    print(
+        f"{'scene':<6} {'mode':<6} {'frame':>8} {'full frames':>12} "
+        f"{'canvas redrawn':>15} {'display pixels/frame':>21}"
+    )
+    for scene in args.scenes:
+        for mode, dirty_rects in (("full", False), ("dirty", True)):
+            result = run_scene(SCENES[scene], dirty_rects, args.warmup, args.frames)
+            print(
+                f"{scene:<6} {mode:<6} {result['mean_ms']:5.2f} ms {result['full_frames']:12.0%} "
+                f"{result['redrawn']:15.1%} {result['updated_pixels']:21,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Measures updating and drawing many animated sprites with EntityPool.
+
+Run it with `python -m pygame_ios.bench.entities`. The sprites walk around a world bigger than the
+canvas, with the rpg example's player animations, while the camera pans across it. For comparison,
+the same sprites are also run as one Python object each, animated the way the rpg example animates
+its player.
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from pygame.math import Vector2
+
+from pygame_ios.entities import EntityPool
+
+ASSETS_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "assets")
+CANVAS_SIZE = (300, 170)
+WORLD_SIZE = (1200, 680)
+STEP = 1 / 60
+SPEED = 30
+
+# the rpg example's walk animations, as frame numbers in player.png
+WALK_FRAMES = {"down": [4, 0, 8, 0], "right": [5, 1, 9, 1], "up": [6, 2, 10, 2], "left": [7, 3, 11, 3]}
+ANIMATION_FPS = 1 / 0.15
+DIRECTIONS = {"down": (0, 1), "right": (1, 0), "up": (0, -1), "left": (-1, 0)}
+
+
+def load_spritesheet() -> pygame.Surface:
+    image = pygame.image.load(os.path.join(ASSETS_PATH, "player.png")).convert()
+    image.set_colorkey((255, 0, 255))
+    return image
+
+
+def random_walkers(count: int) -> list[tuple[float, float, str]]:
+    rng = random.Random(count)
+    return [
+        (rng.uniform(0, WORLD_SIZE[0]), rng.uniform(0, WORLD_SIZE[1]), rng.choice(list(WALK_FRAMES)))
+        for _ in range(count)
+    ]
+
+
+def camera_at(frame: int) -> tuple[float, float]:
+    return (
+        -(WORLD_SIZE[0] - CANVAS_SIZE[0]) * (0.5 + 0.5 * np.sin(frame / 200)),
+        -(WORLD_SIZE[1] - CANVAS_SIZE[1]) * (0.5 + 0.5 * np.cos(frame / 300)),
+    )
+
+
+class PoolScene:
+    def __init__(self, image: pygame.Surface, walkers):
+        self.pool = EntityPool(len(walkers))
+        self.pool.add_frames(image, (16, 16))
+        animations = {
+            name: self.pool.add_animation(frames, ANIMATION_FPS) for name, frames in WALK_FRAMES.items()
+        }
+        for x, y, direction in walkers:
+            dx, dy = DIRECTIONS[direction]
+            self.pool.spawn(x, y, animations[direction], dx * SPEED, dy * SPEED)
+
+    def update(self):
+        pool = self.pool
+        pool.update(STEP)
+        np.mod(pool.x, WORLD_SIZE[0], out=pool.x)
+        np.mod(pool.y, WORLD_SIZE[1], out=pool.y)
+
+    def draw(self, canvas: pygame.Surface, camera_pos) -> int:
+        return self.pool.draw(canvas, camera_pos)
+
+
+class Walker:
+    def __init__(self, x: float, y: float, direction: str):
+        self.pos = Vector2(x, y)
+        self.velocity = Vector2(DIRECTIONS[direction]) * SPEED
+        self.anim_prefix = "walk"
+        self.anim_suffix = direction
+        self.anim_timer = 0.0
+        self.anim_index = 0
+
+
+class ObjectScene:
+    def __init__(self, image: pygame.Surface, walkers):
+        self.image = image
+        self.srcrects = [(x, y, 16, 16) for y in (0, 16, 32) for x in (0, 16, 32, 48)]
+        self.anim_set = {f"walk{name}": frames for name, frames in WALK_FRAMES.items()}
+        self.walkers = [Walker(*walker) for walker in walkers]
+
+    def update(self):
+        for walker in self.walkers:
+            walker.pos += walker.velocity * STEP
+            walker.pos.x %= WORLD_SIZE[0]
+            walker.pos.y %= WORLD_SIZE[1]
+            walker.anim_timer += STEP
+            key = f"{walker.anim_prefix}{walker.anim_suffix}"
+            if walker.anim_timer > 1 / ANIMATION_FPS:
+                walker.anim_index = (walker.anim_index + 1) % len(self.anim_set[key])
+                walker.anim_timer = 0.0
+
+    def draw(self, canvas: pygame.Surface, camera_pos) -> int:
+        view = pygame.FRect(-camera_pos[0], -camera_pos[1], *canvas.size)
+        drawn = 0
+        for walker in sorted(self.walkers, key=lambda walker: walker.pos.y):
+            rect = pygame.FRect(walker.pos, (16, 16))
+            if rect.colliderect(view):
+                key = f"{walker.anim_prefix}{walker.anim_suffix}"
+                srcrect = self.srcrects[self.anim_set[key][walker.anim_index]]
+                canvas.blit(self.image, walker.pos + camera_pos, srcrect)
+                drawn += 1
+        return drawn
+
+
+# Returns the mean update and draw times in ms, and the mean number of sprites drawn
+def run(scene, canvas: pygame.Surface, frames: int) -> tuple[float, float, float]:
+    update_time = draw_time = 0.0
+    drawn = 0
+    for frame in range(frames):
+        start = time.perf_counter()
+        scene.update()
+        middle = time.perf_counter()
+        canvas.fill((0, 0, 0))
+        drawn += scene.draw(canvas, camera_at(frame))
+        end = time.perf_counter()
+        update_time += middle - start
+        draw_time += end - middle
+    return update_time * 1000 / frames, draw_time * 1000 / frames, drawn / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--no-objects", action="store_true", help="skip the one object per sprite comparison")
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode(CANVAS_SIZE)
+    image = load_spritesheet()
+    canvas = pygame.Surface(CANVAS_SIZE)
+
+    print(f"{'sprites':>8} {'drawn':>7} {'':<8} {'update':>9} {'draw':>9} {'frame':>9}")
+    for count in args.counts:
+        walkers = random_walkers(count)
+        scenes = [("pool", PoolScene(image, walkers))]
+        if not args.no_objects:
+            scenes.append(("objects", ObjectScene(image, walkers)))
+        for name, scene in scenes:
+            update_ms, draw_ms, drawn = run(scene, canvas, args.frames)
+            print(
+                f"{count:>8} {drawn:>7.0f} {name:<8} {update_ms:6.3f} ms {draw_ms:6.3f} ms "
+                f"{update_ms + draw_ms:6.3f} ms"
+            )
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
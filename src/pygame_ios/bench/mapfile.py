@@ -0,0 +1,150 @@
+"""Compares loading Sprite Fusion maps from JSON and from compiled maps.
+
+Run it with `python -m pygame_ios.bench.mapfile`. It measures the rpg example's map and a generated
+map of --size by --size tiles. Memory is measured in a fresh process for every map and format.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from pygame_ios.mapfile import compile_map, load_map
+
+EXAMPLES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "examples")
+
+
+# Same layout as a Sprite Fusion export, a full ground layer with sparser layers on top
+# Tile IDs are picked from the first tile_count tiles of the spritesheet
+def generate_map(size: int, tile_count: int = 100) -> dict:
+    rng = random.Random(size)
+    spawn = {"id": "0", "x": size // 2, "y": size // 2, "attributes": {"type": "player_spawn"}}
+    layers = [{"name": "entities", "collider": False, "tiles": [spawn]}]
+    for name, density, collider in (
+        ("decal", 0.2, True),
+        ("road", 0.1, False),
+        ("ground", 1.0, False),
+    ):
+        tiles = [
+            {"id": str(rng.randrange(tile_count)), "x": x, "y": y}
+            for y in range(size)
+            for x in range(size)
+            if density == 1.0 or rng.random() < density
+        ]
+        layers.append({"name": name, "collider": collider, "tiles": tiles})
+    return {"tileSize": 16, "mapWidth": size, "mapHeight": size, "layers": layers}
+
+
+# What the rpg example needs from a map before it can start: every layer, the colliders and the spawn
+def load_json(path: str):
+    with open(path, encoding="utf-8") as f:
+        map_data = json.load(f)
+    colliders = [
+        (tile["x"], tile["y"])
+        for layer in map_data["layers"]
+        if layer["collider"]
+        for tile in layer["tiles"]
+    ]
+    spawn = next(
+        tile
+        for layer in map_data["layers"]
+        for tile in layer["tiles"]
+        if tile.get("attributes", {}).get("type") == "player_spawn"
+    )
+    return map_data, colliders, spawn
+
+
+def load_compiled(path: str):
+    compiled = load_map(path)
+    return compiled, compiled.collider_tiles(), compiled.find_entity("type", "player_spawn")
+
+
+LOADERS = {"json": load_json, "compiled": load_compiled}
+
+
+def max_rss_kb() -> int:
+    # on Linux ru_maxrss starts at the parent's peak after exec, VmHWM starts from zero
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    import resource
+
+    # macOS reports bytes, Linux reports kilobytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+# Runs in a child process so every measurement starts from the same baseline
+def measure_memory(kind: str, path: str) -> int:
+    before = max_rss_kb()
+    loaded = LOADERS[kind](path)
+    after = max_rss_kb()
+    del loaded
+    return after - before
+
+
+def measure_time(kind: str, path: str, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        LOADERS[kind](path)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def child_memory(kind: str, path: str) -> int:
+    result = subprocess.run(
+        [sys.executable, "-m", "pygame_ios.bench.mapfile", "--memory", kind, path],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--memory", nargs=2, metavar=("FORMAT", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.memory:
+        print(measure_memory(*args.memory))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generated_path = os.path.join(tmp, "generated.json")
+        with open(generated_path, "w") as f:
+            json.dump(generate_map(args.size), f)
+
+        maps = [
+            ("rpg example", os.path.join(EXAMPLES_PATH, "assets", "map.json")),
+            (f"{args.size}x{args.size} generated", generated_path),
+        ]
+        print(f"Loading maps, median of {args.runs} runs, peak memory growth in a fresh process")
+        for name, json_path in maps:
+            compiled_path = os.path.join(tmp, os.path.basename(json_path) + ".pgmap")
+            compile_map(json_path, compiled_path)
+            print(f"  {name}:")
+            for kind, path in (("json", json_path), ("compiled", compiled_path)):
+                load_time = measure_time(kind, path, args.runs)
+                memory = child_memory(kind, path)
+                print(
+                    f"    {kind:<9} {os.path.getsize(path) / 1024:8.1f} KB file, "
+                    f"load {load_time * 1000:8.3f} ms, memory +{memory / 1024:6.1f} MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Stress tests PhysicsScene with thousands of balls, timing stepping and drawing separately.
+
+Run it with `python -m pygame_ios.bench.physics`. Every scene starts with the given number of balls
+in a grid, and new balls keep raining in from the top. The scene is capped at that number, so every
+new ball replaces the oldest one and reuses its body and shape from the pool. With --debug-draw,
+the same frames are also drawn with space.debug_draw for comparison. Needs pymunk.
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from pygame_ios.physics import DEFAULT_MAX_SUBSTEPS, DEFAULT_MIN_SUBSTEPS, PhysicsScene
+
+SCREEN_SIZE = (400, 600)
+STEP = 1 / 60
+COLORS = ["#e94f37", "#f6ae2d", "#86bbd8", "#33658a", "#9bc53d"]
+
+
+def percentile(times: list[float], fraction: float) -> float:
+    times = sorted(times)
+    return times[min(int(round(fraction * (len(times) - 1))), len(times) - 1)]
+
+
+def fill_grid(scene: PhysicsScene, count: int, rng: random.Random) -> float:
+    width, height = SCREEN_SIZE
+    # spread the balls over the screen, small enough that they don't overlap
+    spacing = math.sqrt(width * height * 0.9 / count)
+    radius = max(spacing / 2 - 1, 1.5)
+    columns = max(int(width // spacing), 1)
+    for i in range(count):
+        row, column = divmod(i, columns)
+        position = (spacing * (column + 0.5), height - spacing * (row + 0.5))
+        scene.spawn_ball(position, radius, rng.choice(COLORS))
+    return radius
+
+
+# Returns the times in ms of every step and every draw, and of every debug_draw if it's given options
+def run(scene: PhysicsScene, screen, radius: float, args, rng: random.Random, debug_options=None):
+    step_times = []
+    draw_times = []
+    debug_times = []
+    perf_counter = time.perf_counter
+    for frame in range(args.warmup + args.frames):
+        for _ in range(args.spawn_rate):
+            scene.spawn_ball((rng.uniform(radius, SCREEN_SIZE[0] - radius), radius), radius, rng.choice(COLORS))
+
+        start = perf_counter()
+        scene.step(STEP)
+        stepped = perf_counter()
+        screen.fill("black")
+        scene.draw(screen)
+        drawn = perf_counter()
+        if frame < args.warmup:
+            continue
+        step_times.append((stepped - start) * 1000)
+        draw_times.append((drawn - stepped) * 1000)
+
+        if debug_options is not None:
+            start = perf_counter()
+            screen.fill("black")
+            scene.space.debug_draw(debug_options)
+            debug_times.append((perf_counter() - start) * 1000)
+    return step_times, draw_times, debug_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="*", default=[1000, 3000], help="balls in each scene")
+    parser.add_argument("--frames", type=int, default=300, help="timed frames per scene")
+    parser.add_argument("--warmup", type=int, default=30, help="untimed frames before timing")
+    parser.add_argument("--spawn-rate", type=int, default=5, help="balls spawned every frame")
+    parser.add_argument("--substeps", type=int, help="use this many substeps instead of adapting to the load")
+    parser.add_argument("--debug-draw", action="store_true", help="also time drawing with space.debug_draw")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    min_substeps = max_substeps = args.substeps
+    if args.substeps is None:
+        min_substeps, max_substeps = DEFAULT_MIN_SUBSTEPS, DEFAULT_MAX_SUBSTEPS
+
+    print(f"{'balls':>6} {'step p50':>9} {'p95':>8} {'draw p50':>9} {'p95':>8} {'substeps':>9} {'pool reuse':>11}")
+    for count in args.counts:
+        rng = random.Random(count)
+        scene = PhysicsScene(
+            screen.get_rect(), max_balls=count, min_substeps=min_substeps, max_substeps=max_substeps
+        )
+        scene.add_walls()
+        radius = fill_grid(scene, count, rng)
+        debug_options = None
+        if args.debug_draw:
+            # imported here, so a missing pymunk is reported by pygame_ios.physics with how to install it
+            import pymunk.pygame_util
+
+            debug_options = pymunk.pygame_util.DrawOptions(screen)
+        step_times, draw_times, debug_times = run(scene, screen, radius, args, rng, debug_options)
+
+        reuse = scene.pool.reused / (scene.pool.reused + scene.pool.created)
+        print(
+            f"{count:>6} {percentile(step_times, 0.5):6.2f} ms {percentile(step_times, 0.95):5.2f} ms "
+            f"{percentile(draw_times, 0.5):6.2f} ms {percentile(draw_times, 0.95):5.2f} ms "
+            f"{scene.substeps:>9} {reuse:>11.0%}"
+        )
+        if debug_times:
+            print(
+                f"{'':>6} debug_draw {statistics.median(debug_times):6.2f} ms, "
+                f"{statistics.median(debug_times) / statistics.median(draw_times):.1f}x the draw time"
+            )
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
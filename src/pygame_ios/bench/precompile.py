@@ -0,0 +1,113 @@
+"""Compares import time of a project with and without precompiled bytecode.
+
+The app bundle is read-only on iOS, so without precompilation every launch compiles every module.
+This benchmark reproduces that on desktop with a synthetic package: sources only (compiled on
+every import), precompiled with unchecked hashes, and precompiled with the sources stripped.
+
+Run it with `python -m pygame_ios.bench.precompile`.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from pygame_ios.precompile import precompile_tree
+
+MODULE_TEMPLATE = '''"""Synthetic module {index}."""
+
+import math
+
+
+class Thing{index}:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def length(self):
+        return math.hypot(self.x, self.y)
+
+    def scaled(self, factor):
+        return Thing{index}(self.x * factor, self.y * factor)
+
+'''
+
+FUNCTION_TEMPLATE = '''
+def function_{index}_{n}(values):
+    total = 0
+    for i, value in enumerate(values):
+        if i % 3 == 0:
+            total += value * {n}
+        elif i % 3 == 1:
+            total -= value // ({n} + 1)
+        else:
+            total ^= value
+    return {{"total": total, "name": "function_{index}_{n}", "items": [total, {n}]}}
+'''
+
+
+def write_package(path: str, modules: int, functions: int):
+    package = os.path.join(path, "benchpkg")
+    os.makedirs(package)
+    with open(os.path.join(package, "__init__.py"), "w") as f:
+        for index in range(modules):
+            f.write(f"from . import module{index}\n")
+    for index in range(modules):
+        with open(os.path.join(package, f"module{index}.py"), "w") as f:
+            f.write(MODULE_TEMPLATE.format(index=index))
+            for n in range(functions):
+                f.write(FUNCTION_TEMPLATE.format(index=index, n=n))
+
+
+# Imports the package in a fresh interpreter that never writes bytecode, like a read-only app bundle
+def time_import(path: str) -> float:
+    code = "import time; t = time.perf_counter(); import benchpkg; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-B", "-c", code],
+        cwd=path,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout)
+
+
+def measure(path: str, runs: int) -> float:
+    return statistics.median(time_import(path) for _ in range(runs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, default=200)
+    parser.add_argument("--functions", type=int, default=20, help="functions per module")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--optimize", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = os.path.join(tmp, "sources")
+        precompiled = os.path.join(tmp, "precompiled")
+        stripped = os.path.join(tmp, "stripped")
+
+        write_package(sources, args.modules, args.functions)
+        shutil.copytree(sources, precompiled)
+        shutil.copytree(sources, stripped)
+        precompile_tree(precompiled, sys.executable, args.optimize)
+        precompile_tree(stripped, sys.executable, args.optimize, strip_sources=True)
+
+        print(
+            f"Importing {args.modules} modules with {args.functions} functions each, "
+            f"median of {args.runs} runs (Python {sys.version_info[0]}.{sys.version_info[1]})"
+        )
+        baseline = measure(sources, args.runs)
+        print(f"  sources only:        {baseline * 1000:8.1f} ms")
+        for name, path in (("precompiled:", precompiled), ("sources stripped:", stripped)):
+            elapsed = measure(path, args.runs)
+            print(f"  {name:<20} {elapsed * 1000:8.1f} ms ({baseline / elapsed:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
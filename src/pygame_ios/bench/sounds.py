@@ -0,0 +1,68 @@
+"""Measures loading the rpg example's sounds from their files and from a sound bank.
+
+Run it with `python -m pygame_ios.bench.sounds`. The footsteps are mono WAVs, so loading them makes
+SDL convert them to the mixer's stereo format, while the bank already holds them in that format.
+The music is decoded in full from the MP3 and from a WAV in the mixer format, which shows the CPU
+time streaming it costs per second of audio.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from pygame_ios.audio import find_sounds, open_sound_bank, pack_sounds
+
+ASSETS_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "assets")
+FOOTSTEPS = [f"footstep{i}.wav" for i in range(1, 4)]
+
+
+# Median time of function in ms
+def measure(function, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        bank_path = os.path.join(folder, "sounds.sndbank")
+        sounds = find_sounds([ASSETS_PATH], ASSETS_PATH)
+        _, tracks = pack_sounds(sounds, bank_path, stream_pcm=True)
+        # pack_sounds opens the mixer in the bank's format, the game does the same with pre_init
+        pygame.init()
+
+        footstep_paths = [os.path.join(ASSETS_PATH, name) for name in FOOTSTEPS]
+        files_ms = measure(lambda: [pygame.mixer.Sound(path) for path in footstep_paths], args.runs)
+        bank_ms = measure(lambda: open_sound_bank(bank_path), args.runs)
+        print(f"{'footsteps':<24} {'load time':>10}")
+        print(f"{'WAV files':<24} {files_ms:7.3f} ms")
+        print(f"{'sound bank':<24} {bank_ms:7.3f} ms")
+
+        print()
+        print(f"{'music':<24} {'decode time':>12} {'per second of audio':>20}")
+        for track in tracks:
+            mp3_path = os.path.join(ASSETS_PATH, track.name)
+            for label, path in (("MP3", mp3_path), ("WAV in the mixer format", track.converted_path)):
+                seconds = pygame.mixer.Sound(path).get_length()
+                decode_ms = measure(lambda: pygame.mixer.Sound(path), max(1, args.runs // 10))
+                print(f"{label:<24} {decode_ms:9.1f} ms {decode_ms / seconds:17.3f} ms")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Measures how long the rpg example takes to show its first frame and to start the game.
+
+Run it with `python -m pygame_ios.bench.startup`. Every run starts a new Python process under SDL's
+dummy drivers, so importing pygame and the example is included. Times are counted from the start
+of the process, and the longest freeze is the longest time between two frames after the first one.
+The modes are:
+
+- main thread: every asset is loaded on the main thread before the first frame, like the example used to
+- thread pool: assets are decoded on the thread pool, but the game still waits for all of them
+- background: the game shows a loading screen at 60 FPS while the thread pool loads the assets
+"""
+
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+MODES = ["main thread", "thread pool", "background"]
+
+
+# Runs in the child process, returns the times of every frame until the game has started
+def run_child(mode: str) -> dict:
+    import pygame
+
+    frames = []
+
+    def recorded(function):
+        def wrapper(*args):
+            function(*args)
+            frames.append(time.perf_counter() - STARTED)
+
+        return wrapper
+
+    pygame.display.flip = recorded(pygame.display.flip)
+    pygame.display.update = recorded(pygame.display.update)
+
+    from pygame_ios.examples import rpg
+
+    if mode == "background":
+        game = rpg.Game()
+        clock = pygame.Clock()
+        while game.loading:
+            game.loop.tick()
+            clock.tick(60)
+    else:
+        if mode == "main thread":
+            rpg.Game.draw_loading_screen = lambda self, progress: None
+        game = rpg.Game(asset_workers=0 if mode == "main thread" else None)
+        game.wait_for_assets()
+        game.loop.tick()
+
+    pygame.mixer.music.stop()
+    pygame.quit()
+    gaps = [later - earlier for earlier, later in zip(frames, frames[1:])]
+    return {"first_frame": frames[0], "ready": frames[-1], "longest_freeze": max(gaps, default=0.0)}
+
+
+def measure(mode: str, runs: int) -> dict:
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "pygame_ios.bench.startup", "--child", mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+    return {key: statistics.median(result[key] for result in results) for key in results[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child)))
+        return
+
+    print(f"{'mode':<12} {'first frame':>12} {'game started':>13} {'longest freeze':>15}")
+    for mode in MODES:
+        result = measure(mode, args.runs)
+        print(
+            f"{mode:<12} {result['first_frame'] * 1000:9.1f} ms {result['ready'] * 1000:10.1f} ms "
+            f"{result['longest_freeze'] * 1000:12.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""User-level cache of downloaded Xcode templates."""
+
+import json
+import os
+import sys
+import time
+
+CACHE_DIR_ENV = "PYGAME_IOS_CACHE_DIR"
+CACHE_SIZE_ENV = "PYGAME_IOS_CACHE_SIZE"
+METADATA_TTL_ENV = "PYGAME_IOS_METADATA_TTL"
+
+# Maximum size of all cached templates in megabytes, least recently used templates are evicted first
+DEFAULT_CACHE_SIZE_MB = 2048
+
+# Seconds the latest release tag and the supported versions are used without asking GitHub again
+DEFAULT_METADATA_TTL = 3600
+
+
+def get_cache_dir() -> str:
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/pygame-ios")
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        return os.path.join(os.environ["LOCALAPPDATA"], "pygame-ios", "Cache")
+    xdg_cache = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(xdg_cache, "pygame-ios")
+
+
+def get_cache_size() -> int:
+    return int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE_MB)) * 1024 * 1024
+
+
+def get_metadata_ttl() -> float:
+    return float(os.environ.get(METADATA_TTL_ENV, DEFAULT_METADATA_TTL))
+
+
+class TemplateCache:
+    INDEX_NAME = "index.json"
+
+    def __init__(self, cache_dir: str | None = None, max_size: int | None = None):
+        self.cache_dir = cache_dir or get_cache_dir()
+        self.max_size = get_cache_size() if max_size is None else max_size
+        self.index_path = os.path.join(self.cache_dir, self.INDEX_NAME)
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault("latest_release", None)
+        index.setdefault("supported_versions", None)
+        index.setdefault("templates", {})
+        return index
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # write to a temporary file first so a concurrent reader never sees half an index
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def key(tag: str, version: str) -> str:
+        return f"{tag}/{version}"
+
+    def template_path(self, tag: str, version: str) -> str:
+        return os.path.join(
+            self.cache_dir, "templates", tag, f"pygame-ios-template-{version}.zip"
+        )
+
+    # The latest release tag and the ETag it was served with, used for conditional requests
+    @property
+    def latest_release(self) -> dict | None:
+        return self.index["latest_release"]
+
+    def set_latest_release(self, tag: str, etag: str | None):
+        self.index["latest_release"] = {"tag": tag, "etag": etag, "checked": time.time()}
+        self.save()
+
+    # The pygame-ce versions that have templates, from pygame-ce.json
+    @property
+    def supported_versions(self) -> dict | None:
+        return self.index["supported_versions"]
+
+    def set_supported_versions(self, versions: list[str], etag: str | None):
+        self.index["supported_versions"] = {"versions": versions, "etag": etag, "checked": time.time()}
+        self.save()
+
+    # Whether cached metadata like latest_release was checked recently enough to use without a request
+    @staticmethod
+    def is_fresh(entry: dict | None, ttl: float | None = None) -> bool:
+        if not entry:
+            return False
+        ttl = get_metadata_ttl() if ttl is None else ttl
+        return time.time() - entry["checked"] < ttl
+
+    # Returns the path of a cached template zip, or None if it hasn't been downloaded yet
+    def get(self, tag: str, version: str) -> str | None:
+        path = self.template_path(tag, version)
+        if not os.path.isfile(path):
+            self.index["templates"].pop(self.key(tag, version), None)
+            return None
+
+        # zips are only ever moved into place once complete, so a file on disk is always usable
+        self.index["templates"][self.key(tag, version)] = {
+            "tag": tag,
+            "version": version,
+            "size": os.path.getsize(path),
+            "last_used": time.time(),
+        }
+        self.save()
+        return path
+
+    # Registers a template zip that has been written to template_path(), then evicts old templates
+    def add(self, tag: str, version: str) -> str:
+        path = self.get(tag, version)
+        if path is None:
+            raise FileNotFoundError(self.template_path(tag, version))
+        self.evict(keep=self.key(tag, version))
+        return path
+
+    # Finds a cached template for the given pygame-ce version without touching the network
+    def find_offline(self, version: str) -> str | None:
+        latest = self.latest_release
+        if latest and os.path.isfile(self.template_path(latest["tag"], version)):
+            return latest["tag"]
+
+        candidates = [
+            entry
+            for entry in self.index["templates"].values()
+            if entry["version"] == version
+            and os.path.isfile(self.template_path(entry["tag"], version))
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda entry: entry["last_used"])["tag"]
+
+    def evict(self, keep: str | None = None) -> list[str]:
+        templates = self.index["templates"]
+        total = sum(entry["size"] for entry in templates.values())
+        evicted = []
+
+        for key, entry in sorted(templates.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            path = self.template_path(entry["tag"], entry["version"])
+            try:
+                os.remove(path)
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                # the tag folder still holds templates for other versions
+                pass
+            total -= entry["size"]
+            evicted.append(key)
+
+        for key in evicted:
+            del templates[key]
+        if evicted:
+            self.save()
+        return evicted
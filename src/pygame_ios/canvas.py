@@ -0,0 +1,226 @@
+"""Pixel art canvas that is scaled up to the window by a whole number without allocating.
+
+    canvas = PixelCanvas(screen, logical_width=300, insets=safe_area_insets)
+    canvas.surface.fill("black")
+    ...draw the game on canvas.surface...
+    canvas.present()
+    canvas.update_display()
+
+With dirty_rects=True only the parts of the canvas that changed are redrawn and sent to the display.
+Mark them with mark_dirty(), or call redraw_all() when everything changes, like when the camera moves:
+
+    canvas.mark_dirty(old_sprite_rect)
+    canvas.mark_dirty(new_sprite_rect)
+    for rect in canvas.begin_frame():
+        canvas.surface.set_clip(rect)
+        ...draw everything that overlaps rect...
+    canvas.surface.set_clip(None)
+    canvas.present()
+    canvas.update_display()
+"""
+
+import math
+
+import pygame
+
+TRANSPARENT = (0, 0, 0, 0)
+
+# when dirty rects cover more of the canvas than this, a full frame is drawn instead
+FULL_FRAME_FRACTION = 0.5
+
+
+class Layer:
+    # A transparent surface drawn over the canvas, like on-screen controls
+    # It keeps what was drawn on it between frames, only the part with visible pixels is blitted
+    def __init__(self, size: tuple[int, int]):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        # the bounding rect when the layer was last presented, it has to be redrawn when the layer changes
+        self.presented_rect = pygame.Rect(0, 0, 0, 0)
+        self.visible = True
+        self.changed = False
+
+    # Erases the layer and returns its surface to draw the new contents on
+    def clear(self) -> pygame.Surface:
+        if self.rect:
+            self.surface.fill(TRANSPARENT, self.rect)
+        self.changed = True
+        return self.surface
+
+    # Bounding rect of the visible pixels, only measured again after the layer was cleared
+    def bounding_rect(self) -> pygame.Rect:
+        if self.changed:
+            self.rect = self.surface.get_bounding_rect()
+            self.changed = False
+        return self.rect
+
+
+class PixelCanvas:
+    # The canvas is the window size divided by the scale factor, so it fills the whole screen
+    # The scale factor is the whole number that makes the safe area closest to logical_width pixels wide,
+    # or logical_height pixels tall if that's given instead
+    # insets are the safe area insets (top, left, bottom, right) in window coordinates
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        logical_width: int | None = None,
+        logical_height: int | None = None,
+        insets: tuple[float, float, float, float] = (0, 0, 0, 0),
+        dirty_rects: bool = False,
+    ):
+        self.screen = screen
+        self.window_size = pygame.display.get_window_size()
+        window_width, window_height = self.window_size
+        top, left, bottom, right = insets
+        safe_width = window_width - left - right
+        safe_height = window_height - top - bottom
+
+        if logical_width is not None:
+            self.scale = max(round(safe_width / logical_width), 1)
+        elif logical_height is not None:
+            self.scale = max(round(safe_height / logical_height), 1)
+        else:
+            self.scale = 1
+
+        # the display surface can be bigger than the window on high density screens
+        self.pixel_ratio = screen.width / window_width
+        pixel_scale = self.scale * self.pixel_ratio
+        self.size = (int(screen.width // pixel_scale), int(screen.height // pixel_scale))
+        self.surface = pygame.Surface(self.size, 0, screen)
+
+        # the scaled canvas is centred, the leftover border is less than one canvas pixel wide
+        scaled_size = (round(self.size[0] * pixel_scale), round(self.size[1] * pixel_scale))
+        self.offset = ((screen.width - scaled_size[0]) // 2, (screen.height - scaled_size[1]) // 2)
+        self.target = screen.subsurface((self.offset, scaled_size))
+
+        # the safe area in canvas coordinates, rounded inwards
+        self.safe_rect = pygame.Rect(
+            math.ceil(left / self.scale),
+            math.ceil(top / self.scale),
+            math.floor(safe_width / self.scale),
+            math.floor(safe_height / self.scale),
+        ).clip(self.surface.get_rect())
+
+        self.layers = []
+
+        self.dirty_rects = dirty_rects
+        self.dirty = []
+        self.full_frame = True
+        self.frame_rects = [self.surface.get_rect()]
+        # canvas pixels redrawn and display pixels updated in the last frame, for benchmarks
+        self.redrawn_pixels = 0
+        self.updated_pixels = 0
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    def add_layer(self) -> Layer:
+        layer = Layer(self.size)
+        self.layers.append(layer)
+        return layer
+
+    # Converts a position in window coordinates to canvas coordinates
+    def to_canvas(self, pos) -> pygame.Vector2:
+        return pygame.Vector2(
+            (pos[0] * self.pixel_ratio - self.offset[0]) / (self.scale * self.pixel_ratio),
+            (pos[1] * self.pixel_ratio - self.offset[1]) / (self.scale * self.pixel_ratio),
+        )
+
+    # Finger events have x and y between 0 and 1, relative to the window
+    def finger_to_canvas(self, event) -> pygame.Vector2:
+        return self.to_canvas((event.x * self.window_size[0], event.y * self.window_size[1]))
+
+    # Marks a rect in canvas coordinates as changed, it's redrawn in the next frame
+    def mark_dirty(self, rect):
+        self.dirty.append(pygame.Rect(rect))
+
+    # Makes the next frame redraw the whole canvas
+    def redraw_all(self):
+        self.full_frame = True
+
+    # Returns the rects of the canvas to redraw this frame, the whole canvas unless dirty_rects is on
+    # Layers that were cleared since the last frame add the rects they covered before and after
+    def begin_frame(self) -> list[pygame.Rect]:
+        canvas_rect = self.surface.get_rect()
+        if self.dirty_rects and not self.full_frame:
+            for layer in self.layers:
+                if layer.changed:
+                    self.dirty.append(layer.presented_rect)
+                    self.dirty.append(layer.bounding_rect())
+            rects = merge_rects([rect.clip(canvas_rect) for rect in self.dirty if rect])
+            if sum(rect.w * rect.h for rect in rects) > canvas_rect.w * canvas_rect.h * FULL_FRAME_FRACTION:
+                self.full_frame = True
+            else:
+                self.frame_rects = rects
+
+        if not self.dirty_rects or self.full_frame:
+            self.frame_rects = [canvas_rect]
+            self.full_frame = True
+        self.dirty.clear()
+        return self.frame_rects
+
+    # Draws the layers onto the canvas, then scales it straight into the display surface
+    # In dirty rect mode only the rects from begin_frame are drawn and scaled
+    def present(self):
+        for layer in self.layers:
+            if layer.visible:
+                rect = layer.bounding_rect()
+                layer.presented_rect = rect
+                if not rect:
+                    continue
+                if self.full_frame:
+                    self.surface.blit(layer.surface, rect, rect)
+                else:
+                    for frame_rect in self.frame_rects:
+                        area = rect.clip(frame_rect)
+                        if area:
+                            self.surface.blit(layer.surface, area, area)
+
+        if self.full_frame:
+            pygame.transform.scale(self.surface, self.target.size, self.target)
+        else:
+            for rect in self.frame_rects:
+                target_rect = self.scaled_rect(rect)
+                pygame.transform.scale(
+                    self.surface.subsurface(rect),
+                    target_rect.size,
+                    self.target.subsurface(target_rect),
+                )
+
+    # Converts a rect in canvas coordinates to pixels of the scaled canvas
+    def scaled_rect(self, rect: pygame.Rect) -> pygame.Rect:
+        pixel_scale = self.scale * self.pixel_ratio
+        left, top = round(rect.left * pixel_scale), round(rect.top * pixel_scale)
+        return pygame.Rect(
+            left, top, round(rect.right * pixel_scale) - left, round(rect.bottom * pixel_scale) - top
+        )
+
+    # Replaces pygame.display.flip(), only the redrawn rects are updated in dirty rect mode
+    def update_display(self):
+        if self.full_frame:
+            pygame.display.flip()
+            self.redrawn_pixels = self.width * self.height
+            self.updated_pixels = self.screen.width * self.screen.height
+        else:
+            window_rects = [self.scaled_rect(rect).move(self.offset) for rect in self.frame_rects]
+            pygame.display.update(window_rects)
+            self.redrawn_pixels = sum(rect.w * rect.h for rect in self.frame_rects)
+            self.updated_pixels = sum(rect.w * rect.h for rect in window_rects)
+        self.full_frame = not self.dirty_rects
+
+
+# Joins overlapping rects until none of them overlap, so no part of the canvas is redrawn twice
+def merge_rects(rects: list[pygame.Rect]) -> list[pygame.Rect]:
+    merged = []
+    for rect in rects:
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect = rect.union(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
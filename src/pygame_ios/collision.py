@@ -0,0 +1,157 @@
+"""Static tilemap collision: merged collider rects stored in a uniform grid.
+
+    colliders = SpatialGrid.from_tiles(tilemap.collider_tiles(), tilemap.tile_size)
+    for wall in colliders.query(player_hitbox):
+        ...
+
+A query only looks at the grid cells the rect overlaps, so it costs the same on any map size.
+"""
+
+from collections.abc import Iterable
+
+import pygame
+
+DEFAULT_CELL_SIZE = 64
+
+
+# Greedy meshing: merges solid tiles into as few rectangles as possible, in tile units (x, y, w, h)
+# Each rect is grown right along its row first, then down while the whole span below is solid
+def merge_tiles(tiles: Iterable[tuple[int, int]]) -> list[tuple[int, int, int, int]]:
+    remaining = set(tiles)
+    rects = []
+    for x, y in sorted(remaining, key=lambda tile: (tile[1], tile[0])):
+        if (x, y) not in remaining:
+            continue
+        width = 1
+        while (x + width, y) in remaining:
+            width += 1
+        height = 1
+        while all((x + i, y + height) in remaining for i in range(width)):
+            height += 1
+        for row in range(y, y + height):
+            for column in range(x, x + width):
+                remaining.discard((column, row))
+        rects.append((x, y, width, height))
+    return rects
+
+
+class SpatialGrid:
+    # Stores rects in every cell_size square cell they overlap, cells without rects aren't stored
+    def __init__(self, rects: Iterable = (), cell_size: int = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.rects = []
+        self.cells = {}
+        for rect in rects:
+            self.insert(rect)
+
+    # Builds the grid from collider tile positions, merging neighbouring tiles first
+    @classmethod
+    def from_tiles(
+        cls, tiles: Iterable[tuple[int, int]], tile_size: int, cell_size: int = DEFAULT_CELL_SIZE
+    ) -> "SpatialGrid":
+        return cls(
+            (
+                pygame.FRect(x * tile_size, y * tile_size, w * tile_size, h * tile_size)
+                for x, y, w, h in merge_tiles(tiles)
+            ),
+            cell_size,
+        )
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def __iter__(self):
+        return iter(self.rects)
+
+    def _cell_range(self, rect) -> tuple[int, int, int, int]:
+        size = self.cell_size
+        x, y, w, h = rect
+        x0 = int(x // size)
+        y0 = int(y // size)
+        # a rect ending exactly on a cell border doesn't overlap the next cell
+        x1 = max(int(-(-(x + w) // size)) - 1, x0)
+        y1 = max(int(-(-(y + h) // size)) - 1, y0)
+        return x0, y0, x1, y1
+
+    def insert(self, rect) -> pygame.FRect:
+        rect = pygame.FRect(rect)
+        index = len(self.rects)
+        self.rects.append(rect)
+        x0, y0, x1, y1 = self._cell_range(rect)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                self.cells.setdefault((cx, cy), []).append(index)
+        return rect
+
+    # Rects overlapping rect, each listed once in the order they were inserted
+    def query(self, rect) -> list[pygame.FRect]:
+        x0, y0, x1, y1 = self._cell_range(rect)
+        cells = self.cells
+        if x0 == x1 and y0 == y1:
+            indices = cells.get((x0, y0), ())
+        else:
+            found = set()
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    found.update(cells.get((cx, cy), ()))
+            indices = sorted(found)
+
+        rects = self.rects
+        candidates = [rects[i] for i in indices]
+        if not candidates:
+            return candidates
+        if not isinstance(rect, pygame.FRect):
+            rect = pygame.FRect(rect)
+        return [candidates[i] for i in rect.collidelistall(candidates)]
+
+    # Same as calling query for every rect, for moving many entities against the colliders each frame
+    # The rects are sorted into the cells they overlap first, so every occupied cell is looked up and
+    # turned into a candidate list once for all the rects in it, instead of once per rect
+    def query_many(self, rects: Iterable) -> list[list[pygame.FRect]]:
+        cells = self.cells
+        size = self.cell_size
+        queries = []
+        by_cell = {}
+        spanning = {}
+        for i, rect in enumerate(rects):
+            if not isinstance(rect, pygame.FRect):
+                rect = pygame.FRect(rect)
+            queries.append(rect)
+            # _cell_range inlined, calling it costs more than the rest of the loop
+            x, y, w, h = rect
+            x0 = int(x // size)
+            y0 = int(y // size)
+            x1 = int(-(-(x + w) // size)) - 1
+            y1 = int(-(-(y + h) // size)) - 1
+            if x1 < x0:
+                x1 = x0
+            if y1 < y0:
+                y1 = y0
+            if x0 == x1 and y0 == y1:
+                if (x0, y0) in cells:
+                    by_cell.setdefault((x0, y0), []).append(i)
+                continue
+            # rects over several cells can find a collider in more than one, they collect indices instead
+            spanning[i] = set()
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    if (cx, cy) in cells:
+                        by_cell.setdefault((cx, cy), []).append(i)
+
+        found = [[] for _ in queries]
+        all_rects = self.rects
+        for cell, query_indices in by_cell.items():
+            indices = cells[cell]
+            candidates = [all_rects[j] for j in indices]
+            for i in query_indices:
+                hits = queries[i].collidelistall(candidates)
+                if not hits:
+                    continue
+                if i in spanning:
+                    spanning[i].update(indices[k] for k in hits)
+                else:
+                    found[i] = [candidates[k] for k in hits]
+
+        for i, hit_indices in spanning.items():
+            found[i] = [all_rects[j] for j in sorted(hit_indices)]
+        return found
@@ -0,0 +1,181 @@
+"""Many animated sprites stored as arrays, updated and drawn in bulk with NumPy.
+
+    pool = EntityPool()
+    first = pool.add_frames(spritesheet, (16, 16))
+    walk = pool.add_animation([first + 4, first, first + 8, first], fps=6)
+    npc = pool.spawn(x, y, walk, vx=20)
+
+    def update(dt):
+        pool.update(dt)
+
+    def render(alpha):
+        pool.draw(canvas, camera_pos)
+
+Every entity is a slot in the arrays, like pool.x[npc] and pool.vx[npc]. The arrays are replaced
+when the pool grows, so don't keep references to them across spawn() calls.
+"""
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError(
+        'pygame_ios.entities needs NumPy, install it with pip install "pygame-ios[entities]", '
+        "and in the template as described under Installing Packages in the README"
+    ) from None
+
+DEFAULT_CAPACITY = 256
+
+# one array per entity field, with one element per slot
+ENTITY_ARRAYS = (
+    ("alive", np.bool_),
+    ("x", np.float32),
+    ("y", np.float32),
+    ("vx", np.float32),
+    ("vy", np.float32),
+    ("animation", np.int32),
+    ("animation_time", np.float32),
+    ("frame", np.int32),
+)
+
+
+class EntityPool:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        # frames of all spritesheets, cut into subsurfaces so they can be passed to fblits
+        self.frames = []
+        self.frame_widths = np.zeros(0, np.int32)
+        self.frame_heights = np.zeros(0, np.int32)
+
+        # animations are slices of one array of frame numbers
+        self.sequence = np.zeros(0, np.int32)
+        self.animation_starts = np.zeros(0, np.int32)
+        self.animation_lengths = np.zeros(0, np.int32)
+        self.animation_frame_times = np.zeros(0, np.float32)
+        self.animation_loops = np.zeros(0, np.bool_)
+
+        for name, dtype in ENTITY_ARRAYS:
+            setattr(self, name, np.zeros(0, dtype))
+        self.capacity = 0
+        # slots above size have never been used, free holds the slots of killed entities
+        self.size = 0
+        self.free = []
+        self._grow(capacity)
+
+    def _grow(self, capacity: int):
+        for name, dtype in ENTITY_ARRAYS:
+            grown = np.zeros(capacity, dtype)
+            grown[: self.capacity] = getattr(self, name)
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return self.size - len(self.free)
+
+    # Cuts a spritesheet into frames, left to right then top to bottom
+    # Returns the number of its first frame, the numbers of all frames are used by add_animation
+    def add_frames(self, image: pygame.Surface, frame_size: tuple[int, int]) -> int:
+        first = len(self.frames)
+        width, height = frame_size
+        for y in range(0, image.height - height + 1, height):
+            for x in range(0, image.width - width + 1, width):
+                self.frames.append(image.subsurface((x, y, width, height)))
+        count = len(self.frames) - first
+        self.frame_widths = np.append(self.frame_widths, np.full(count, width, np.int32))
+        self.frame_heights = np.append(self.frame_heights, np.full(count, height, np.int32))
+        return first
+
+    # Returns the number of the animation, for spawn and set_animation
+    def add_animation(self, frames: list[int], fps: float, loop: bool = True) -> int:
+        if not frames:
+            raise ValueError("An animation needs at least one frame")
+        if max(frames) >= len(self.frames) or min(frames) < 0:
+            raise ValueError(f"Animation frames must be between 0 and {len(self.frames) - 1}")
+        number = len(self.animation_starts)
+        self.animation_starts = np.append(self.animation_starts, np.int32(len(self.sequence)))
+        self.animation_lengths = np.append(self.animation_lengths, np.int32(len(frames)))
+        self.animation_frame_times = np.append(self.animation_frame_times, np.float32(1 / fps))
+        self.animation_loops = np.append(self.animation_loops, loop)
+        self.sequence = np.append(self.sequence, np.array(frames, np.int32))
+        return number
+
+    # Returns the entity's slot
+    def spawn(self, x: float, y: float, animation: int, vx: float = 0.0, vy: float = 0.0) -> int:
+        if self.free:
+            entity = self.free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(self.capacity * 2)
+            entity = self.size
+            self.size += 1
+        self.alive[entity] = True
+        self.x[entity] = x
+        self.y[entity] = y
+        self.vx[entity] = vx
+        self.vy[entity] = vy
+        self.animation[entity] = animation
+        self.animation_time[entity] = 0.0
+        self.frame[entity] = self.sequence[self.animation_starts[animation]]
+        return entity
+
+    def kill(self, entity: int):
+        if self.alive[entity]:
+            self.alive[entity] = False
+            self.vx[entity] = self.vy[entity] = 0.0
+            self.free.append(entity)
+
+    # Restarts the animation only if it's a different one
+    def set_animation(self, entity: int, animation: int):
+        if self.animation[entity] != animation:
+            self.animation[entity] = animation
+            self.animation_time[entity] = 0.0
+            self.frame[entity] = self.sequence[self.animation_starts[animation]]
+
+    # Moves every entity by its velocity and advances every animation, dt is in seconds
+    def update(self, dt: float):
+        n = self.size
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+
+        animation = self.animation[:n]
+        frame_times = self.animation_frame_times[animation]
+        lengths = self.animation_lengths[animation]
+        time = self.animation_time[:n]
+        time += dt
+        # looping animations wrap around so the times stay small enough for float32
+        durations = frame_times * lengths
+        np.fmod(time, durations, out=time, where=self.animation_loops[animation])
+
+        step = (time / frame_times).astype(np.int32)
+        np.minimum(step, lengths - 1, out=step)
+        self.frame[:n] = self.sequence[self.animation_starts[animation] + step]
+
+    # Slots of the alive entities that overlap rect, in world coordinates
+    def visible(self, rect) -> np.ndarray:
+        left, top, width, height = rect
+        n = self.size
+        x = self.x[:n]
+        y = self.y[:n]
+        frame = self.frame[:n]
+        mask = self.alive[:n].copy()
+        mask &= x < left + width
+        mask &= y < top + height
+        mask &= x + self.frame_widths[frame] > left
+        mask &= y + self.frame_heights[frame] > top
+        return np.flatnonzero(mask)
+
+    # Draws the entities that are on surf with a single fblits call, returns how many were drawn
+    # With sort_y, entities lower on the screen are drawn over the ones above them
+    def draw(self, surf: pygame.Surface, camera_pos=(0, 0), sort_y: bool = True) -> int:
+        camera_x, camera_y = camera_pos
+        clip = surf.get_clip()
+        entities = self.visible((clip.x - camera_x, clip.y - camera_y, clip.width, clip.height))
+        if sort_y:
+            entities = entities[np.argsort(self.y[entities], kind="stable")]
+
+        # floor instead of truncating like blit does, so sprites don't jump a pixel when crossing 0
+        xs = np.floor(self.x[entities] + camera_x).astype(np.int32).tolist()
+        ys = np.floor(self.y[entities] + camera_y).astype(np.int32).tolist()
+        frames = self.frames
+        surf.fblits(zip([frames[frame] for frame in self.frame[entities].tolist()], zip(xs, ys)))
+        return len(entities)
@@ -1,66 +1,71 @@
 import pygame
-import pymunk
-import pymunk.pygame_util
 import random
+import sys
 
-def create_ball(space, pos):
-    body = pymunk.Body()
-    body.position = pos
+from pygame_ios.loop import FixedStepLoop
+from pygame_ios.physics import PhysicsScene
 
-    size = random.randint(20, 50)
-    ball = pymunk.Circle(body, size)
-    ball.mass = size
-    ball.elasticity = 0.95
+BALL_COLORS = ["#e94f37", "#f6ae2d", "#86bbd8", "#33658a", "#9bc53d"]
 
-    space.add(body, ball)
-    return body
+def create_ball(scene, pos, size=None):
+    if size is None:
+        size = random.randint(20, 50)
+    return scene.spawn_ball(pos, size, random.choice(BALL_COLORS))
 
-def create_line(space, p1, p2):
-    line = pymunk.Segment(space.static_body, p1, p2, 0)
-    line.elasticity = 0.95
-    return line 
+class Simulation:
+    # the space is stepped 60 times per second whatever the frame rate is
+    TIMESTEP = 1.0 / 60.0
 
-def create_edges(space, w, h):
-    edges = [
-        create_line(space, (1, h), (w, h)), # bottom
-        create_line(space, (w, h), (w, 0)), # right
-        create_line(space, (1, -1), (w, -1)), # top
-        create_line(space, (-1, 0), (-1, h)), # left
-    ]
-    space.add(*edges)
-    return edges
+    # spawn a ball every 2 seconds
+    SPAWN_INTERVAL = 2.0
 
-pygame.init()
-screen = pygame.display.set_mode((400, 600))
-clock = pygame.Clock()
-timestep = 1.0 / 60.0
+    # about as many as fit on screen, after that every new ball replaces the oldest one
+    # balls that come to rest and fall asleep are removed before that
+    MAX_BALLS = 30
 
-w, h = pygame.display.get_window_size()
-draw_options = pymunk.pygame_util.DrawOptions(screen)
+    # with max_balls=None and remove_sleeping=False every ball is kept, the benchmarks use that to
+    # simulate a fixed number of them
+    def __init__(self, max_balls=MAX_BALLS, remove_sleeping=True):
+        pygame.init()
+        self.screen = pygame.display.set_mode((400, 600))
 
-space = pymunk.Space()
-space.gravity = 0, 981
+        self.w, self.h = pygame.display.get_window_size()
 
-spawn_timer = pygame.time.get_ticks()
+        self.scene = PhysicsScene(
+            (0, 0, self.w, self.h), gravity=(0, 981), remove_sleeping=remove_sleeping, max_balls=max_balls
+        )
+        self.scene.add_walls()
+        self.space = self.scene.space
 
-create_edges(space, w, h)
+        # counted in simulated time, so balls spawn at the same rate however fast frames are
+        self.spawn_timer = 0.0
 
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+        self.loop = FixedStepLoop(self.update, self.draw, events=self.handle_events, step=self.TIMESTEP)
 
-    space.step(timestep)
-    clock.tick(60)
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return True
+        return False
 
-    # spawn ball every 2 seconds
-    if pygame.time.get_ticks() - spawn_timer > 2000:
-        create_ball(space, (w / 2 + random.randint(-5, 5), 50))
-        spawn_timer = pygame.time.get_ticks()
+    def update(self, dt):
+        self.scene.step(dt)
 
-    screen.fill("black")
-    space.debug_draw(draw_options)
-    pygame.display.flip()
+        self.spawn_timer += dt
+        if self.spawn_timer > self.SPAWN_INTERVAL:
+            create_ball(self.scene, (self.w / 2 + random.randint(-5, 5), 50))
+            self.spawn_timer = 0.0
 
-pygame.quit()
+    # the scene always draws the latest step, so alpha isn't used
+    def draw(self, alpha):
+        self.screen.fill("black")
+        self.scene.draw(self.screen)
+        pygame.display.flip()
+
+if sys.platform == "ios":
+    simulation = Simulation()
+    _ios_tick = simulation.loop.tick
+elif __name__ == "__main__":
+    simulation = Simulation()
+    simulation.loop.run(framerate=60)
+    pygame.quit()
@@ -1,4 +1,3 @@
-import json
 import os
 import random
 import sys
@@ -6,6 +5,16 @@ import sys
 import pygame
 from pygame.math import Vector2
 
+from pygame_ios.assets import AssetManager
+from pygame_ios.atlas import Atlas, build_atlas, read_atlas
+from pygame_ios.audio import DEFAULT_CHANNELS, DEFAULT_FREQUENCY, DEFAULT_SIZE, open_sound_bank, reserve_channels
+from pygame_ios.canvas import PixelCanvas
+from pygame_ios.collision import SpatialGrid
+from pygame_ios.loop import FixedStepLoop
+from pygame_ios.mapfile import CompiledMap
+from pygame_ios.profiler import Profiler
+from pygame_ios.tilemap import ChunkedTilemap
+
 
 # Get the active UIWindow using native platform APIs, rubicon-objc allows you to do this from Python code
 # Returns None if the window hasn't been created yet
@@ -30,42 +39,33 @@ def get_safe_area_insets(ui_window) -> tuple[float, float, float, float]:
     return (r.top, r.left, r.bottom, r.right)
 
 
-def draw_tilemap(
-    surf: pygame.Surface, map_image: pygame.Surface, map_data: dict, image_cell_width: int, pos: Vector2
-):
-    for layer in reversed(map_data["layers"]):
-        if layer["name"] != "entities":
-            for tile in layer["tiles"]:
-                srcx = int(tile["id"]) % image_cell_width * map_data["tileSize"]
-                srcy = int(tile["id"]) // image_cell_width * map_data["tileSize"]
-                surf.blit(
-                    map_image,
-                    (
-                        # round pixel positions to avoid drawing subpixels
-                        round(pos.x + tile["x"] * map_data["tileSize"]),
-                        round(pos.y + tile["y"] * map_data["tileSize"]),
-                    ),
-                    (srcx, srcy, map_data["tileSize"], map_data["tileSize"]),
-                )
+# Runs on an asset loader thread, decoding the spritesheet stored in the compiled map is the slow part
+def load_compiled_map(assets, name: str) -> tuple[CompiledMap, pygame.Surface]:
+    map_data = CompiledMap(assets.buffer(name), name)
+    return map_data, map_data.load_spritesheet()
 
 
-def create_tilemap_collision(map_data: dict) -> list[pygame.FRect]:
-    rects = []
+# Both functions below take either the parsed map.json or a map compiled with pygame_ios compile-map
+# Neighbouring collider tiles are merged into bigger rects and stored in a grid,
+# so the player only checks the few walls near it instead of every collider tile in the map
+def create_tilemap_collision(map_data: dict | CompiledMap) -> SpatialGrid:
+    if isinstance(map_data, CompiledMap):
+        return SpatialGrid.from_tiles(map_data.collider_tiles(), map_data.tile_size)
+
+    tiles = []
     for layer in map_data["layers"]:
         if layer["collider"]:
             for tile in layer["tiles"]:
-                rect = pygame.FRect(
-                    tile["x"] * map_data["tileSize"],
-                    tile["y"] * map_data["tileSize"],
-                    map_data["tileSize"],
-                    map_data["tileSize"],
-                )
-                rects.append(rect)
-    return rects
+                tiles.append((tile["x"], tile["y"]))
+    return SpatialGrid.from_tiles(tiles, map_data["tileSize"])
 
 
 # The Sprite Fusion tilemap has a custom attribute for the player spawn position
-def get_player_spawn(map_data: dict) -> Vector2:
+def get_player_spawn(map_data: dict | CompiledMap) -> Vector2:
+    if isinstance(map_data, CompiledMap):
+        spawn = map_data.find_entity("type", "player_spawn")
+        return Vector2(spawn.x, spawn.y) * map_data.tile_size if spawn else Vector2()
+
     for layer in map_data["layers"]:
         if layer["name"] == "entities":
             for tile in layer["tiles"]:
@@ -78,83 +78,103 @@ def get_player_spawn(map_data: dict) -> Vector2:
 
 
 class Game:
-    # Get assets relative to the script location
-    ASSETS_PATH = os.path.join(os.path.dirname(__file__), "assets")
+    # Asset names are relative to the script location, they also work with --pack-assets
+    ASSETS_ROOT = os.path.dirname(__file__)
     
     # Define a scale factor based on the width of the game's visible contents (usually called logical size)
-    # The scale factor scales the canvas, but some positions also need to be divided by this scale factor to be converted to canvas coordinates
-    # It is also rounded for integer scaling, important for pixel art
+    # PixelCanvas picks a whole number scale factor from it, important for pixel art, and converts window positions to canvas positions
     LOGICAL_WIDTH = 300
     
     # Size of a single frame of the player
     PLAYER_SIZE = 16
 
-    def __init__(self):
+    # Images packed into the atlas, player.png is a grid of frames with a magenta background
+    SPRITES = ["spritesheet.png", "player.png", "shadow.png", "health_pip.png"]
+    SPRITE_GRIDS = {"player.png": (PLAYER_SIZE, PLAYER_SIZE)}
+    SPRITE_COLORKEYS = {"player.png": (255, 0, 255)}
+
+    # Player speed in pixels per second, the game is updated 60 times per second whatever the frame rate is
+    PLAYER_SPEED = 60
+
+    # With dirty_rects on, only the parts of the screen that changed are redrawn, which saves battery when the camera stands still
+    # asset_workers is the number of threads loading assets, 0 loads them one after another while the game starts
+    def __init__(self, dirty_rects: bool = False, asset_workers: int | None = None):
         # Game initialisation
+        # The mixer always runs in the format the sound bank was built for, SDL converts the mixed
+        # output to the device's format instead of converting every sound when it's loaded
+        pygame.mixer.pre_init(DEFAULT_FREQUENCY, DEFAULT_SIZE, DEFAULT_CHANNELS, allowedchanges=0)
         pygame.init()
         self.screen = pygame.display.set_mode((874, 402))
         pygame.display.set_caption("Mobile Pixel Art Example")
-        self.clock = pygame.Clock()
         
-        # Get the window size after set_mode, because SDL automatically changes this to the full screen size on iOS
-        Game.SCREEN_WIDTH, Game.SCREEN_HEIGHT = pygame.display.get_window_size()
-        Game.SCALE_FACTOR = round(self.SCREEN_WIDTH / self.LOGICAL_WIDTH)
-        
-        # Create a tiny canvas to draw the tiny pixel art to, scale it up and blit to the window surface later
-        self.canvas = pygame.Surface((self.SCREEN_WIDTH / self.SCALE_FACTOR, self.SCREEN_HEIGHT / self.SCALE_FACTOR))
-
-        # Separate canvas for mobile joystick that supports transparency
-        self.controls_canvas = pygame.Surface(self.canvas.size, pygame.SRCALPHA)
-
-        # Load the tilemap and its spritesheet, and generate collision rects
-        with open(os.path.join(self.ASSETS_PATH, "map.json")) as f:
-            self.map_data = json.load(f)
-
-        self.map_collisions = create_tilemap_collision(self.map_data)
-        self.map_image = pygame.image.load(
-            os.path.join(self.ASSETS_PATH, "spritesheet.png")
-        ).convert_alpha()
-        self.map_image_width = self.map_image.width // self.map_data["tileSize"]
-
-        # Load health pips for the UI
-        self.health_pip_image = pygame.image.load(
-            os.path.join(self.ASSETS_PATH, "health_pip.png")
-        ).convert_alpha()
-        self.health_pips = []
-        self.max_health = 4
+        # The safe area insets are used to keep the UI away from the notch, rounded corners and home indicator
+        if sys.platform == "ios":
+            insets = get_safe_area_insets(get_ios_window())
+        else:
+            insets = (0, 0, 0, 0)
+
+        # Create a tiny canvas to draw the tiny pixel art to, it's scaled up straight into the window surface later
+        # PixelCanvas reads the window size after set_mode, because SDL automatically changes this to the full screen size on iOS
+        self.pixel_canvas = PixelCanvas(
+            self.screen, self.LOGICAL_WIDTH, insets=insets, dirty_rects=dirty_rects
+        )
+        self.canvas = self.pixel_canvas.surface
 
-        # Load the player sprite sheet
-        self.player_image = pygame.image.load(os.path.join(self.ASSETS_PATH, "player.png")).convert()
-        self.player_image.set_colorkey((255, 0, 255))
+        # Separate layer for the mobile joystick that supports transparency, it's only redrawn when the joystick moves
+        self.controls_layer = self.pixel_canvas.add_layer()
+        self.drawn_joystick = None
 
-        # Load a shadow to display under the player
-        self.shadow_image = pygame.image.load(
-            os.path.join(self.ASSETS_PATH, "shadow.png")
-        ).convert_alpha()
+        # Show a first frame right away, instead of a black screen until everything has loaded
+        self.loading = True
+        self.draw_loading_screen(0.0)
 
-        # Animation variables, including source rectangles for blitting the player
+        # Start loading the assets on background threads, draw shows a loading screen until they've arrived
+        self.assets = AssetManager(self.ASSETS_ROOT, workers=asset_workers)
+
+        # The tilemap, a compiled map loads much faster and brings its own spritesheet
+        # Create it with `pygame_ios compile-map assets/map.json`
+        self.map_compiled = "assets/map.pgmap" in self.assets.source
+        if self.map_compiled:
+            self.map_request = self.assets.run(load_compiled_map, self.assets.source, "assets/map.pgmap")
+        else:
+            self.map_request = self.assets.json("assets/map.json")
+
+        # The tileset, health pips for the UI, the player sprite sheet and a shadow to display under the player
+        # all come from one atlas, create it with `pygame_ios pack-atlas assets/spritesheet.png assets/player.png
+        # assets/shadow.png assets/health_pip.png --grid player.png=16x16 --colorkey player.png=ff00ff`
+        # Without one, the separate images are loaded and packed into an atlas when the game starts
+        if "assets/atlas.json" in self.assets.source:
+            self.atlas_request = self.assets.run(read_atlas, "assets/atlas.json", self.assets.source)
+            self.sprite_requests = {}
+        else:
+            self.atlas_request = None
+            sprites = [name for name in self.SPRITES if not (self.map_compiled and name == "spritesheet.png")]
+            self.sprite_requests = {
+                name: self.assets.image(
+                    f"assets/{name}", alpha=name not in self.SPRITE_COLORKEYS, colorkey=self.SPRITE_COLORKEYS.get(name)
+                )
+                for name in sprites
+            }
+
+        # The footstep sounds, already in the mixer's format in a sound bank if there is one
+        # Create it with `pygame_ios pack-sounds assets`, pass --stream-pcm to also convert the music to a
+        # WAV that doesn't have to be decoded. The music is streamed so it's opened once everything else has loaded
+        if "assets/sounds.sndbank" in self.assets.source:
+            self.sound_bank_request = self.assets.run(open_sound_bank, "assets/sounds.sndbank", self.assets.source)
+            self.footstep_requests = []
+        else:
+            self.sound_bank_request = None
+            self.footstep_requests = [self.assets.sound(f"assets/footstep{i}.wav") for i in range(1, 4)]
+
+        self.health_pips = []
+        self.max_health = 4
+
+        # Animation variables, the player's frames are cut from the atlas once everything has loaded
         self.player_anim_timer = 0.0
         self.player_anim_index = 0
 
-        self.player_srcrects = [
-            # first row
-            (0, 0, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            (16, 0, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            (32, 0, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            (48, 0, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            # second row
-            (0, 16, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            (16, 16, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            (32, 16, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            (48, 16, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            # third row
-            (0, 32, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            (16, 32, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            (32, 32, self.PLAYER_SIZE, self.PLAYER_SIZE),
-            (48, 32, self.PLAYER_SIZE, self.PLAYER_SIZE),
-        ]
-
-        # Each animation contains a list of indices, used to index into player_srcrects
+        # Each animation contains a list of indices into player_frames, which go left to right
+        # then top to bottom through player.png
         self.player_anim_set = {
             "idledown": [0],
             "idleright": [1],
@@ -172,20 +192,8 @@ class Game:
         self.player_anim_prev_key = self.player_anim_key
 
         self.player_facing_dir = Vector2(0, 1)
-        self.player_pos = get_player_spawn(self.map_data)
-        self.player_hitbox = pygame.FRect(self.player_pos.x, self.player_pos.y, 10, 10)
         self.input_dir = Vector2()
 
-        # Load the music and footstep sound
-        pygame.mixer.music.load(os.path.join(self.ASSETS_PATH, "TownTheme.mp3"))
-        pygame.mixer.music.set_volume(0.5)
-        pygame.mixer.music.play(loops=-1)
-
-        self.footstep_sounds = [
-            pygame.Sound(os.path.join(self.ASSETS_PATH, "footstep1.wav")),
-            pygame.Sound(os.path.join(self.ASSETS_PATH, "footstep2.wav")),
-            pygame.Sound(os.path.join(self.ASSETS_PATH, "footstep3.wav")),
-        ]
         self.max_footstep_timer = 0.3
         self.footstep_timer = self.max_footstep_timer
         self.footstep_active = False
@@ -193,40 +201,138 @@ class Game:
         self.camera_pos = Vector2()
 
         # Mobile joystick variables
-        self.original_joystick_pos = Vector2(30.0, self.controls_canvas.height - 30.0)
+        # Position the UI elements inside the safe area, on desktop this is the whole canvas
+        safe_rect = self.pixel_canvas.safe_rect
+        self.original_joystick_pos = Vector2(safe_rect.left + 30.0, safe_rect.bottom - 30.0)
         self.max_knob_distance = 15
         self.current_joystick_finger = -1
 
-        # Reposition the UI elements based on safe area insets
-        if sys.platform == "ios":
-            ios_window = get_ios_window()
-            itop, ileft, ibottom, iright = get_safe_area_insets(ios_window)
+        # Set other joystick positions after safe area adjustments
+        self.current_joystick_pos = self.original_joystick_pos.copy()
+        self.current_knob_pos = self.current_joystick_pos.copy()
 
-            self.original_joystick_pos.x += ileft / self.SCALE_FACTOR
-            self.original_joystick_pos.y -= ibottom / self.SCALE_FACTOR
+        # Frame profiler, toggled with F3 on desktop or by touching the screen with three fingers on iOS
+        # Press F4 on desktop to save a trace, on iOS it's saved when the profiler is turned off
+        self.profiler = Profiler()
+        self.touching_fingers = set()
 
-            for i in range(self.max_health):
-                self.health_pips.append(
-                    (
-                        self.health_pip_image,
-                        (10 + (ileft / self.SCALE_FACTOR), 10 + (12 * i) + (itop / self.SCALE_FACTOR)),
-                    )
-                )
+        # The loop calls update at a fixed rate and draw once per frame, loop.tick is called every frame
+        self.loop = FixedStepLoop(self.update, self.draw, events=self.handle_events, profiler=self.profiler)
+
+        # What was drawn in the last frame, to find out what has to be redrawn in dirty rect mode
+        self.drawn_camera_pos = None
+        self.drawn_player = None
+        self.drawn_profiler = False
+
+    # Called by draw once every asset has loaded, the game starts in the same frame
+    def finish_loading(self):
+        if self.atlas_request is not None:
+            index, pages = self.atlas_request.result()
         else:
-            # Ignore the safe area insets on desktop
-            for i in range(self.max_health):
-                self.health_pips.append((self.health_pip_image, (10, 10 + (12 * i))))
+            images = {name: request.result() for name, request in self.sprite_requests.items()}
+            index, pages, _ = build_atlas(images, grids=self.SPRITE_GRIDS)
+        self.atlas = Atlas(index, [page.convert_alpha() for page in pages])
 
-        # Set other joystick positions after safe area adjustments
-        self.current_joystick_pos = self.original_joystick_pos.copy()
-        self.current_knob_pos = self.current_joystick_pos.copy()
+        if self.map_compiled:
+            map_data, map_image = self.map_request.result()
+            map_image = map_image.convert_alpha()
+        else:
+            map_data = self.map_request.result()
+            map_image = self.atlas.get("spritesheet.png")
+        self.set_map(map_data, map_image)
+
+        self.health_pip_image = self.atlas.get("health_pip.png")
+        self.player_frames = self.atlas.frames("player.png")
+        self.shadow_image = self.atlas.get("shadow.png")
+        if self.sound_bank_request is not None:
+            sound_bank = self.sound_bank_request.result()
+            self.footstep_sounds = [sound_bank.sound(f"footstep{i}.wav") for i in range(1, 4)]
+        else:
+            self.footstep_sounds = [request.result() for request in self.footstep_requests]
+        # At most two footsteps overlap, they get channels of their own so they never cut off other sounds
+        self.footstep_channels = reserve_channels(2)
+
+        safe_rect = self.pixel_canvas.safe_rect
+        for i in range(self.max_health):
+            self.health_pips.append(
+                (self.health_pip_image, (safe_rect.left + 10, safe_rect.top + 10 + (12 * i)))
+            )
+
+        if "assets/TownTheme.wav" in self.assets.source:
+            self.assets.source.load_music("assets/TownTheme.wav")
+        else:
+            self.assets.source.load_music("assets/TownTheme.mp3")
+        pygame.mixer.music.set_volume(0.5)
+        pygame.mixer.music.play(loops=-1)
 
+        self.assets.close()
+        self.loading = False
 
-    def tick(self):
+    # Blocks until everything has loaded, instead of showing the loading screen
+    def wait_for_assets(self):
+        self.assets.wait()
+        self.finish_loading()
+
+    # A progress bar in the middle of the screen
+    def draw_loading_screen(self, progress: float):
+        self.canvas.fill((0, 0, 0))
+        bar = pygame.Rect(0, 0, 60, 6)
+        bar.center = self.canvas.get_rect().center
+        pygame.draw.rect(self.canvas, (204, 204, 204), bar, 1)
+        filled = bar.inflate(-4, -4)
+        filled.width = round(filled.width * progress)
+        pygame.draw.rect(self.canvas, (204, 204, 204), filled)
+        self.pixel_canvas.redraw_all()
+        self.pixel_canvas.begin_frame()
+        self.pixel_canvas.present()
+        self.pixel_canvas.update_display()
+
+    # Switch to another map and move the player to its spawn point
+    def set_map(self, map_data: dict | CompiledMap, map_image: pygame.Surface):
+        self.map_data = map_data
+        self.map_image = map_image
+        self.map_collisions = create_tilemap_collision(map_data)
+
+        # The tile layers are pre-rendered into chunks, so only a few blits are needed per frame
+        self.tilemap = ChunkedTilemap(map_data, map_image, background=(0, 0, 0))
+
+        self.player_pos = get_player_spawn(map_data)
+        self.previous_player_pos = self.player_pos.copy()
+        self.player_hitbox = pygame.FRect(self.player_pos.x, self.player_pos.y, 10, 10)
+        self.pixel_canvas.redraw_all()
+
+    def toggle_profiler(self):
+        self.profiler.toggle()
+        if not self.profiler.enabled and sys.platform == "ios":
+            self.save_trace()
+
+    # The trace can be opened in chrome://tracing or ui.perfetto.dev
+    # On iOS it's saved to the app's Documents folder, which you can download from Xcode
+    def save_trace(self):
+        folder = os.path.expanduser("~/Documents") if sys.platform == "ios" else os.getcwd()
+        path = os.path.join(folder, "pygame-ios-trace.json")
+        self.profiler.dump_chrome_trace(path)
+        print(f"Saved a frame trace to {path}")
+
+    # Returns True when the game should exit
+    def handle_events(self) -> bool:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return True
 
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    self.toggle_profiler()
+                elif event.key == pygame.K_F4:
+                    self.save_trace()
+
+            if event.type == pygame.FINGERDOWN:
+                self.touching_fingers.add(event.finger_id)
+                if len(self.touching_fingers) == 3:
+                    self.toggle_profiler()
+            elif event.type == pygame.FINGERUP:
+                self.touching_fingers.discard(event.finger_id)
+
             # Finger events are used to handle joystick movement
             if event.type == pygame.FINGERDOWN:
                 # Only allow one finger at a time to control the joystick
@@ -234,17 +340,13 @@ class Game:
                     self.current_joystick_finger = event.finger_id
 
                     # Finger events return x and y as normalised values between 0 and 1
-                    # Multiply by the screen size to get the correct pixel values
-                    mpos = Vector2(event.x * self.SCREEN_WIDTH, event.y * self.SCREEN_HEIGHT)
-
-                    self.current_joystick_pos = mpos / self.SCALE_FACTOR
+                    # The pixel canvas converts them to canvas coordinates
+                    self.current_joystick_pos = self.pixel_canvas.finger_to_canvas(event)
                     self.current_knob_pos = self.current_joystick_pos.copy()
 
             if event.type == pygame.FINGERMOTION:
                 if self.current_joystick_finger == event.finger_id:
-                    mpos = Vector2(event.x * self.SCREEN_WIDTH, event.y * self.SCREEN_HEIGHT)
-
-                    self.current_knob_pos = mpos / self.SCALE_FACTOR
+                    self.current_knob_pos = self.pixel_canvas.finger_to_canvas(event)
 
                     # Constrain the knob's position to a max distance from the base
                     diff = self.current_knob_pos - self.current_joystick_pos
@@ -267,7 +369,15 @@ class Game:
 
                     self.footstep_active = False
 
-        dt = self.clock.tick(60) / 1000
+        return False
+
+    # Called with the same dt every time, as many times as needed to keep up with real time
+    def update(self, dt: float):
+        if self.loading:
+            return
+
+        # The player is drawn between its previous and current position, see draw
+        self.previous_player_pos = self.player_pos.copy()
 
         # Standard WASD/arrow keys movement on desktop
         if sys.platform != "ios":
@@ -309,9 +419,9 @@ class Game:
                 self.footstep_active = False
 
         # Move and collide X
-        self.player_pos.x += self.input_dir.x
+        self.player_pos.x += self.input_dir.x * self.PLAYER_SPEED * dt
         self.player_hitbox.x = self.player_pos.x + 3
-        for tile in self.map_collisions:
+        for tile in self.map_collisions.query(self.player_hitbox):
             if tile.colliderect(self.player_hitbox):
                 if self.input_dir.x > 0:
                     self.player_hitbox.right = tile.left
@@ -320,9 +430,9 @@ class Game:
                 self.player_pos.x = self.player_hitbox.x - 3
 
         # Move and collide Y
-        self.player_pos.y += self.input_dir.y
+        self.player_pos.y += self.input_dir.y * self.PLAYER_SPEED * dt
         self.player_hitbox.y = self.player_pos.y + 6
-        for tile in self.map_collisions:
+        for tile in self.map_collisions.query(self.player_hitbox):
             if tile.colliderect(self.player_hitbox):
                 if self.input_dir.y > 0:
                     self.player_hitbox.bottom = tile.top
@@ -333,7 +443,7 @@ class Game:
         # Footstep timer, activated when the player moves
         self.footstep_timer += dt
         if self.footstep_active and self.footstep_timer > self.max_footstep_timer:
-            random.choice(self.footstep_sounds).play()
+            self.footstep_channels.play(random.choice(self.footstep_sounds))
             self.footstep_timer = 0.0
 
         # Animation timer, always running
@@ -366,57 +476,90 @@ class Game:
             self.player_anim_timer = 0.0
             self.player_anim_prev_key = self.player_anim_key
 
+    # Called once per frame, alpha is how far the current time is between the last update and the next one
+    def draw(self, alpha: float):
+        if self.loading:
+            # Converts the images that finished loading, spending at most 4 ms per frame on it
+            if not self.assets.pump(max_time=0.004):
+                self.draw_loading_screen(self.assets.progress())
+                return
+            self.finish_loading()
+
+        # Smooth out the movement when the frame rate isn't 60 FPS, like on 120 Hz screens
+        player_pos = self.previous_player_pos.lerp(self.player_pos, alpha)
+
         # Move the camera and clamp it to the tilemap bounds
         self.camera_pos = (
-            -self.player_pos.copy()
+            -player_pos
             + Vector2(self.canvas.width / 2, self.canvas.height / 2)
             - Vector2(self.PLAYER_SIZE / 2, self.PLAYER_SIZE / 2)
         )
-        self.camera_pos.x = pygame.math.clamp(
-            self.camera_pos.x,
-            -(self.map_data["mapWidth"] * self.map_data["tileSize"]) + self.canvas.width,
-            0,
-        )
-        self.camera_pos.y = pygame.math.clamp(
-            self.camera_pos.y,
-            -(self.map_data["mapHeight"] * self.map_data["tileSize"]) + self.canvas.height,
-            0,
+        map_width, map_height = self.tilemap.pixel_size
+        self.camera_pos.x = pygame.math.clamp(self.camera_pos.x, -map_width + self.canvas.width, 0)
+        self.camera_pos.y = pygame.math.clamp(self.camera_pos.y, -map_height + self.canvas.height, 0)
+
+        # Draw the joystick, but only on iOS and only when it has moved
+        # It's drawn first because the layer also tells the canvas which parts of it have to be redrawn
+        joystick = (tuple(self.current_joystick_pos), tuple(self.current_knob_pos))
+        if sys.platform == "ios" and joystick != self.drawn_joystick:
+            controls = self.controls_layer.clear()
+            pygame.draw.circle(controls, (127, 127, 127, 100), self.current_joystick_pos, 20)
+            pygame.draw.circle(controls, (204, 204, 204, 100), self.current_knob_pos, 10)
+            self.drawn_joystick = joystick
+
+        # Find out what changed since the last frame, blits truncate positions like Rect does
+        player_screen_pos = player_pos + self.camera_pos
+        frame_index = self.player_anim_set[self.player_anim_key][self.player_anim_index]
+        player = (
+            pygame.Rect(player_screen_pos, (self.PLAYER_SIZE, self.PLAYER_SIZE)),
+            pygame.Rect(player_screen_pos + Vector2(3, 14), self.shadow_image.size),
+            frame_index,
         )
-
-        # Start drawing
-        self.canvas.fill((0, 0, 0))
-        draw_tilemap(self.canvas, self.map_image, self.map_data, self.map_image_width, self.camera_pos)
+        # Moving the camera changes everything on screen, and the profiler overlay changes every frame
+        if self.camera_pos != self.drawn_camera_pos or self.profiler.enabled or self.drawn_profiler:
+            self.pixel_canvas.redraw_all()
+        elif player != self.drawn_player:
+            for rect in self.drawn_player[:2] + player[:2]:
+                self.pixel_canvas.mark_dirty(rect)
+        self.drawn_camera_pos = self.camera_pos.copy()
+        self.drawn_player = player
+        self.drawn_profiler = self.profiler.enabled
+
+        # Start drawing, only the changed parts of the canvas in dirty rect mode
+        redraw_rects = self.pixel_canvas.begin_frame()
+        for rect in redraw_rects:
+            self.canvas.set_clip(rect)
+            self.canvas.fill((0, 0, 0))
+            self.tilemap.draw(self.canvas, self.camera_pos)
+        self.profiler.mark("tilemap")
 
         # Draw the shadow, then the player with the correct animation index
-        self.canvas.blit(self.shadow_image, self.player_pos + self.camera_pos + Vector2(3, 14))
-        srcrect_index = self.player_anim_set[self.player_anim_key][self.player_anim_index]
-        self.canvas.blit(self.player_image, self.player_pos + self.camera_pos, self.player_srcrects[srcrect_index])
-
-        self.canvas.fblits(self.health_pips)
-
-        # Draw the joystick, but only on iOS
-        if sys.platform == "ios":
-            self.controls_canvas.fill((0, 0, 0, 0))
-            pygame.draw.circle(
-                self.controls_canvas, (127, 127, 127, 100), self.current_joystick_pos, 20
-            )
-            pygame.draw.circle(self.controls_canvas, (204, 204, 204, 100), self.current_knob_pos, 10)
-            self.canvas.blit(self.controls_canvas)
-
-        # Scale up the canvas to blit it to the window surface
-        self.screen.blit(pygame.transform.scale_by(self.canvas, self.SCALE_FACTOR))
-
-        pygame.display.flip()
-        
-        return False
-
-
-game = Game()
-
-if sys.platform != "ios":
-    should_exit = False
-    while not should_exit:
-        should_exit = game.tick()
+        for rect in redraw_rects:
+            self.canvas.set_clip(rect)
+            self.canvas.blit(self.shadow_image, player_screen_pos + Vector2(3, 14))
+            self.canvas.blit(self.player_frames[frame_index], player_screen_pos)
+            self.canvas.fblits(self.health_pips)
+        self.canvas.set_clip(None)
+        self.profiler.mark("sprites")
+
+        if self.profiler.enabled:
+            self.profiler.draw_overlay(self.canvas, (self.canvas.width - 104, 4), (100, 30))
+            self.profiler.mark("overlay")
+
+        # Draw the joystick layer, and scale up the canvas into the window surface without allocating a new surface
+        self.pixel_canvas.present()
+        self.profiler.mark("scale")
+
+        # Same as pygame.display.flip(), but only updates the redrawn parts of the window in dirty rect mode
+        self.pixel_canvas.update_display()
+        self.profiler.mark("flip")
+
+
+# The game is only created when this file is run, so the benchmarks can import Game
+if sys.platform == "ios":
+    game = Game()
+    _ios_tick = game.loop.tick
+elif __name__ == "__main__":
+    game = Game(dirty_rects="--dirty-rects" in sys.argv)
+    game.loop.run(framerate=60)
     pygame.quit()
-else:
-    _ios_tick = game.tick
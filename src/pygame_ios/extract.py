@@ -0,0 +1,305 @@
+"""Parallel extraction of template zips."""
+
+import json
+import os
+import shutil
+import stat
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+CHUNK_SIZE = 1024 * 1024
+# written into an extracted template, records which zip it came from
+STAMP_NAME = ".pygame-ios-template.json"
+
+
+@dataclass
+class ExtractStats:
+    extracted_files: int = 0
+    skipped_files: int = 0
+    symlinks: int = 0
+    removed_files: int = 0
+    # files changed since the last extraction, which were left alone instead of being replaced or removed
+    kept_files: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"Extracted {self.extracted_files} files, "
+            f"skipped {self.skipped_files} unchanged files, "
+            f"created {self.symlinks} symlinks, "
+            f"removed {self.removed_files} files that aren't in the zip anymore."
+        )
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+# Unix permission bits stored in the zip, 0 if the zip wasn't made on a Unix system
+def member_mode(info: zipfile.ZipInfo) -> int:
+    if info.create_system != 3:
+        return 0
+    return info.external_attr >> 16
+
+
+# Turns a member name into a path inside dest_dir, refusing names that would escape it
+def member_path(dest_dir: str, name: str) -> str:
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if ".." in parts or (parts and os.path.splitdrive(parts[0])[0]):
+        raise ValueError(f"Unsafe path in template zip: {name}")
+    return os.path.join(dest_dir, *parts)
+
+
+def crc32_file(path: str) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+# A file on disk matches a member if it has the same size and CRC, so it doesn't need extracting again
+def is_current(info: zipfile.ZipInfo, path: str) -> bool:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISREG(st.st_mode) or st.st_size != info.file_size:
+        return False
+    return crc32_file(path) == info.CRC
+
+
+# CRC of a file's contents or a symlink's target, like the zip stores them, or None if there is neither
+def disk_crc(path: str) -> int | None:
+    if os.path.islink(path):
+        return zlib.crc32(os.readlink(path).encode("utf-8"))
+    if os.path.isfile(path):
+        return crc32_file(path)
+    return None
+
+
+def _apply_mode(path: str, mode: int):
+    permissions = stat.S_IMODE(mode)
+    if permissions and stat.S_IMODE(os.stat(path).st_mode) != permissions:
+        os.chmod(path, permissions)
+
+
+class _ZipReaders:
+    # ZipFile objects aren't safe to share between threads, so each worker opens its own
+    def __init__(self, zip_path: str):
+        self.zip_path = zip_path
+        self.local = threading.local()
+        self.opened = []
+        self.lock = threading.Lock()
+
+    def get(self) -> zipfile.ZipFile:
+        zf = getattr(self.local, "zf", None)
+        if zf is None:
+            zf = zipfile.ZipFile(self.zip_path)
+            self.local.zf = zf
+            with self.lock:
+                self.opened.append(zf)
+        return zf
+
+    def close(self):
+        for zf in self.opened:
+            zf.close()
+
+
+# previous holds the CRCs of the members the files on disk were extracted from. A file that doesn't
+# match its member anymore was changed after extracting, and is kept unless overwrite is set
+def _is_changed(info: zipfile.ZipInfo, path: str, previous: dict[str, int] | None, overwrite: bool) -> bool:
+    if overwrite or not os.path.lexists(path):
+        return False
+    crc = disk_crc(path)
+    return crc is not None and (previous is None or previous.get(info.filename) != crc)
+
+
+# Returns "extracted", "skipped" if the file already matches, or "kept" if it was changed since extracting
+def _extract_file(
+    readers: _ZipReaders, info: zipfile.ZipInfo, path: str, previous: dict[str, int] | None, overwrite: bool
+) -> str:
+    mode = member_mode(info)
+    if is_current(info, path):
+        _apply_mode(path, mode)
+        return "skipped"
+    if _is_changed(info, path, previous, overwrite):
+        return "kept"
+
+    if os.path.islink(path) or os.path.isfile(path):
+        os.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
+
+    with readers.get().open(info) as src, open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    _apply_mode(path, mode)
+    return "extracted"
+
+
+def is_current_symlink(info: zipfile.ZipInfo, path: str) -> bool:
+    return os.path.islink(path) and zlib.crc32(os.readlink(path).encode("utf-8")) == info.CRC
+
+
+def _extract_symlink(zf: zipfile.ZipFile, info: zipfile.ZipInfo, path: str) -> bool:
+    target = zf.read(info).decode("utf-8")
+    if os.path.islink(path):
+        if os.readlink(path) == target:
+            return False
+        os.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+    os.symlink(target, path)
+    return True
+
+
+# Extracting over an existing template must not follow its symlinks, a member written through one
+# would end up somewhere else, possibly outside dest_dir. checked holds the folders known to be real
+def _check_parents(dest_dir: str, path: str, checked: set[str]):
+    parent = path
+    while (parent := os.path.dirname(parent)) != dest_dir and parent not in checked:
+        if os.path.islink(parent):
+            raise ValueError(
+                f"{os.path.relpath(path, dest_dir)} would be extracted through the symlink "
+                f"{os.path.relpath(parent, dest_dir)}, remove {dest_dir} and extract it again"
+            )
+        checked.add(parent)
+
+
+# Extracts a zip using a thread pool, skipping members that already match the files on disk
+# Unlike ZipFile.extractall, symlinks and executable bits are kept, which framework bundles rely on
+# Without overwrite, existing files are only replaced if they still match their CRC in previous
+def extract_zip(
+    zip_path: str,
+    dest_dir: str,
+    jobs: int | None = None,
+    previous: dict[str, int] | None = None,
+    overwrite: bool = True,
+) -> ExtractStats:
+    stats = ExtractStats()
+    files = []
+    symlinks = []
+    checked = set()
+    dest_dir = os.path.abspath(dest_dir)
+
+    with zipfile.ZipFile(zip_path) as zf:
+        for info in zf.infolist():
+            path = member_path(dest_dir, info.filename)
+            mode = member_mode(info)
+            _check_parents(dest_dir, path, checked)
+            if info.is_dir():
+                if os.path.islink(path):
+                    raise ValueError(
+                        f"{os.path.relpath(path, dest_dir)} is a folder in the zip but a symlink in {dest_dir}, "
+                        "remove it and extract it again"
+                    )
+                os.makedirs(path, exist_ok=True)
+            elif stat.S_ISLNK(mode):
+                symlinks.append((info, path))
+            else:
+                files.append((info, path))
+
+        for parent in {os.path.dirname(path) for _, path in files + symlinks}:
+            os.makedirs(parent, exist_ok=True)
+
+        readers = _ZipReaders(zip_path)
+        try:
+            with ThreadPoolExecutor(max_workers=jobs or default_jobs()) as pool:
+                results = pool.map(lambda member: _extract_file(readers, *member, previous, overwrite), files)
+                for (info, _), result in zip(files, results):
+                    if result == "extracted":
+                        stats.extracted_files += 1
+                    elif result == "skipped":
+                        stats.skipped_files += 1
+                    else:
+                        stats.kept_files.append(info.filename)
+        finally:
+            readers.close()
+
+        # symlinks are created last so no file is ever written through one of them
+        for info, path in symlinks:
+            if is_current_symlink(info, path):
+                continue
+            if _is_changed(info, path, previous, overwrite):
+                stats.kept_files.append(info.filename)
+            elif _extract_symlink(zf, info, path):
+                stats.symlinks += 1
+
+    return stats
+
+
+# Identifies a zip by its path, size and modification time
+def zip_stamp(zip_path: str) -> dict:
+    st = os.stat(zip_path)
+    return {"zip": os.path.realpath(zip_path), "size": st.st_size, "mtime": st.st_mtime_ns}
+
+
+# The stamp of the zip dest_dir was extracted from, with the CRCs of its members in "members"
+# None for templates extracted before stamps were written, or not extracted by pygame-ios at all
+def load_stamp(dest_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(dest_dir, STAMP_NAME)) as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return stamp if isinstance(stamp, dict) and isinstance(stamp.get("members"), dict) else None
+
+
+# Whether dest_dir was extracted from this zip, as it is now
+def is_extracted_from(zip_path: str, dest_dir: str) -> bool:
+    stamp = load_stamp(dest_dir)
+    return stamp is not None and all(stamp.get(key) == value for key, value in zip_stamp(zip_path).items())
+
+
+def _zip_members(zip_path: str) -> dict[str, int]:
+    with zipfile.ZipFile(zip_path) as zf:
+        return {info.filename: info.CRC for info in zf.infolist() if not info.is_dir()}
+
+
+# Removes the members of the previous zip that the new one doesn't have, unless they were changed
+# since, then the folders that are left empty
+def _remove_old_members(dest_dir: str, previous: dict[str, int], members: dict[str, int], overwrite: bool, stats):
+    dest_dir = os.path.abspath(dest_dir)
+    folders = set()
+    for name, crc in previous.items():
+        if name in members:
+            continue
+        try:
+            path = member_path(dest_dir, name)
+        except ValueError:
+            continue
+        disk = disk_crc(path)
+        if disk is None:
+            continue
+        if disk != crc and not overwrite:
+            stats.kept_files.append(name)
+            continue
+        os.remove(path)
+        stats.removed_files += 1
+        folders.add(os.path.dirname(path))
+
+    for folder in sorted(folders, key=len, reverse=True):
+        while folder != dest_dir and os.path.isdir(folder) and not os.listdir(folder):
+            os.rmdir(folder)
+            folder = os.path.dirname(folder)
+
+
+# Extracts a template zip, or brings a template extracted from another zip up to date with it
+# Only the members that differ from the files on disk are written. Files changed since the last
+# extraction, like an edited project.pbxproj, are kept unless overwrite is set
+def extract_template(zip_path: str, dest_dir: str, jobs: int | None = None, overwrite: bool = False) -> ExtractStats:
+    stamp = load_stamp(dest_dir)
+    previous = stamp["members"] if stamp else None
+    stats = extract_zip(zip_path, dest_dir, jobs, previous, overwrite)
+    members = _zip_members(zip_path)
+    if previous:
+        _remove_old_members(dest_dir, previous, members, overwrite, stats)
+
+    os.makedirs(dest_dir, exist_ok=True)
+    with open(os.path.join(dest_dir, STAMP_NAME), "w") as f:
+        json.dump({**zip_stamp(zip_path), "members": members}, f)
+    return stats
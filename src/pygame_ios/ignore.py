@@ -0,0 +1,140 @@
+"""gitignore-style rules for leaving project files out of the app."""
+
+import os
+import re
+from typing import NamedTuple
+
+IGNORE_FILE_NAME = ".pygameiosignore"
+
+# Files that never belong in the app bundle, a .pygameiosignore file can re-include them with !pattern
+DEFAULT_IGNORE_PATTERNS = [
+    # version control
+    ".git/",
+    ".hg/",
+    ".svn/",
+    ".gitignore",
+    ".gitattributes",
+    # Python caches and tooling
+    "__pycache__/",
+    "*.py[cod]",
+    ".venv/",
+    "venv/",
+    ".tox/",
+    ".nox/",
+    ".mypy_cache/",
+    ".pytest_cache/",
+    ".ruff_cache/",
+    "*.egg-info/",
+    # editors and operating systems
+    ".idea/",
+    ".vscode/",
+    "*.swp",
+    "*.swo",
+    "*~",
+    ".#*",
+    ".DS_Store",
+    "Thumbs.db",
+    # source art that the game loads exported copies of
+    "*.psd",
+    "*.kra",
+    "*.xcf",
+    "*.aseprite",
+    "*.ase",
+    "*.blend",
+    "*.blend1",
+    IGNORE_FILE_NAME,
+    ".pygameioskeep",
+]
+
+
+class IgnoreRule(NamedTuple):
+    regex: re.Pattern
+    negate: bool
+    dir_only: bool
+
+
+def _translate_glob(pattern: str) -> str:
+    i = 0
+    parts = []
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        elif c == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "".join(parts)
+
+
+def parse_rule(line: str) -> IgnoreRule | None:
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\"):
+        # \! and \# match files starting with those characters
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # like gitignore, a slash anywhere but the end anchors the pattern to the project folder
+    if "/" in line:
+        regex = "^" + _translate_glob(line.lstrip("/")) + "$"
+    else:
+        regex = "^(?:.*/)?" + _translate_glob(line) + "$"
+    return IgnoreRule(re.compile(regex), negate, dir_only)
+
+
+class IgnoreRules:
+    def __init__(self, patterns: list[str]):
+        self.rules = [rule for rule in map(parse_rule, patterns) if rule]
+
+    # Built-in defaults, followed by the project's .pygameiosignore if it has one
+    @classmethod
+    def for_project(cls, project_folder_path: str) -> "IgnoreRules":
+        patterns = list(DEFAULT_IGNORE_PATTERNS)
+        try:
+            with open(os.path.join(project_folder_path, IGNORE_FILE_NAME)) as f:
+                patterns.extend(f.readlines())
+        except FileNotFoundError:
+            pass
+        return cls(patterns)
+
+    # rel_path uses forward slashes and is relative to the project folder, the last matching rule wins
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        ignored = False
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.negate == ignored and rule.regex.match(rel_path):
+                ignored = not rule.negate
+        return ignored
+
+    # for rule files that select files to keep rather than ignore
+    matches = is_ignored
@@ -0,0 +1,321 @@
+"""Installs pure Python packages into both app_packages folders of a template in one pass."""
+
+import csv
+import email.parser
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, field
+
+from pygame_ios.cache import get_cache_dir
+from pygame_ios.precompile import TEMPLATE_PYTHON_VERSION
+
+APP_PACKAGES_DIRS = ("app_packages.iphoneos", "app_packages.iphonesimulator")
+STAGING_DIR_NAME = ".pygame-ios-install"
+
+# wheel platform tags of the devices and simulators the template runs on, pure Python wheels match any of them
+IOS_PLATFORMS = ("ios_13_0_arm64_iphoneos", "ios_13_0_arm64_iphonesimulator", "ios_13_0_x86_64_iphonesimulator")
+
+# how pip reports a requirement it found no usable wheel for
+NO_DISTRIBUTION_PATTERN = re.compile(r"No matching distribution found for (\S+)")
+
+REQUIREMENT_PATTERN = re.compile(
+    r"^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(?P<spec>[^;#]*)"
+)
+
+
+@dataclass
+class InstallStats:
+    installed: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    linked_files: int = 0
+    copied_files: int = 0
+
+
+class InstallError(Exception):
+    pass
+
+
+def get_wheel_cache_dir() -> str:
+    return os.path.join(get_cache_dir(), "wheels")
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def read_requirements(path: str) -> list[str]:
+    requirements = []
+    with open(path) as f:
+        for line in f:
+            line = line.split(" #", 1)[0].strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith(("-r ", "--requirement ")):
+                nested = line.split(None, 1)[1]
+                requirements.extend(read_requirements(os.path.join(os.path.dirname(path), nested)))
+            elif not line.startswith("-"):
+                requirements.append(line)
+    return requirements
+
+
+# Returns the normalised name and the pinned version of a requirement, the version is None unless pinned with ==
+def parse_requirement(requirement: str) -> tuple[str, str | None] | None:
+    match = REQUIREMENT_PATTERN.match(requirement)
+    if not match:
+        return None
+    spec = match["spec"].strip()
+    version = None
+    if spec.startswith("==") and "," not in spec and "*" not in spec:
+        version = spec[2:].strip()
+    elif spec:
+        version = ""
+    return normalize_name(match["name"]), version
+
+
+# Reads name and version of every distribution installed in a folder from its METADATA
+def installed_distributions(app_packages_dir: str) -> dict[str, tuple[str, str]]:
+    distributions = {}
+    if not os.path.isdir(app_packages_dir):
+        return distributions
+    for entry in os.listdir(app_packages_dir):
+        if not entry.endswith(".dist-info"):
+            continue
+        try:
+            with open(os.path.join(app_packages_dir, entry, "METADATA"), encoding="utf-8") as f:
+                metadata = email.parser.Parser().parse(f, headersonly=True)
+        except OSError:
+            continue
+        name = metadata.get("Name")
+        if name:
+            distributions[normalize_name(name)] = (metadata.get("Version", ""), entry)
+    return distributions
+
+
+# A requirement is satisfied if both folders have it installed, at the pinned version if there is one
+# Requirements with other specifiers like >= are always passed to pip
+def is_satisfied(requirement: str, installed: list[dict[str, tuple[str, str]]]) -> bool:
+    parsed = parse_requirement(requirement)
+    if parsed is None:
+        return False
+    name, version = parsed
+    if version == "":
+        return False
+    for distributions in installed:
+        if name not in distributions:
+            return False
+        if version is not None and distributions[name][0] != version:
+            return False
+    return True
+
+
+def _run_pip(python: str, args: list[str]):
+    result = subprocess.run([python, "-m", "pip", *args])
+    if result.returncode != 0:
+        raise InstallError(f"pip {args[0]} failed with exit code {result.returncode}.")
+
+
+# Like _run_pip, but returns pip's error output instead of showing it, or None if pip succeeded
+def _run_pip_captured(python: str, args: list[str]) -> str | None:
+    result = subprocess.run([python, "-m", "pip", *args], stderr=subprocess.PIPE, text=True)
+    return result.stderr if result.returncode != 0 else None
+
+
+def _check_pure(staging_dir: str):
+    binary = []
+    for entry in os.listdir(staging_dir):
+        if not entry.endswith(".dist-info"):
+            continue
+        try:
+            with open(os.path.join(staging_dir, entry, "WHEEL")) as f:
+                wheel = email.parser.Parser().parse(f, headersonly=True)
+        except OSError:
+            continue
+        if wheel.get("Root-Is-Purelib", "true").strip().lower() != "true":
+            binary.append(entry.removesuffix(".dist-info"))
+    if binary:
+        raise InstallError(
+            "These packages contain binary modules, which need wheels built for iOS: "
+            + ", ".join(binary)
+        )
+
+
+# Arguments that make pip pick wheels and resolve environment markers for the template, not this machine
+def target_args() -> list[str]:
+    major, minor = TEMPLATE_PYTHON_VERSION
+    args = ["--only-binary=:all:", "--python-version", f"{major}.{minor}"]
+    for platform in IOS_PLATFORMS:
+        args += ["--platform", platform]
+    return args
+
+
+# Downloads wheels for the requirements and their dependencies into wheel_dir, resolved for the template
+# Packages that only publish sources are built into wheels one at a time, pure Python ones build the same
+# here as on iOS. Any other failure, like a typo or no network, is raised
+def download_wheels(python: str, wheel_dir: str, find_links: list[str], requirements: list[str]):
+    major, minor = TEMPLATE_PYTHON_VERSION
+    built = set()
+    while True:
+        error = _run_pip_captured(
+            python, ["download", "--quiet", "--dest", wheel_dir, *target_args(), *find_links, *requirements]
+        )
+        if error is None:
+            return
+        match = NO_DISTRIBUTION_PATTERN.search(error)
+        parsed = parse_requirement(match[1]) if match else None
+        if parsed is None or parsed[0] in built:
+            print(error, end="", file=sys.stderr)
+            raise InstallError("pip download failed.")
+        name = parsed[0]
+        built.add(name)
+
+        with tempfile.TemporaryDirectory() as source_dir:
+            # only the one package comes from source, its dependencies are resolved again on the next pass
+            error = _run_pip_captured(
+                python,
+                [
+                    "download", "--quiet", "--no-deps", "--no-binary", name,
+                    "--python-version", f"{major}.{minor}",
+                    "--dest", source_dir, *find_links, match[1],
+                ],
+            )
+            if error is not None:
+                if NO_DISTRIBUTION_PATTERN.search(error):
+                    raise InstallError(f"No wheel or source distribution was found for {match[1]}.")
+                print(error, end="", file=sys.stderr)
+                raise InstallError(f"pip could not download the source of {match[1]}.")
+            print(f"{match[1]} has no wheel, building it from source.")
+            sources = [os.path.join(source_dir, entry) for entry in os.listdir(source_dir)]
+            _run_pip(python, ["wheel", "--quiet", "--no-deps", "--wheel-dir", wheel_dir, *sources])
+
+
+def _remove(path: str):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+# Removes the files an installed distribution lists in its RECORD, and the folders left empty
+# Folders shared with other distributions, like namespace packages, keep their other files
+def remove_distribution(app_packages_dir: str, dist_info: str):
+    root = os.path.realpath(app_packages_dir)
+    try:
+        with open(os.path.join(app_packages_dir, dist_info, "RECORD"), newline="", encoding="utf-8") as f:
+            paths = [row[0] for row in csv.reader(f) if row]
+    except OSError:
+        paths = []
+
+    folders = set()
+    for rel in paths:
+        path = os.path.realpath(os.path.join(app_packages_dir, rel))
+        # console scripts are recorded outside the folder, and were never copied
+        if os.path.commonpath([root, path]) != root or path == root:
+            continue
+        # bytecode written by --precompile isn't in the RECORD
+        if path.endswith(".py"):
+            folder, name = os.path.split(path)
+            _remove(path + "c")
+            cache_dir = os.path.join(folder, "__pycache__")
+            if os.path.isdir(cache_dir):
+                for entry in os.listdir(cache_dir):
+                    if entry.startswith(name[:-3] + ".") and entry.endswith(".pyc"):
+                        os.remove(os.path.join(cache_dir, entry))
+                folders.add(cache_dir)
+        _remove(path)
+        folders.add(os.path.dirname(path))
+    _remove(os.path.join(app_packages_dir, dist_info))
+
+    # deepest first, so a folder's empty subfolders are gone before it is checked
+    for folder in sorted(folders, key=len, reverse=True):
+        while folder != root and os.path.isdir(folder) and not os.listdir(folder):
+            os.rmdir(folder)
+            folder = os.path.dirname(folder)
+
+
+# Hardlinks a file or folder, copying instead where the filesystem doesn't support links
+# Files already at dst are replaced, other files in folders at dst are left alone
+def link_tree(src: str, dst: str, stats: InstallStats):
+    if os.path.isdir(src):
+        if not os.path.isdir(dst) or os.path.islink(dst):
+            _remove(dst)
+        os.makedirs(dst, exist_ok=True)
+        for entry in os.listdir(src):
+            link_tree(os.path.join(src, entry), os.path.join(dst, entry), stats)
+        return
+    _remove(dst)
+    try:
+        os.link(src, dst)
+        stats.linked_files += 1
+    except OSError:
+        shutil.copy2(src, dst)
+        stats.copied_files += 1
+
+
+# Resolves, downloads and unpacks the requirements once, then links the result into both app_packages
+# folders. Wheels are kept in a persistent cache, and with a wheelhouse no network access is needed
+def install_packages(
+    template_dir: str,
+    requirements: list[str],
+    wheelhouse: str | None = None,
+    python: str = sys.executable,
+) -> InstallStats:
+    stats = InstallStats()
+    app_packages = [os.path.join(template_dir, d) for d in APP_PACKAGES_DIRS]
+    installed = [installed_distributions(path) for path in app_packages]
+
+    pending = []
+    for requirement in requirements:
+        if is_satisfied(requirement, installed):
+            stats.skipped.append(requirement)
+        else:
+            pending.append(requirement)
+    if not pending:
+        return stats
+
+    wheel_dir = get_wheel_cache_dir()
+    os.makedirs(wheel_dir, exist_ok=True)
+    find_links = ["--find-links", wheel_dir]
+    if wheelhouse:
+        find_links = ["--no-index", "--find-links", wheelhouse] + find_links
+
+    # downloads wheels for everything once, already cached wheels are reused
+    download_wheels(python, wheel_dir, find_links, pending)
+
+    # the staging folder is inside the template so it's on the same filesystem for hardlinks
+    staging_dir = os.path.join(os.path.dirname(template_dir), STAGING_DIR_NAME)
+    _remove(staging_dir)
+    try:
+        _run_pip(
+            python,
+            [
+                "install", "--quiet", "--no-compile", "--no-index", *target_args(),
+                "--target", staging_dir,
+                "--find-links", wheel_dir,
+                *(["--find-links", wheelhouse] if wheelhouse else []),
+                *pending,
+            ],
+        )
+        _check_pure(staging_dir)
+
+        # console scripts can't be run on iOS
+        _remove(os.path.join(staging_dir, "bin"))
+
+        staged = installed_distributions(staging_dir)
+        for target, distributions in zip(app_packages, installed):
+            os.makedirs(target, exist_ok=True)
+            # remove the files of older versions, so modules they dropped don't linger
+            for name in staged:
+                if name in distributions:
+                    remove_distribution(target, distributions[name][1])
+            for entry in os.listdir(staging_dir):
+                link_tree(os.path.join(staging_dir, entry), os.path.join(target, entry), stats)
+
+        stats.installed = sorted(f"{name}=={version}" for name, (version, _) in staged.items())
+    finally:
+        _remove(staging_dir)
+
+    return stats
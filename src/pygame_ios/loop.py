@@ -0,0 +1,121 @@
+"""Fixed timestep game loop, so the game runs at the same speed at any frame rate.
+
+    loop = FixedStepLoop(update, render, events=handle_events)
+
+    # on iOS
+    _ios_tick = loop.tick
+
+    # on desktop
+    loop.run(framerate=60)
+
+update(dt) is called with the same dt every time, as often as needed to catch up with real time, so
+it can be called zero, one or several times per frame. render(alpha) is called once per frame, alpha
+is how far real time is between the last update and the next one, from 0 to 1. Draw moving things
+at previous + (current - previous) * alpha to keep motion smooth when the two rates don't match.
+"""
+
+import time
+
+DEFAULT_STEP = 1 / 60
+# at most this many updates per frame, the time that's left is dropped instead of catching up later
+MAX_STEPS = 5
+# while overloaded, rendering is skipped to make time for updates, but never this many frames in a row
+MAX_SKIPPED_RENDERS = 2
+# frame times this close to a whole number of steps are rounded to it, so vsync jitter
+# doesn't alternate between zero and two updates per frame
+SNAP_TOLERANCE = 0.0002
+
+
+class FixedStepLoop:
+    # update(dt) and events() can return True to stop the loop, like _ios_tick
+    # With a profiler, every frame is recorded with "events" and "update" phases, render can mark its own
+    def __init__(
+        self,
+        update,
+        render,
+        events=None,
+        step: float = DEFAULT_STEP,
+        max_steps: int = MAX_STEPS,
+        max_skipped_renders: int = MAX_SKIPPED_RENDERS,
+        profiler=None,
+    ):
+        self.update = update
+        self.render = render
+        self.events = events
+        self.step = step
+        self.max_steps = max_steps
+        self.max_skipped_renders = max_skipped_renders
+        self.profiler = profiler
+
+        # replaced by benchmarks to simulate frame times
+        self.timer = time.perf_counter
+
+        self.accumulator = 0.0
+        self.last_time = None
+        self.alpha = 0.0
+        # updates in the last frame, whether it hit max_steps, and the total time dropped because of it
+        self.steps = 0
+        self.overloaded = False
+        self.dropped_time = 0.0
+        self.skipped_renders = 0
+
+    # Runs one frame, returns True when the game should exit
+    def tick(self) -> bool:
+        profiler = self.profiler
+        if profiler is None:
+            return self._tick(None)
+        profiler.start_frame()
+        # the frame is recorded however it ends, including when the game exits or raises
+        try:
+            return self._tick(profiler)
+        finally:
+            profiler.end_frame()
+
+    def _tick(self, profiler) -> bool:
+        if self.events is not None:
+            if self.events():
+                return True
+            if profiler is not None:
+                profiler.mark("events")
+
+        now = self.timer()
+        # the first frame runs one update, there's no previous frame to measure from
+        elapsed = self.step if self.last_time is None else now - self.last_time
+        self.last_time = now
+        steps = round(elapsed / self.step)
+        if steps and abs(elapsed - steps * self.step) < SNAP_TOLERANCE:
+            elapsed = steps * self.step
+        self.accumulator += elapsed
+
+        self.steps = 0
+        self.overloaded = False
+        while self.accumulator >= self.step:
+            if self.steps == self.max_steps:
+                # the updates can't keep up, drop the time instead of falling further behind every frame
+                dropped = self.accumulator - self.accumulator % self.step
+                self.accumulator -= dropped
+                self.dropped_time += dropped
+                self.overloaded = True
+                break
+            if self.update(self.step):
+                return True
+            self.accumulator -= self.step
+            self.steps += 1
+        if profiler is not None:
+            profiler.mark("update")
+
+        self.alpha = self.accumulator / self.step
+        if self.overloaded and self.skipped_renders < self.max_skipped_renders:
+            self.skipped_renders += 1
+        else:
+            self.skipped_renders = 0
+            self.render(self.alpha)
+        return False
+
+    # Calls tick until it returns True, waiting between frames to run at most framerate frames per second
+    def run(self, framerate: float = 60):
+        import pygame
+
+        clock = pygame.Clock()
+        while not self.tick():
+            clock.tick(framerate)
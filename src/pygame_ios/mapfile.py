@@ -0,0 +1,273 @@
+"""Compiled Sprite Fusion tilemaps, and loading them at runtime.
+
+compile_map() turns a Sprite Fusion map export (map.json) or project file into one binary file:
+a header, a layer table, a uint16 tile grid per layer, a collider bitmap, an entity table and
+the spritesheet PNG. Every section is aligned, so load_map() memory-maps the file and reads the
+grids in place instead of parsing anything:
+
+    tilemap = load_map(os.path.join(ASSETS_PATH, "map.pgmap"))
+    tileset = tilemap.load_spritesheet().convert_alpha()
+"""
+
+import base64
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import NamedTuple
+
+MAP_SUFFIX = ".pgmap"
+MAGIC = b"PGIOMAP\0"
+VERSION = 1
+ALIGNMENT = 64
+
+# Grid value of cells without a tile
+EMPTY_TILE = 0xFFFF
+
+# magic, version, tile size, width, height, layer count, reserved, entity count,
+# collider bitmap offset, entity table offset, attributes offset and size, spritesheet offset and size
+HEADER = struct.Struct("<8sHHIIHHIQQQQQQ")
+# grid offset, name length, collider, followed by the UTF-8 name
+LAYER = struct.Struct("<QH?x")
+# x, y, tile id, layer index
+ENTITY = struct.Struct("<IIHH")
+
+DATA_URL_PREFIX = "data:image/png;base64,"
+
+
+class MapLayer(NamedTuple):
+    name: str
+    collider: bool
+    # width * height tile ids, row by row, EMPTY_TILE where there's no tile
+    grid: memoryview
+
+
+class MapEntity(NamedTuple):
+    x: int
+    y: int
+    tile_id: int
+    layer: str
+    attributes: dict
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# Sprite Fusion project files store tiles in pixels, on the spritesheet they were painted from.
+# Converts one to the layout of a map export, trimmed to the painted area like the export is
+def _project_to_export(project: dict) -> tuple[dict, bytes | None]:
+    tile_size = project["tileSize"]
+    sheet_ids = {tile["spriteSheetId"] for layer in project["layers"] for tile in layer["tiles"]}
+    if len(sheet_ids) > 1:
+        raise ValueError(
+            "Maps using more than one spritesheet can't be compiled, export them from Sprite Fusion first."
+        )
+
+    all_tiles = [tile for layer in project["layers"] for tile in layer["tiles"]]
+    min_x = min((tile["x"] for tile in all_tiles), default=0) // tile_size
+    min_y = min((tile["y"] for tile in all_tiles), default=0) // tile_size
+    max_x = max((tile["x"] for tile in all_tiles), default=0) // tile_size
+    max_y = max((tile["y"] for tile in all_tiles), default=0) // tile_size
+
+    layers = []
+    for layer in project["layers"]:
+        tiles = []
+        for tile in layer["tiles"]:
+            converted = {
+                "id": tile["id"],
+                "x": tile["x"] // tile_size - min_x,
+                "y": tile["y"] // tile_size - min_y,
+            }
+            if tile.get("attributes"):
+                converted["attributes"] = {a["key"]: a["value"] for a in tile["attributes"]}
+            tiles.append(converted)
+        layers.append({"name": layer["name"], "tiles": tiles, "collider": layer["collider"]})
+
+    spritesheet = None
+    if sheet_ids:
+        data_url = project["spriteSheets"][sheet_ids.pop()]["base64"]
+        spritesheet = base64.b64decode(data_url.removeprefix(DATA_URL_PREFIX))
+
+    export = {
+        "tileSize": tile_size,
+        "mapWidth": max_x - min_x + 1,
+        "mapHeight": max_y - min_y + 1,
+        "layers": layers,
+    }
+    return export, spritesheet
+
+
+# Compiles a Sprite Fusion map into map_path. The spritesheet comes from the project file,
+# the spritesheet argument, or the spritesheet.png that Sprite Fusion exports next to map.json
+def compile_map(json_path: str, map_path: str, spritesheet: str | None = None):
+    with open(json_path, encoding="utf-8") as f:
+        map_data = json.load(f)
+
+    sheet_data = None
+    if "spriteSheets" in map_data:
+        map_data, sheet_data = _project_to_export(map_data)
+    if spritesheet is None and sheet_data is None:
+        default_sheet = os.path.join(os.path.dirname(json_path), "spritesheet.png")
+        if os.path.isfile(default_sheet):
+            spritesheet = default_sheet
+    if spritesheet is not None:
+        with open(spritesheet, "rb") as f:
+            sheet_data = f.read()
+    sheet_data = sheet_data or b""
+
+    tile_size = map_data["tileSize"]
+    width = map_data["mapWidth"]
+    height = map_data["mapHeight"]
+    layers = map_data["layers"]
+
+    grids = []
+    colliders = bytearray((width * height + 7) // 8)
+    entities = []
+    attributes = []
+    for index, layer in enumerate(layers):
+        grid = array("H", [EMPTY_TILE]) * (width * height)
+        for tile in layer["tiles"]:
+            x, y = tile["x"], tile["y"]
+            if not (0 <= x < width and 0 <= y < height):
+                continue
+            tile_id = int(tile["id"])
+            grid[y * width + x] = tile_id
+            if layer["collider"]:
+                colliders[(y * width + x) // 8] |= 1 << ((y * width + x) % 8)
+            if tile.get("attributes"):
+                entities.append(ENTITY.pack(x, y, tile_id, index))
+                attributes.append(tile["attributes"])
+        if sys.byteorder != "little":
+            grid.byteswap()
+        grids.append(grid.tobytes())
+
+    names = [layer["name"].encode("utf-8") for layer in layers]
+    attributes_data = json.dumps(attributes, separators=(",", ":")).encode("utf-8")
+
+    # lay out the sections after the header and layer table
+    offset = _align(HEADER.size + sum(LAYER.size + len(name) for name in names))
+    grid_offsets = []
+    for grid in grids:
+        grid_offsets.append(offset)
+        offset = _align(offset + len(grid))
+    collider_offset = offset
+    entities_offset = _align(collider_offset + len(colliders))
+    attributes_offset = _align(entities_offset + ENTITY.size * len(entities))
+    spritesheet_offset = _align(attributes_offset + len(attributes_data))
+
+    sections = [
+        *zip(grid_offsets, grids),
+        (collider_offset, colliders),
+        (entities_offset, b"".join(entities)),
+        (attributes_offset, attributes_data),
+        (spritesheet_offset, sheet_data),
+    ]
+
+    tmp_path = map_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC, VERSION, tile_size, width, height, len(layers), 0, len(entities),
+                collider_offset, entities_offset, attributes_offset, len(attributes_data),
+                spritesheet_offset, len(sheet_data),
+            )
+        )
+        for layer, name, grid_offset in zip(layers, names, grid_offsets):
+            f.write(LAYER.pack(grid_offset, len(name), bool(layer["collider"])))
+            f.write(name)
+        for section_offset, data in sections:
+            f.write(b"\0" * (section_offset - f.tell()))
+            f.write(data)
+    os.replace(tmp_path, map_path)
+
+
+class CompiledMap:
+    # Reads a compiled map from any buffer, like a memory-mapped file or AssetPack.buffer()
+    # Grids are views into the buffer, only the layer table and the entities are parsed
+    def __init__(self, buffer, name: str = "<buffer>"):
+        self.name = name
+        self.data = memoryview(buffer)
+        (
+            magic, version, self.tile_size, self.width, self.height, layer_count, _, entity_count,
+            self.collider_offset, entities_offset, attributes_offset, attributes_size,
+            self.spritesheet_offset, self.spritesheet_size,
+        ) = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{name} is not a compiled pygame-ios map")
+        if sys.byteorder != "little":
+            raise ValueError("Compiled maps can only be read on little-endian machines")
+
+        cells = self.width * self.height
+        self.layers = []
+        position = HEADER.size
+        for _ in range(layer_count):
+            grid_offset, name_length, collider = LAYER.unpack_from(self.data, position)
+            position += LAYER.size
+            layer_name = self.data[position : position + name_length].tobytes().decode("utf-8")
+            position += name_length
+            grid = self.data[grid_offset : grid_offset + cells * 2].cast("H")
+            self.layers.append(MapLayer(layer_name, collider, grid))
+
+        self.colliders = self.data[self.collider_offset : self.collider_offset + (cells + 7) // 8]
+
+        attributes = json.loads(
+            str(self.data[attributes_offset : attributes_offset + attributes_size], "utf-8")
+        )
+        self.entities = []
+        for i in range(entity_count):
+            x, y, tile_id, layer_index = ENTITY.unpack_from(self.data, entities_offset + i * ENTITY.size)
+            self.entities.append(MapEntity(x, y, tile_id, self.layers[layer_index].name, attributes[i]))
+
+    def layer(self, name: str) -> MapLayer:
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+        raise KeyError(name)
+
+    def tile(self, layer_name: str, x: int, y: int) -> int:
+        return self.layer(layer_name).grid[y * self.width + x]
+
+    def is_collider(self, x: int, y: int) -> bool:
+        cell = y * self.width + x
+        return bool(self.colliders[cell >> 3] & (1 << (cell & 7)))
+
+    # Tile positions of every collider tile, row by row
+    def collider_tiles(self) -> list[tuple[int, int]]:
+        width = self.width
+        tiles = []
+        for byte_index, byte in enumerate(self.colliders):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    cell = byte_index * 8 + bit
+                    tiles.append((cell % width, cell // width))
+        return tiles
+
+    def find_entity(self, key: str, value) -> MapEntity | None:
+        for entity in self.entities:
+            if entity.attributes.get(key) == value:
+                return entity
+        return None
+
+    # The spritesheet PNG, without copying it out of the buffer
+    def spritesheet(self) -> memoryview:
+        return self.data[self.spritesheet_offset : self.spritesheet_offset + self.spritesheet_size]
+
+    def load_spritesheet(self):
+        import io
+
+        import pygame
+
+        if not self.spritesheet_size:
+            raise ValueError(f"{self.name} was compiled without a spritesheet")
+        return pygame.image.load(io.BytesIO(self.spritesheet()), "spritesheet.png")
+
+
+def load_map(map_path: str) -> CompiledMap:
+    with open(map_path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return CompiledMap(mapped, map_path)
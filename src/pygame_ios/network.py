@@ -0,0 +1,48 @@
+"""One HTTP session shared by every request to GitHub, with keep-alive, timeouts and retries."""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# seconds to wait for a connection, and between bytes of a response
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+
+# failed requests are retried after 0.5, 1 and 2 seconds, or after the server's Retry-After
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _TimeoutSession(requests.Session):
+    # requests waits forever by default, this gives every request a timeout unless it sets its own
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+        return super().request(method, url, **kwargs)
+
+
+_session = None
+
+
+def retry_delay(attempt: int) -> float:
+    return BACKOFF_FACTOR * 2**attempt
+
+
+# The session is created on first use, so commands that never touch the network don't pay for it
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=RETRIES,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=("GET", "HEAD"),
+            # the callers check the status themselves, like they would without retries
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=4)
+        _session = _TimeoutSession()
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+        _session.headers["User-Agent"] = "pygame-ios"
+    return _session
@@ -0,0 +1,265 @@
+"""Pymunk physics scenes that stay fast with thousands of balls.
+
+    scene = PhysicsScene(screen.get_rect(), gravity=(0, 981), remove_sleeping=True)
+    scene.add_walls()
+    scene.spawn_ball((200, 50), radius=20, color="orange")
+
+    def update(dt):
+        scene.step(dt)
+
+    def render(alpha):
+        screen.fill("black")
+        scene.draw(screen)
+
+Removed balls go back to a BallPool, and spawn_ball reuses their bodies and shapes. Every few
+steps, balls that left the bounds are removed, and so are sleeping ones with remove_sleeping. draw()
+blits a pre-rendered sprite for every ball on screen with one fblits call, instead of drawing every
+shape with space.debug_draw. Each step is split into substeps, fewer of them while stepping takes
+longer than step_budget.
+"""
+
+import math
+import time
+
+import pygame
+
+try:
+    import pymunk
+except ImportError:
+    raise ImportError(
+        'pygame_ios.physics needs pymunk, install it with pip install "pygame-ios[physics]", '
+        "and in the template as described in the pymunk section of the examples README"
+    ) from None
+
+DEFAULT_ELASTICITY = 0.95
+DEFAULT_FRICTION = 0.5
+# seconds a pile of balls has to be at rest before it sleeps
+DEFAULT_SLEEP_TIME = 1.0
+# balls this far outside the bounds are removed, so ones bouncing off the edge aren't
+DEFAULT_MARGIN = 100
+# lost balls are looked for every this many steps, 10 times a second at 60 steps per second, as
+# going through every ball costs almost a fifth of a step with thousands of them
+REMOVE_INTERVAL = 6
+
+# substeps per step start at max_substeps, and drop to min_substeps at the least while a step takes
+# longer than the budget. They go back up when the step would still fit the budget with one more
+DEFAULT_MIN_SUBSTEPS = 1
+DEFAULT_MAX_SUBSTEPS = 4
+DEFAULT_STEP_BUDGET = 0.006
+# a step has to fit in this fraction of the budget with one more substep, so the count doesn't flap
+SUBSTEP_HEADROOM = 0.75
+
+WALL_COLOR = (128, 128, 128)
+
+
+# Draws a ball once, with an outline so touching balls of the same color can be told apart
+def render_ball(radius: int, color) -> pygame.Surface:
+    color = pygame.Color(color)
+    size = radius * 2 + 1
+    surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.aacircle(surf, color, (radius, radius), radius)
+    if radius > 2:
+        outline = color.lerp("black", 0.4)
+        pygame.draw.aacircle(surf, outline, (radius, radius), radius, max(radius // 8, 1))
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert_alpha()
+    return surf
+
+
+# Keeps the bodies and shapes of removed balls, so spawning doesn't allocate new ones
+class BallPool:
+    def __init__(self):
+        self.free = []
+        # balls created and reused over the pool's lifetime
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self) -> int:
+        return len(self.free)
+
+    # Returns a body and circle that aren't in any space, reset to the given settings
+    def acquire(
+        self, position, radius: float, mass: float, elasticity: float, friction: float
+    ) -> tuple[pymunk.Body, pymunk.Circle]:
+        if self.free:
+            body, shape = self.free.pop()
+            body.velocity = (0, 0)
+            body.angular_velocity = 0
+            body.angle = 0
+            body.force = (0, 0)
+            body.torque = 0
+            if shape.radius != radius:
+                # safe here, the shape isn't in a space
+                shape.unsafe_set_radius(radius)
+            self.reused += 1
+        else:
+            body = pymunk.Body()
+            shape = pymunk.Circle(body, radius)
+            self.created += 1
+        body.position = position
+        # setting the mass again also recalculates the moment for the new radius
+        shape.mass = mass
+        shape.elasticity = elasticity
+        shape.friction = friction
+        return body, shape
+
+    def release(self, body: pymunk.Body, shape: pymunk.Circle):
+        self.free.append((body, shape))
+
+
+class PhysicsScene:
+    # bounds is the area balls stay in, usually the screen. max_balls removes the oldest ball when
+    # another one is spawned, so the number of balls can't grow forever
+    def __init__(
+        self,
+        bounds,
+        gravity=(0, 981),
+        remove_sleeping: bool = False,
+        sleep_time: float = DEFAULT_SLEEP_TIME,
+        margin: float = DEFAULT_MARGIN,
+        max_balls: int | None = None,
+        remove_interval: int = REMOVE_INTERVAL,
+        min_substeps: int = DEFAULT_MIN_SUBSTEPS,
+        max_substeps: int = DEFAULT_MAX_SUBSTEPS,
+        step_budget: float = DEFAULT_STEP_BUDGET,
+    ):
+        if not 1 <= min_substeps <= max_substeps:
+            raise ValueError("Substeps must be at least 1, and min_substeps can't be more than max_substeps")
+        self.bounds = pygame.Rect(bounds)
+        self.space = pymunk.Space()
+        self.space.gravity = gravity
+        self.remove_sleeping = remove_sleeping
+        if remove_sleeping:
+            # bodies only ever sleep with a threshold set
+            self.space.sleep_time_threshold = sleep_time
+        self.margin = margin
+        self.max_balls = max_balls
+        self.remove_interval = remove_interval
+        self.steps = 0
+
+        self.pool = BallPool()
+        # ball bodies in the order they were spawned, with their shape, sprite and sprite offset
+        self.balls = {}
+        # pre-rendered sprites by whole pixel radius and color
+        self.sprites = {}
+        self.walls = []
+
+        self.min_substeps = min_substeps
+        self.max_substeps = max_substeps
+        self.substeps = max_substeps
+        self.step_budget = step_budget
+        # seconds the last step took, and the balls removed since the scene was created
+        self.step_time = 0.0
+        self.removed = 0
+
+    def __len__(self) -> int:
+        return len(self.balls)
+
+    def add_wall(self, a, b, radius: float = 0, elasticity: float = DEFAULT_ELASTICITY) -> pymunk.Segment:
+        wall = pymunk.Segment(self.space.static_body, a, b, radius)
+        wall.elasticity = elasticity
+        wall.friction = DEFAULT_FRICTION
+        self.space.add(wall)
+        self.walls.append(wall)
+        return wall
+
+    # Walls just outside the bounds on every side
+    def add_walls(self, elasticity: float = DEFAULT_ELASTICITY) -> list[pymunk.Segment]:
+        left, top, right, bottom = self.bounds.left - 1, self.bounds.top - 1, self.bounds.right, self.bounds.bottom
+        return [
+            self.add_wall((left, bottom), (right, bottom), elasticity=elasticity),
+            self.add_wall((right, bottom), (right, top), elasticity=elasticity),
+            self.add_wall((left, top), (right, top), elasticity=elasticity),
+            self.add_wall((left, top), (left, bottom), elasticity=elasticity),
+        ]
+
+    def sprite(self, radius: float, color) -> pygame.Surface:
+        key = (max(round(radius), 1), tuple(pygame.Color(color)))
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = render_ball(*key)
+        return sprite
+
+    # Returns the ball's body, mass defaults to the radius
+    def spawn_ball(
+        self,
+        position,
+        radius: float,
+        color="white",
+        mass: float | None = None,
+        elasticity: float = DEFAULT_ELASTICITY,
+        friction: float = DEFAULT_FRICTION,
+    ) -> pymunk.Body:
+        if self.max_balls is not None and len(self.balls) >= self.max_balls:
+            self.remove(next(iter(self.balls)))
+        body, shape = self.pool.acquire(position, radius, radius if mass is None else mass, elasticity, friction)
+        self.space.add(body, shape)
+        sprite = self.sprite(radius, color)
+        self.balls[body] = (shape, sprite, sprite.width // 2)
+        return body
+
+    def remove(self, body: pymunk.Body):
+        shape, _, _ = self.balls.pop(body)
+        self.space.remove(body, shape)
+        self.pool.release(body, shape)
+        self.removed += 1
+
+    # Removes the balls outside the bounds, and the sleeping ones with remove_sleeping
+    # Returns how many were removed
+    def remove_lost(self) -> int:
+        margin = self.margin
+        left = self.bounds.left - margin
+        top = self.bounds.top - margin
+        right = self.bounds.right + margin
+        bottom = self.bounds.bottom + margin
+        remove_sleeping = self.remove_sleeping
+        lost = []
+        for body in self.balls:
+            x, y = body.position
+            if not (left < x < right and top < y < bottom) or (remove_sleeping and body.is_sleeping):
+                lost.append(body)
+        for body in lost:
+            self.remove(body)
+        return len(lost)
+
+    # Advances the scene by dt seconds in substeps, removing the lost balls every remove_interval steps
+    def step(self, dt: float):
+        start = time.perf_counter()
+        substeps = self.substeps
+        substep_dt = dt / substeps
+        for _ in range(substeps):
+            self.space.step(substep_dt)
+        self.steps += 1
+        if self.steps % self.remove_interval == 0:
+            self.remove_lost()
+        self.step_time = time.perf_counter() - start
+
+        if self.step_time > self.step_budget:
+            self.substeps = max(substeps - 1, self.min_substeps)
+        elif self.step_time * (substeps + 1) / substeps < self.step_budget * SUBSTEP_HEADROOM:
+            self.substeps = min(substeps + 1, self.max_substeps)
+
+    # Draws the walls, then the balls on surf with a single fblits call, returns how many balls were drawn
+    # offset is added to every position, like a camera position
+    def draw(self, surf: pygame.Surface, offset=(0, 0)) -> int:
+        offset_x, offset_y = offset
+        for wall in self.walls:
+            a = (wall.a.x + offset_x, wall.a.y + offset_y)
+            b = (wall.b.x + offset_x, wall.b.y + offset_y)
+            pygame.draw.line(surf, WALL_COLOR, a, b, max(round(wall.radius * 2), 1))
+
+        clip = surf.get_clip()
+        left = clip.left - offset_x
+        top = clip.top - offset_y
+        right = clip.right - offset_x
+        bottom = clip.bottom - offset_y
+        blits = []
+        append = blits.append
+        for body, (_, sprite, half) in self.balls.items():
+            x, y = body.position
+            # off-screen balls are skipped here instead of being clipped by fblits
+            if left - half < x < right + half and top - half < y < bottom + half:
+                # floor instead of truncating like blit does, so balls don't jump a pixel when crossing 0
+                append((sprite, (math.floor(x + offset_x) - half, math.floor(y + offset_y) - half)))
+        surf.fblits(blits)
+        return len(blits)
@@ -0,0 +1,102 @@
+"""Bytecode precompilation of the app and its packages."""
+
+import os
+import shutil
+import subprocess
+import sys
+from dataclasses import dataclass
+
+# Python version of the XCFramework in the template, bytecode is only valid for this version
+TEMPLATE_PYTHON_VERSION = (3, 13)
+
+
+@dataclass
+class PrecompileStats:
+    modules: int = 0
+    # modules whose bytecode was already compiled from their current source
+    up_to_date: int = 0
+    stripped: int = 0
+    failed: bool = False
+
+
+# Path of the bytecode compileall writes for a source, for the template's Python version
+def bytecode_path(source: str, optimize: int = 0, strip_sources: bool = False) -> str:
+    if strip_sources:
+        return source + "c"
+    folder, name = os.path.split(source)
+    major, minor = TEMPLATE_PYTHON_VERSION
+    suffix = f".opt-{optimize}" if optimize else ""
+    return os.path.join(folder, "__pycache__", f"{name[:-3]}.cpython-{major}{minor}{suffix}.pyc")
+
+
+# compiled is the set of sources known to be compiled from their current contents, like the app's
+# from the sync manifest. Without it, bytecode newer than its source counts as compiled
+def _is_compiled(source: str, optimize: int, strip_sources: bool, compiled: set[str] | None) -> bool:
+    if compiled is not None:
+        return os.path.normpath(source) in compiled and os.path.isfile(bytecode_path(source, optimize, strip_sources))
+    try:
+        return os.path.getmtime(bytecode_path(source, optimize, strip_sources)) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+
+# The bytecode has to be generated by the same Python version the template uses
+def find_python(version: tuple[int, int] = TEMPLATE_PYTHON_VERSION) -> str | None:
+    if sys.version_info[:2] == version:
+        return sys.executable
+    return shutil.which(f"python{version[0]}.{version[1]}")
+
+
+def _iter_sources(path: str):
+    for root, dirs, names in os.walk(path):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for name in names:
+            if name.endswith(".py"):
+                yield os.path.join(root, name)
+
+
+# Compiles the modules under path with unchecked hash-based .pyc files, so the device never
+# stats or hashes the sources to validate them. With strip_sources the .pyc files are written
+# next to the sources instead of __pycache__, which lets them be imported once the sources are removed
+# Modules that are already compiled are skipped, see _is_compiled
+def precompile_tree(
+    path: str,
+    python: str,
+    optimize: int = 0,
+    strip_sources: bool = False,
+    jobs: int = 0,
+    compiled: set[str] | None = None,
+) -> PrecompileStats:
+    stats = PrecompileStats()
+    sources = list(_iter_sources(path))
+    stale = [source for source in sources if not _is_compiled(source, optimize, strip_sources, compiled)]
+    stats.up_to_date = len(sources) - len(stale)
+    if stale:
+        command = [
+            python, "-m", "compileall", "-q", "-f",
+            "-j", str(jobs),
+            "-o", str(optimize),
+            "--invalidation-mode", "unchecked-hash",
+        ]
+        if strip_sources:
+            command.append("-b")
+        # compileall only compiles in parallel when it's given the folder
+        if len(stale) == len(sources):
+            result = subprocess.run([*command, path])
+        else:
+            result = subprocess.run([*command, "-i", "-"], input="\n".join(stale), text=True)
+        stats.failed = result.returncode != 0
+        stats.modules = len(stale)
+
+    if strip_sources:
+        for source in sources:
+            if os.path.isfile(source + "c"):
+                os.remove(source)
+                stats.stripped += 1
+        # bytecode cached from earlier runs would be ignored without its source anyway
+        for root, dirs, _ in os.walk(path):
+            if "__pycache__" in dirs:
+                shutil.rmtree(os.path.join(root, "__pycache__"))
+                dirs.remove("__pycache__")
+
+    return stats
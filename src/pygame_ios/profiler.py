@@ -0,0 +1,283 @@
+"""Per-phase frame timing with a ring buffer, an on-screen graph and trace dumps.
+
+    profiler = Profiler(enabled=True)
+
+    def tick():
+        profiler.start_frame()
+        handle_events()
+        profiler.mark("events")
+        draw()
+        profiler.mark("draw")
+        pygame.display.flip()
+        profiler.mark("flip")
+        profiler.end_frame()
+
+Each mark() charges the time since the previous mark to the named phase. The last `frames` frames
+are kept in arrays allocated up front, so profiling doesn't allocate while the game runs. While the
+profiler is disabled its methods are replaced with a function that does nothing.
+"""
+
+import json
+import time
+from array import array
+
+DEFAULT_FRAMES = 240
+MAX_PHASES = 16
+
+# budget line in the overlay, one frame at 60 FPS
+FRAME_BUDGET_MS = 1000 / 60
+# the overlay's legend shows averages over this many frames, and is only rendered again this often
+LEGEND_INTERVAL = 30
+
+PHASE_COLOURS = [
+    (230, 85, 70),
+    (240, 170, 50),
+    (90, 190, 90),
+    (70, 150, 230),
+    (170, 100, 220),
+    (60, 200, 200),
+    (220, 110, 170),
+    (160, 160, 160),
+]
+
+
+def _noop(*args):
+    pass
+
+
+class Profiler:
+    def __init__(
+        self,
+        phases: tuple[str, ...] = (),
+        frames: int = DEFAULT_FRAMES,
+        enabled: bool = False,
+        max_phases: int = MAX_PHASES,
+    ):
+        self.capacity = frames
+        self.max_phases = max_phases
+        self.phases = []
+        self.columns = {}
+        for name in phases:
+            self._add_phase(name)
+
+        # durations[frame * max_phases + column], frame starts and frame lengths, all in seconds
+        self.durations = array("d", bytes(8 * frames * max_phases))
+        self.frame_starts = array("d", bytes(8 * frames))
+        self.frame_lengths = array("d", bytes(8 * frames))
+        self._empty_row = array("d", bytes(8 * max_phases))
+        self.frame_count = 0
+        self.row = 0
+        self.last = 0.0
+        self.in_frame = False
+
+        self.overlay = None
+        self.overlay_frame = 0
+        self.legend = None
+        self.legend_frame = -LEGEND_INTERVAL
+
+        self.enabled = True
+        if not enabled:
+            self.disable()
+
+    def enable(self):
+        if not self.enabled:
+            for name in ("start_frame", "mark", "end_frame"):
+                delattr(self, name)
+            self.enabled = True
+
+    def disable(self):
+        if self.enabled:
+            self.start_frame = self.mark = self.end_frame = _noop
+            self.in_frame = False
+            self.enabled = False
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def _add_phase(self, name: str) -> int:
+        if len(self.phases) >= self.max_phases:
+            raise ValueError(f"A profiler can only track {self.max_phases} phases")
+        self.columns[name] = len(self.phases)
+        self.phases.append(name)
+        return self.columns[name]
+
+    def start_frame(self):
+        if self.in_frame:
+            self.end_frame()
+        now = time.perf_counter()
+        index = self.frame_count % self.capacity
+        self.row = index * self.max_phases
+        self.durations[self.row : self.row + self.max_phases] = self._empty_row
+        self.frame_starts[index] = now
+        self.last = now
+        self.in_frame = True
+
+    # Outside a frame there's no row to charge the time to, so it does nothing
+    def mark(self, name: str):
+        if not self.in_frame:
+            return
+        now = time.perf_counter()
+        column = self.columns.get(name)
+        if column is None:
+            column = self._add_phase(name)
+        self.durations[self.row + column] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        if not self.in_frame:
+            return
+        index = self.frame_count % self.capacity
+        self.frame_lengths[index] = time.perf_counter() - self.frame_starts[index]
+        self.frame_count += 1
+        self.in_frame = False
+
+    # Numbers of the recorded frames, oldest first
+    def _indices(self, last: int | None = None) -> range:
+        # a frame in progress has already overwritten the oldest frame's slot
+        count = min(self.frame_count, self.capacity - self.in_frame)
+        if last is not None:
+            count = min(count, last)
+        return range(self.frame_count - count, self.frame_count)
+
+    # The recorded frames, oldest first, as (start, length in ms, {phase: ms})
+    def frames(self) -> list[tuple[float, float, dict[str, float]]]:
+        recorded = []
+        for frame in self._indices():
+            index = frame % self.capacity
+            row = index * self.max_phases
+            phases = {
+                name: self.durations[row + column] * 1000 for column, name in enumerate(self.phases)
+            }
+            recorded.append((self.frame_starts[index], self.frame_lengths[index] * 1000, phases))
+        return recorded
+
+    # Mean milliseconds per phase over the last frames, plus the mean frame length as "frame"
+    def averages(self, last: int | None = None) -> dict[str, float]:
+        indices = self._indices(last)
+        if not indices:
+            return {}
+        totals = [0.0] * len(self.phases)
+        frame_total = 0.0
+        for frame in indices:
+            index = frame % self.capacity
+            row = index * self.max_phases
+            for column in range(len(self.phases)):
+                totals[column] += self.durations[row + column]
+            frame_total += self.frame_lengths[index]
+        averages = {
+            name: totals[column] * 1000 / len(indices) for column, name in enumerate(self.phases)
+        }
+        averages["frame"] = frame_total * 1000 / len(indices)
+        return averages
+
+    def to_json(self) -> dict:
+        frames = self.frames()
+        origin = frames[0][0] if frames else 0.0
+        return {
+            "phases": list(self.phases),
+            "frames": [
+                {"start_ms": (start - origin) * 1000, "length_ms": length, "phases": phases}
+                for start, length, phases in frames
+            ],
+        }
+
+    def dump_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=1)
+
+    # Writes the frames in the Trace Event Format, open it in chrome://tracing or ui.perfetto.dev
+    # Phases are shown back to back in the order they were first marked
+    def dump_chrome_trace(self, path: str):
+        events = []
+        frames = self.frames()
+        origin = frames[0][0] if frames else 0.0
+        for number, (start, length, phases) in enumerate(frames):
+            timestamp = (start - origin) * 1_000_000
+            events.append(
+                {
+                    "name": "frame",
+                    "cat": "frame",
+                    "ph": "X",
+                    "ts": timestamp,
+                    "dur": length * 1000,
+                    "pid": 0,
+                    "tid": 0,
+                    "args": {"frame": number},
+                }
+            )
+            for name, ms in phases.items():
+                if ms > 0:
+                    events.append(
+                        {
+                            "name": name,
+                            "cat": "phase",
+                            "ph": "X",
+                            "ts": timestamp,
+                            "dur": ms * 1000,
+                            "pid": 0,
+                            "tid": 0,
+                        }
+                    )
+                    timestamp += ms * 1000
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    # Draws a scrolling graph of the recorded frames, one column per frame with a bar per phase
+    # The graph is kept between calls, so each call only draws the frames added since the last one
+    def draw_overlay(self, surf, pos=(0, 0), size=(120, 48), scale_ms: float = 2 * FRAME_BUDGET_MS):
+        import pygame
+
+        width, height = size
+        if self.overlay is None or self.overlay.size != (width, height):
+            self.overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+            self.overlay.fill((0, 0, 0, 160))
+            self.overlay_frame = max(self.frame_count - width, 0)
+            self.font = pygame.font.Font(None, 12)
+
+        pixels_per_ms = height / scale_ms
+        new_frames = self._indices(self.frame_count - self.overlay_frame)
+        if len(new_frames) >= width:
+            self.overlay.fill((0, 0, 0, 160))
+        else:
+            self.overlay.scroll(-len(new_frames), 0)
+        for x, frame in enumerate(new_frames, width - len(new_frames)):
+            index = frame % self.capacity
+            row = index * self.max_phases
+            pygame.draw.line(self.overlay, (0, 0, 0, 160), (x, 0), (x, height))
+            bottom = height
+            for column in range(len(self.phases)):
+                bar = self.durations[row + column] * 1000 * pixels_per_ms
+                if bar >= 0.5:
+                    colour = PHASE_COLOURS[column % len(PHASE_COLOURS)]
+                    pygame.draw.line(self.overlay, colour, (x, bottom - 1), (x, max(bottom - bar, 0)))
+                bottom -= bar
+        self.overlay_frame = self.frame_count
+
+        surf.blit(self.overlay, pos)
+        budget_y = pos[1] + height - FRAME_BUDGET_MS * pixels_per_ms
+        pygame.draw.line(surf, (255, 255, 255), (pos[0], budget_y), (pos[0] + width - 1, budget_y))
+
+        if self.frame_count - self.legend_frame >= LEGEND_INTERVAL:
+            averages = self.averages(LEGEND_INTERVAL)
+            lines = [
+                self.font.render(
+                    f"{name} {averages.get(name, 0.0):.2f} ms",
+                    False,
+                    PHASE_COLOURS[column % len(PHASE_COLOURS)],
+                )
+                for column, name in enumerate(self.phases)
+            ]
+            self.legend = pygame.Surface(
+                (width, sum(line.height for line in lines) + 2), pygame.SRCALPHA
+            )
+            self.legend.fill((0, 0, 0, 160))
+            y = 1
+            for line in lines:
+                self.legend.blit(line, (1, y))
+                y += line.height
+            self.legend_frame = self.frame_count
+
+        surf.blit(self.legend, (pos[0], pos[1] + height + 1))
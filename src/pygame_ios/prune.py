@@ -0,0 +1,168 @@
+"""Reachability-based selection of the project files that go into the app."""
+
+import ast
+import fnmatch
+import os
+
+from pygame_ios.ignore import IgnoreRules
+
+KEEP_FILE_NAME = ".pygameioskeep"
+
+REASON_NOT_IMPORTED = "not imported by the entry script"
+REASON_NOT_REFERENCED = "not referenced by a string in any imported module"
+REASON_WILDCARD = 'only matched by the f-string path "{}", list it in .pygameioskeep if it is loaded that way'
+
+
+# Patterns in .pygameioskeep use the same syntax as .pygameiosignore, matching files are always kept
+def load_keep_rules(project_folder_path: str) -> IgnoreRules | None:
+    try:
+        with open(os.path.join(project_folder_path, KEEP_FILE_NAME)) as f:
+            return IgnoreRules(f.readlines())
+    except FileNotFoundError:
+        return None
+
+
+# Maps module names like "game.player" to paths relative to the app folder
+def module_names(files: dict[str, str]) -> dict[str, str]:
+    modules = {}
+    for rel in files:
+        parts = rel.split("/")
+        name = parts[-1]
+        if name.endswith(".py"):
+            stem = name[:-3]
+        elif name.endswith(".so"):
+            # extension modules are named like module.cpython-313-iphoneos.so
+            stem = name.split(".")[0]
+        else:
+            continue
+
+        if stem == "__init__":
+            module = ".".join(parts[:-1])
+        else:
+            module = ".".join(parts[:-1] + [stem])
+        if module:
+            modules[module] = rel
+    return modules
+
+
+def _package_of(rel: str) -> list[str]:
+    parts = rel.split("/")
+    return parts[:-1]
+
+
+# Absolute names of everything a module might import, submodules included
+def find_imports(tree: ast.AST, rel: str) -> set[str]:
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                package = _package_of(rel)
+                if node.level > 1:
+                    package = package[: -(node.level - 1)]
+                base = ".".join(package + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            if base:
+                names.add(base)
+            # from package import name can import a submodule
+            names.update(f"{base}.{alias.name}" if base else alias.name for alias in node.names)
+        elif (
+            isinstance(node, ast.Call)
+            and node.args
+            and isinstance(node.args[0], ast.Constant)
+            and isinstance(node.args[0].value, str)
+        ):
+            func = node.func
+            func_name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", "")
+            if func_name in ("import_module", "__import__"):
+                names.add(node.args[0].value)
+    return names
+
+
+# Strings that might be asset paths, f-strings become globs like "footstep*.wav"
+def find_path_strings(tree: ast.AST) -> set[str]:
+    strings = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            value = node.value
+        elif isinstance(node, ast.JoinedStr):
+            value = "".join(
+                part.value if isinstance(part, ast.Constant) else "*" for part in node.values
+            )
+        else:
+            continue
+
+        value = value.strip().replace("\\", "/").removeprefix("./")
+        # skip strings that can't be a file name, and globs that would match everything
+        if value and "\n" not in value and len(value) < 256 and value.strip("*/."):
+            strings.add(value)
+    return strings
+
+
+def _matches(rel: str, value: str) -> bool:
+    if "*" in value:
+        return fnmatch.fnmatchcase(rel, value) or fnmatch.fnmatchcase(rel, "*/" + value)
+    return rel == value or rel.endswith("/" + value)
+
+
+# Globs like "assets/*" from f"assets/{name}" say nothing about which file is loaded, so they don't
+# keep the files they match. Globs with part of the name, like "footstep*.wav", do
+def is_wildcard(value: str) -> bool:
+    return not value.rsplit("/", 1)[-1].strip("*")
+
+
+# Splits the project files into the ones reachable from __main__.py and the ones that can be dropped
+# Modules are followed through their imports, other files are kept when a reachable module
+# contains a string naming them, like the file names passed to os.path.join
+def prune_files(
+    files: dict[str, str], keep_rules: IgnoreRules | None = None
+) -> tuple[dict[str, str], dict[str, str]]:
+    modules = module_names(files)
+    reachable = set()
+    strings = set()
+    queue = ["__main__.py"] if "__main__.py" in files else []
+
+    while queue:
+        rel = queue.pop()
+        if rel in reachable:
+            continue
+        reachable.add(rel)
+        if not rel.endswith(".py"):
+            continue
+
+        try:
+            with open(files[rel], "rb") as f:
+                tree = ast.parse(f.read(), rel)
+        except (SyntaxError, ValueError):
+            # the device would fail on this too, keep it and let Python report the error there
+            continue
+
+        strings.update(find_path_strings(tree))
+        for name in find_imports(tree, rel):
+            parts = name.split(".")
+            # importing a.b.c also runs a/__init__.py and a/b/__init__.py
+            for depth in range(1, len(parts) + 1):
+                module_rel = modules.get(".".join(parts[:depth]))
+                if module_rel and module_rel not in reachable:
+                    queue.append(module_rel)
+
+    wildcards = sorted(value for value in strings if is_wildcard(value))
+    strings -= set(wildcards)
+
+    kept = {}
+    dropped = {}
+    module_rels = set(modules.values())
+    for rel, src in files.items():
+        if rel in reachable or (keep_rules and keep_rules.matches(rel)):
+            kept[rel] = src
+        elif rel in module_rels:
+            dropped[rel] = REASON_NOT_IMPORTED
+        elif any(_matches(rel, value) for value in strings):
+            kept[rel] = src
+        else:
+            # the report names the wildcard, in case the file is loaded through it
+            wildcard = next((value for value in wildcards if _matches(rel, value)), None)
+            dropped[rel] = REASON_WILDCARD.format(wildcard) if wildcard else REASON_NOT_REFERENCED
+    return kept, dropped
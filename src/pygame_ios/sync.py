@@ -0,0 +1,330 @@
+"""Incremental copying of project files into the Xcode template."""
+
+import hashlib
+import json
+import os
+import shutil
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable
+
+from pygame_ios.ignore import IgnoreRules
+
+MANIFEST_NAME = ".pygame-ios-manifest.json"
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class SyncStats:
+    copied_files: int = 0
+    copied_bytes: int = 0
+    skipped_files: int = 0
+    skipped_bytes: int = 0
+    removed_files: int = 0
+    # size of every file in the app folder after the sync, used for the size report
+    sizes: dict[str, int] = field(default_factory=dict)
+    # project files that were left out on purpose, with the reason
+    dropped: dict[str, str] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return (
+            f"Copied {self.copied_files} files ({format_size(self.copied_bytes)}), "
+            f"skipped {self.skipped_files} unchanged files ({format_size(self.skipped_bytes)}), "
+            f"removed {self.removed_files} files."
+        )
+
+
+def format_size(num_bytes: int) -> str:
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            break
+        size /= 1024
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+
+
+def _folder_id(path: str) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_dev, st.st_ino
+
+
+# Returns the id of the folder d in root, or None when walk_project doesn't descend into it
+def _kept_folder_id(
+    root: str,
+    rel_root: str,
+    d: str,
+    root_ancestors: set[tuple[int, int]],
+    ignore_names: set[str],
+    rules: IgnoreRules | None,
+) -> tuple[int, int] | None:
+    if d in ignore_names:
+        return None
+    if rules and rules.is_ignored(rel_root + d, is_dir=True):
+        return None
+    # virtual environments can have any name
+    if os.path.isfile(os.path.join(root, d, "pyvenv.cfg")):
+        return None
+    try:
+        folder_id = _folder_id(os.path.join(root, d))
+    except OSError:
+        return None
+    if folder_id in root_ancestors:
+        return None
+    return folder_id
+
+
+# Walks the project folder like os.walk, without descending into ignored folders
+# Yields the folder path, its path relative to the project folder (ending in a slash), and the kept file names
+# Symlinked folders are followed, except ones that link back to a folder they are in, which would never end
+# With a subfolder ("a/b", relative to the project folder) only that part of the project is walked
+def walk_project(
+    project_folder_path: str,
+    ignore_names: set[str],
+    rules: IgnoreRules | None = None,
+    subfolder: str = "",
+):
+    # the folders every folder is in, including itself, by (st_dev, st_ino)
+    top = project_folder_path
+    top_ancestors = {_folder_id(project_folder_path)}
+    rel_root = ""
+    for d in subfolder.split("/") if subfolder else []:
+        folder_id = _kept_folder_id(top, rel_root, d, top_ancestors, ignore_names, rules)
+        if folder_id is None:
+            return
+        top = os.path.join(top, d)
+        top_ancestors = top_ancestors | {folder_id}
+        rel_root += d + "/"
+
+    ancestors = {top: top_ancestors}
+    for root, dirs, names in os.walk(top, followlinks=True):
+        rel_root = os.path.relpath(root, project_folder_path).replace(os.sep, "/")
+        rel_root = "" if rel_root == "." else rel_root + "/"
+        root_ancestors = ancestors.pop(root)
+
+        kept_dirs = []
+        for d in sorted(dirs):
+            folder_id = _kept_folder_id(root, rel_root, d, root_ancestors, ignore_names, rules)
+            if folder_id is None:
+                continue
+            ancestors[os.path.join(root, d)] = root_ancestors | {folder_id}
+            kept_dirs.append(d)
+        dirs[:] = kept_dirs
+
+        yield root, rel_root, [name for name in names if name not in ignore_names]
+
+
+# Returns a mapping of destination paths (relative to the app folder) to absolute source paths
+# The entry script is mapped to __main__.py, so the rename happens as part of the copy
+def collect_project_files(
+    project_folder_path: str,
+    main_script: str,
+    ignore_names: set[str],
+    rules: IgnoreRules | None = None,
+) -> dict[str, str]:
+    main_rel = os.path.normpath(main_script).replace(os.sep, "/")
+    files = {}
+    for root, rel_root, names in walk_project(project_folder_path, ignore_names, rules):
+        for name in names:
+            rel = rel_root + name
+            if rel != main_rel and rules and rules.is_ignored(rel):
+                continue
+            if rel == main_rel:
+                rel = "__main__.py"
+            elif rel == "__main__.py":
+                # a stray __main__.py would clash with the renamed entry script
+                continue
+            files[rel] = os.path.join(root, name)
+    return files
+
+
+# Returns the synced files, and the precompile settings their bytecode was built with or None
+def load_manifest(manifest_path: str) -> tuple[dict, dict | None]:
+    try:
+        with open(manifest_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}, None
+    if data.get("version") != MANIFEST_VERSION:
+        return {}, None
+    return data.get("files", {}), data.get("bytecode")
+
+
+def save_manifest(manifest_path: str, files: dict, bytecode: dict | None = None):
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(
+            {"version": MANIFEST_VERSION, "files": files, "bytecode": bytecode}, f, indent=1, sort_keys=True
+        )
+    os.replace(tmp_path, manifest_path)
+
+
+# Precompiled files have their bytecode in "outputs" and the hash of the source it was compiled from
+# in "compiled", and "stripped" is set once the source was removed
+def _without_bytecode(entry: dict) -> dict:
+    return {key: value for key, value in entry.items() if key not in ("outputs", "compiled", "stripped")}
+
+
+# Records the bytecode written for the synced sources, so the next sync keeps it instead of removing it
+# output_path maps a source to its bytecode, both relative to dest_dir
+def record_bytecode(manifest_path: str, dest_dir: str, bytecode: dict, output_path: Callable[[str], str]):
+    files, _ = load_manifest(manifest_path)
+    for rel, entry in files.items():
+        entry = files[rel] = _without_bytecode(entry)
+        if not rel.endswith(".py"):
+            continue
+        output = output_path(rel)
+        if os.path.isfile(os.path.join(dest_dir, output)):
+            entry["outputs"] = [output]
+            entry["compiled"] = entry["hash"]
+            if not os.path.exists(os.path.join(dest_dir, rel)):
+                entry["stripped"] = True
+    save_manifest(manifest_path, files, bytecode)
+
+
+# Paths of the synced sources whose bytecode was compiled from their current contents, going by the
+# hashes in the manifest instead of modification times, which a checkout or a copy can move backwards
+def compiled_sources(manifest_path: str, dest_dir: str) -> set[str]:
+    files, _ = load_manifest(manifest_path)
+    return {
+        os.path.normpath(os.path.join(dest_dir, rel))
+        for rel, entry in files.items()
+        if entry.get("outputs") and entry.get("compiled") == entry["hash"]
+        and all(os.path.isfile(os.path.join(dest_dir, output)) for output in entry["outputs"])
+    }
+
+
+def hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+# Copies a file and hashes it in the same pass, so changed files are only read once
+def copy_file(src: str, dst: str) -> str:
+    if os.path.isdir(dst) and not os.path.islink(dst):
+        shutil.rmtree(dst)
+    elif os.path.lexists(dst):
+        os.remove(dst)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+
+    digest = hashlib.sha256()
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        while chunk := fsrc.read(CHUNK_SIZE):
+            digest.update(chunk)
+            fdst.write(chunk)
+    shutil.copystat(src, dst)
+    return digest.hexdigest()
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return -1
+
+
+# Removes anything in dest_dir that isn't part of the current file set, including empty folders
+def remove_stale_files(dest_dir: str, keep: set[str]) -> int:
+    removed = 0
+    for root, dirs, names in os.walk(dest_dir, topdown=False):
+        for name in names:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, dest_dir).replace(os.sep, "/")
+            if rel not in keep:
+                os.remove(path)
+                removed += 1
+        for name in dirs:
+            path = os.path.join(root, name)
+            if os.path.islink(path):
+                os.remove(path)
+            elif not os.listdir(path):
+                os.rmdir(path)
+    return removed
+
+
+# Files in generated are written to dest_dir by a later build stage, so they aren't removed as stale
+# bytecode is the precompile settings of this build, or None without precompiling. Bytecode recorded
+# by record_bytecode is kept for unchanged sources as long as the settings stay the same
+def sync_files(
+    files: dict[str, str],
+    dest_dir: str,
+    manifest_path: str,
+    generated: set[str] = frozenset(),
+    bytecode: dict | None = None,
+) -> SyncStats:
+    old_manifest, old_bytecode = load_manifest(manifest_path)
+    if old_bytecode != bytecode:
+        old_manifest = {rel: _without_bytecode(entry) for rel, entry in old_manifest.items()}
+    new_manifest = {}
+    stats = SyncStats()
+
+    for rel, src in sorted(files.items()):
+        st = os.stat(src)
+        stats.sizes[rel] = st.st_size
+        dst = os.path.join(dest_dir, rel)
+        entry = old_manifest.get(rel)
+        if entry is not None and entry.get("stripped"):
+            # the source was removed after compiling it, its bytecode stands in for it
+            dest_intact = st.st_size == entry["size"] and all(
+                os.path.isfile(os.path.join(dest_dir, output)) for output in entry["outputs"]
+            )
+        else:
+            dest_intact = entry is not None and _file_size(dst) == st.st_size == entry["size"]
+
+        # Fast path, nothing about the source file has changed since the last copy
+        if (
+            dest_intact
+            and entry["source"] == src
+            and entry["mtime"] == st.st_mtime_ns
+        ):
+            new_manifest[rel] = entry
+            stats.skipped_files += 1
+            stats.skipped_bytes += st.st_size
+            continue
+
+        # The file was touched, only copy it if the contents are actually different
+        if dest_intact and hash_file(src) == entry["hash"]:
+            new_manifest[rel] = dict(entry, source=src, mtime=st.st_mtime_ns)
+            stats.skipped_files += 1
+            stats.skipped_bytes += st.st_size
+            continue
+
+        new_manifest[rel] = {
+            "source": src,
+            "size": st.st_size,
+            "mtime": st.st_mtime_ns,
+            "hash": copy_file(src, dst),
+        }
+        stats.copied_files += 1
+        stats.copied_bytes += st.st_size
+
+    # bytecode of the sources that were copied again isn't kept, it's compiled again
+    keep = set(new_manifest) | generated
+    for rel, entry in new_manifest.items():
+        keep.update(entry.get("outputs", ()))
+        if entry.get("stripped"):
+            del stats.sizes[rel]
+            for output in entry["outputs"]:
+                stats.sizes[output] = _file_size(os.path.join(dest_dir, output))
+
+    os.makedirs(dest_dir, exist_ok=True)
+    stats.removed_files = remove_stale_files(dest_dir, keep)
+    save_manifest(manifest_path, new_manifest, bytecode)
+    return stats
+
+
+# Lists the largest files and folders that went into the app, which is what install and launch time pay for
+def size_report(sizes: dict[str, int], top: int = 10) -> str:
+    folder_sizes = defaultdict(int)
+    for rel, size in sizes.items():
+        parts = rel.split("/")[:-1]
+        for depth in range(1, len(parts) + 1):
+            folder_sizes["/".join(parts[:depth]) + "/"] += size
+
+    lines = [f"App folder size: {format_size(sum(sizes.values()))} in {len(sizes)} files."]
+    for title, entries in (("Largest files:", sizes), ("Largest folders:", folder_sizes)):
+        largest = sorted(entries.items(), key=lambda item: item[1], reverse=True)[:top]
+        if largest:
+            lines.append(title)
+            lines.extend(f"  {format_size(size):>10}  {rel}" for rel, size in largest)
+    return "\n".join(lines)
@@ -0,0 +1,153 @@
+"""Tilemap drawing from pre-rendered chunks."""
+
+from array import array
+from collections import OrderedDict
+
+import pygame
+
+from pygame_ios.mapfile import EMPTY_TILE, CompiledMap
+
+
+class ChunkedTilemap:
+    # Bakes the tile layers of a Sprite Fusion map into square chunk surfaces, chunk_tiles tiles wide.
+    # Each frame only the chunks overlapping the view are blitted, so drawing costs the same no
+    # matter how big the map is. Chunks are baked the first time they're visible, and at most
+    # max_chunks baked chunks are kept around.
+    # With a background colour the chunks are opaque, which blits faster than transparent chunks.
+    # map_data is either the parsed map.json or a CompiledMap from load_map().
+    def __init__(
+        self,
+        map_data: dict | CompiledMap,
+        tileset: pygame.Surface,
+        chunk_tiles: int = 16,
+        background=None,
+        skip_layers: tuple[str, ...] = ("entities",),
+        max_chunks: int = 64,
+    ):
+        if isinstance(map_data, CompiledMap):
+            self.tile_size = map_data.tile_size
+            self.width = map_data.width
+            self.height = map_data.height
+        else:
+            self.tile_size = map_data["tileSize"]
+            self.width = map_data["mapWidth"]
+            self.height = map_data["mapHeight"]
+        self.tileset = tileset
+        # one subsurface per tile, so baking can use fblits without source rects
+        self.tiles = [
+            tileset.subsurface((x, y, self.tile_size, self.tile_size))
+            for y in range(0, tileset.height - self.tile_size + 1, self.tile_size)
+            for x in range(0, tileset.width - self.tile_size + 1, self.tile_size)
+        ]
+        self.chunk_tiles = chunk_tiles
+        self.chunk_pixels = chunk_tiles * self.tile_size
+        self.chunks_x = -(-self.width // chunk_tiles)
+        self.chunks_y = -(-self.height // chunk_tiles)
+        self.background = background
+        self.max_chunks = max_chunks
+
+        # Sprite Fusion lists the top layer first, store them in drawing order instead
+        # The grids are copied, so set_tile works on compiled maps too
+        self.layer_names = []
+        self.layers = []
+        if isinstance(map_data, CompiledMap):
+            for layer in reversed(map_data.layers):
+                if layer.name in skip_layers:
+                    continue
+                grid = array("H")
+                grid.frombytes(layer.grid.cast("B"))
+                self.layer_names.append(layer.name)
+                self.layers.append(grid)
+        else:
+            for layer in reversed(map_data["layers"]):
+                if layer["name"] in skip_layers:
+                    continue
+                grid = array("H", [EMPTY_TILE]) * (self.width * self.height)
+                for tile in layer["tiles"]:
+                    if 0 <= tile["x"] < self.width and 0 <= tile["y"] < self.height:
+                        grid[tile["y"] * self.width + tile["x"]] = int(tile["id"])
+                self.layer_names.append(layer["name"])
+                self.layers.append(grid)
+
+        self.chunks = OrderedDict()
+
+    @property
+    def pixel_size(self) -> tuple[int, int]:
+        return self.width * self.tile_size, self.height * self.tile_size
+
+    def get_tile(self, layer_name: str, x: int, y: int) -> int:
+        return self.layers[self.layer_names.index(layer_name)][y * self.width + x]
+
+    # Changes a single tile, only the chunk containing it is baked again
+    def set_tile(self, layer_name: str, x: int, y: int, tile_id: int = EMPTY_TILE):
+        grid = self.layers[self.layer_names.index(layer_name)]
+        if grid[y * self.width + x] == tile_id:
+            return
+        grid[y * self.width + x] = tile_id
+        self.invalidate(x // self.chunk_tiles, y // self.chunk_tiles)
+
+    def invalidate(self, chunk_x: int, chunk_y: int):
+        self.chunks.pop((chunk_x, chunk_y), None)
+
+    def invalidate_all(self):
+        self.chunks.clear()
+
+    def bake_chunk(self, chunk_x: int, chunk_y: int) -> pygame.Surface:
+        tile_size = self.tile_size
+        if self.background is None:
+            surf = pygame.Surface((self.chunk_pixels, self.chunk_pixels), pygame.SRCALPHA)
+        else:
+            surf = pygame.Surface((self.chunk_pixels, self.chunk_pixels))
+            surf.fill(self.background)
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert() if self.background is not None else surf.convert_alpha()
+
+        x0 = chunk_x * self.chunk_tiles
+        y0 = chunk_y * self.chunk_tiles
+        x1 = min(x0 + self.chunk_tiles, self.width)
+        y1 = min(y0 + self.chunk_tiles, self.height)
+        tiles = self.tiles
+
+        for grid in self.layers:
+            blits = []
+            for y in range(y0, y1):
+                row = y * self.width
+                for x in range(x0, x1):
+                    tile_id = grid[row + x]
+                    if tile_id != EMPTY_TILE:
+                        blits.append((tiles[tile_id], ((x - x0) * tile_size, (y - y0) * tile_size)))
+            surf.fblits(blits)
+        return surf
+
+    def get_chunk(self, chunk_x: int, chunk_y: int) -> pygame.Surface:
+        key = (chunk_x, chunk_y)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.bake_chunk(chunk_x, chunk_y)
+            self.chunks[key] = chunk
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    # Draws the map with its top left corner at pos, like the camera offset in the rpg example
+    def draw(self, surf: pygame.Surface, pos):
+        # round pixel positions to avoid drawing subpixels
+        offset_x = round(pos[0])
+        offset_y = round(pos[1])
+        clip = surf.get_clip()
+        size = self.chunk_pixels
+
+        first_x = max((clip.left - offset_x) // size, 0)
+        first_y = max((clip.top - offset_y) // size, 0)
+        last_x = min((clip.right - 1 - offset_x) // size, self.chunks_x - 1)
+        last_y = min((clip.bottom - 1 - offset_y) // size, self.chunks_y - 1)
+
+        surf.fblits(
+            [
+                (self.get_chunk(x, y), (offset_x + x * size, offset_y + y * size))
+                for y in range(first_y, last_y + 1)
+                for x in range(first_x, last_x + 1)
+            ]
+        )
@@ -0,0 +1,204 @@
+"""Live syncing of project changes into the Xcode template."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable
+
+from pygame_ios.ignore import IgnoreRules
+from pygame_ios.sync import SyncStats, walk_project
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.1
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+
+
+class PollingWatcher:
+    # Compares the size and modification time of every project file each interval
+    def __init__(
+        self, project_folder_path: str, ignore_names: set[str], rules: IgnoreRules | None
+    ):
+        self.project_folder_path = project_folder_path
+        self.ignore_names = ignore_names
+        self.rules = rules
+        self.state = self.scan()
+
+    def scan(self) -> dict[str, tuple[int, int]]:
+        state = {}
+        for root, rel_root, names in walk_project(
+            self.project_folder_path, self.ignore_names, self.rules
+        ):
+            for name in names:
+                try:
+                    st = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                state[rel_root + name] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    # Waits up to timeout seconds, returns True if anything changed in that time
+    def wait(self, timeout: float, stop_event: threading.Event) -> bool:
+        stop_event.wait(timeout)
+        state = self.scan()
+        changed = state != self.state
+        self.state = state
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    # Uses Linux inotify through ctypes, so changes are picked up as soon as they happen
+    def __init__(
+        self, project_folder_path: str, ignore_names: set[str], rules: IgnoreRules | None
+    ):
+        self.libc = _load_inotify()
+        if self.libc is None:
+            raise OSError("inotify is not available")
+
+        self.project_folder_path = project_folder_path
+        self.ignore_names = ignore_names
+        self.rules = rules
+        # watch descriptors to the watched folder, relative to the project folder ("" for the project folder)
+        self.watches: dict[int, str] = {}
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.add_watches()
+
+    # Watches the folders in subfolder (the whole project by default)
+    # Adding a watch to a folder that is already watched is a no-op that returns the same descriptor
+    def add_watches(self, subfolder: str = ""):
+        for root, rel_root, _ in walk_project(
+            self.project_folder_path, self.ignore_names, self.rules, subfolder
+        ):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = rel_root.rstrip("/")
+
+    def _drain(self) -> bool:
+        received = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return received
+            if not data:
+                return received
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_length = struct.unpack_from("iIII", data, offset)
+                offset += struct.calcsize("iIII")
+                name = os.fsdecode(data[offset : offset + name_length].rstrip(b"\0"))
+                offset += name_length
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                elif mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and wd in self.watches:
+                    # only the new folder needs walking, the rest of the project is already watched
+                    parent = self.watches[wd]
+                    self.add_watches(f"{parent}/{name}" if parent else name)
+            received = True
+
+    def wait(self, timeout: float, stop_event: threading.Event) -> bool:
+        deadline = time.monotonic() + timeout
+        while not stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # wake up regularly to check stop_event
+            readable, _, _ = select.select([self.fd], [], [], min(remaining, 0.1))
+            if readable and self._drain():
+                return True
+        return False
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+def create_watcher(
+    project_folder_path: str,
+    ignore_names: set[str],
+    rules: IgnoreRules | None = None,
+    use_inotify: bool = True,
+):
+    if use_inotify and _load_inotify() is not None:
+        return InotifyWatcher(project_folder_path, ignore_names, rules)
+    return PollingWatcher(project_folder_path, ignore_names, rules)
+
+
+# Calls sync whenever files in the project change, until stop_event is set
+# Bursts of changes (like an editor saving several files) are merged, sync only runs once
+# debounce seconds have passed without another change
+def watch_project(
+    project_folder_path: str,
+    sync: Callable[[], SyncStats],
+    ignore_names: set[str],
+    rules: IgnoreRules | None = None,
+    interval: float = DEFAULT_INTERVAL,
+    debounce: float = DEFAULT_DEBOUNCE,
+    stop_event: threading.Event | None = None,
+    on_sync: Callable[[SyncStats, float], None] | None = None,
+    use_inotify: bool = True,
+):
+    stop_event = stop_event or threading.Event()
+    watcher = create_watcher(project_folder_path, ignore_names, rules, use_inotify)
+    try:
+        while not stop_event.is_set():
+            if not watcher.wait(interval, stop_event):
+                continue
+            while watcher.wait(debounce, stop_event):
+                pass
+            if stop_event.is_set():
+                break
+
+            start_time = time.perf_counter()
+            stats = sync()
+            if on_sync:
+                on_sync(stats, time.perf_counter() - start_time)
+    finally:
+        watcher.close()
@@ -0,0 +1,89 @@
+import hashlib
+import http.server
+import json
+import threading
+
+import pytest
+
+from pygame_ios.__main__ import BASE_URL_ENV
+
+
+def etag_of(body: bytes) -> str:
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+# Stand-in for the GitHub endpoints, serving the files in `files` by path with ETags, If-None-Match,
+# Range and If-Range like GitHub does. Every request's path and headers end up in `requests`
+class StandInServer(http.server.ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.files = {}
+        self.requests = []
+        # leaves Content-Length out, like a chunked response
+        self.send_length = True
+        # sends the rest of the file from this offset instead of the requested one, like a misbehaving proxy
+        self.range_start = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def add_release(self, tag: str, versions: list[str]):
+        self.files["/releases/latest"] = json.dumps({"tag_name": tag}).encode()
+        self.files["/pygame-ce.json"] = json.dumps({"supportedVersions": versions}).encode()
+
+    def requests_to(self, path: str) -> list[dict]:
+        return [headers for request_path, headers in self.requests if request_path == path]
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        body = self.server.files.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = etag_of(body)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        byte_range = self.headers.get("Range")
+        if byte_range and self.headers.get("If-Range", etag) == etag:
+            start = int(byte_range.removeprefix("bytes=").split("-")[0])
+            if self.server.range_start is not None:
+                start = self.server.range_start
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+            body = body[start:]
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        if self.server.send_length:
+            self.send_header("Content-Length", str(len(body)))
+        else:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = StandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv(BASE_URL_ENV, server.url)
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from pygame_ios.assetpack import ALIGNMENT, AssetPack, read_signature, source_signature, write_pack
+
+
+@pytest.fixture
+def assets(tmp_path):
+    files = {"map.json": b'{"width": 3}', "images/player.png": os.urandom(1000), "empty.txt": b"", "ü.txt": b"x"}
+    for name, data in files.items():
+        path = tmp_path / "project" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    sources = {name: str(tmp_path / "project" / name) for name in files}
+    return files, sources
+
+
+def test_pack_round_trip(assets, tmp_path):
+    files, sources = assets
+    pack_path = str(tmp_path / "assets.pack")
+    assert write_pack(sources, pack_path)
+
+    pack = AssetPack(pack_path)
+    assert pack.names() == sorted(files)
+    for name, data in files.items():
+        assert pack.read(name) == data
+        assert pack.entries[name][0] % ALIGNMENT == 0
+    assert pack.load_json("map.json") == {"width": 3}
+
+    f = pack.open("images/player.png")
+    f.seek(-10, os.SEEK_END)
+    assert f.read() == files["images/player.png"][-10:]
+    with pytest.raises(FileNotFoundError):
+        pack.buffer("missing.png")
+
+
+def test_up_to_date_pack_is_not_rewritten(assets, tmp_path):
+    _, sources = assets
+    pack_path = str(tmp_path / "assets.pack")
+    write_pack(sources, pack_path)
+    assert read_signature(pack_path) == source_signature(sources)
+    assert not write_pack(sources, pack_path)
+
+    # a changed source changes the signature, and the pack is built again
+    with open(sources["map.json"], "wb") as f:
+        f.write(b'{"width": 40}')
+    assert write_pack(sources, pack_path)
+    assert AssetPack(pack_path).read("map.json") == b'{"width": 40}'
+
+
+def test_other_files_have_no_signature(tmp_path):
+    path = tmp_path / "assets.pack"
+    path.write_bytes(b"PK\3\4" + bytes(100))
+    assert read_signature(str(path)) is None
+    with pytest.raises(ValueError):
+        AssetPack(str(path))
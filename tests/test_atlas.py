@@ -0,0 +1,58 @@
+import json
+import random
+
+import pygame
+import pytest
+
+from pygame_ios.atlas import Atlas, pack_atlas, pack_rects, read_atlas
+
+
+def test_packed_rects_fit_the_page_and_keep_their_padding():
+    rng = random.Random(2)
+    sizes = {f"{i}.png": (rng.randint(1, 90), rng.randint(1, 90)) for i in range(60)}
+    pages = pack_rects(sizes, max_size=256, padding=2)
+    assert len(pages) > 1
+    assert sorted(name for page in pages for name in page.positions) == sorted(sizes)
+
+    for page in pages:
+        rects = [pygame.Rect(position, sizes[name]) for name, position in page.positions.items()]
+        for i, rect in enumerate(rects):
+            assert pygame.Rect(0, 0, page.width, page.height).contains(rect)
+            # with its padding to the right and below, no image touches another
+            padded = pygame.Rect(rect.x, rect.y, rect.width + 2, rect.height + 2)
+            assert padded.collidelist(rects[:i] + rects[i + 1 :]) == -1
+
+
+def test_too_big_image_is_rejected():
+    with pytest.raises(ValueError):
+        pack_rects({"huge.png": (300, 10)}, max_size=256)
+
+
+def test_atlas_round_trip(tmp_path):
+    images = {}
+    for name, size, color in [("player.png", (32, 16), "red"), ("ui/heart.png", (8, 8), "green")]:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface.fill(color)
+        images[name] = str(tmp_path / name.replace("/", "_"))
+        pygame.image.save(surface, images[name])
+    # the right half of the player's frames is a colorkeyed background
+    surface = pygame.image.load(images["player.png"])
+    surface.fill("magenta", (8, 0, 8, 16))
+    surface.fill("magenta", (24, 0, 8, 16))
+    pygame.image.save(surface, images["player.png"])
+
+    index_path = tmp_path / "out" / "atlas.json"
+    report = pack_atlas(images, str(index_path), grids={"player.png": (16, 16)}, colorkeys={"player.png": "magenta"})
+    assert report.used_pixels == 32 * 16 + 8 * 8
+
+    index = json.loads(index_path.read_text())
+    assert index["sprites"]["player.png"][3:] == [32, 16, 16, 16]
+    atlas = Atlas(*read_atlas(str(index_path)))
+    assert atlas.names() == ["player.png", "ui/heart.png"]
+    assert atlas.get("ui/heart.png").size == (8, 8)
+    assert atlas.get("ui/heart.png").get_at((4, 4)) == pygame.Color("green")
+
+    frames = atlas.frames("player.png")
+    assert [frame.size for frame in frames] == [(16, 16), (16, 16)]
+    assert frames[1].get_at((0, 0)) == pygame.Color("red")
+    assert frames[1].get_at((12, 0)).a == 0
@@ -0,0 +1,77 @@
+import math
+import struct
+import wave
+
+import pygame
+import pytest
+
+from pygame_ios.audio import open_sound_bank, pack_sounds, reserve_channels
+
+
+def write_tone(path, seconds: float, frequency: int = 44100, channels: int = 2):
+    frames = int(seconds * frequency)
+    samples = [int(8000 * math.sin(i / 10)) for i in range(frames) for _ in range(channels)]
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(frequency)
+        f.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+
+@pytest.fixture
+def mixer(monkeypatch):
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    yield
+    pygame.quit()
+
+
+def test_sound_bank_round_trip(mixer, tmp_path):
+    write_tone(tmp_path / "jump.wav", 0.2)
+    write_tone(tmp_path / "coin.wav", 0.1, frequency=22050, channels=1)
+    write_tone(tmp_path / "theme.wav", 2.0, frequency=22050)
+    sources = {name: str(tmp_path / name) for name in ("jump.wav", "coin.wav", "theme.wav")}
+
+    bank_path = tmp_path / "out" / "sounds.sndbank"
+    packed, tracks = pack_sounds(sources, str(bank_path), max_length=1.0, stream_pcm=True)
+    assert [(sound.name, sound.converted) for sound in packed] == [("coin.wav", True), ("jump.wav", False)]
+    assert [track.name for track in tracks] == ["theme.wav"]
+    # the streamed track was converted to the mixer format, twice the rate and twice the size
+    with wave.open(tracks[0].converted_path) as f:
+        assert (f.getframerate(), f.getnchannels()) == (44100, 2)
+    assert tracks[0].pcm_size == 2 * (tracks[0].source_size - 44)
+
+    # the mixer is open in the bank's format, what pack_sounds decoded comes back unchanged
+    expected = {name: pygame.mixer.Sound(path).get_raw() for name, path in sources.items() if name != "theme.wav"}
+    bank = open_sound_bank(str(bank_path))
+    assert bank.format == pygame.mixer.get_init()
+    assert {name: bank.sound(name).get_raw() for name in bank.names()} == expected
+    assert bank.sound("jump.wav") is bank.sound("jump.wav")
+    with pytest.raises(FileNotFoundError):
+        bank.sound("missing.wav")
+
+
+def test_bank_refuses_another_mixer_format(mixer, tmp_path):
+    write_tone(tmp_path / "jump.wav", 0.1)
+    pack_sounds({"jump.wav": str(tmp_path / "jump.wav")}, str(tmp_path / "sounds.sndbank"))
+    pygame.mixer.quit()
+    pygame.mixer.init(22050, -16, 1, allowedchanges=0)
+    with pytest.raises(ValueError, match="was built for 44100 Hz stereo 16-bit"):
+        open_sound_bank(str(tmp_path / "sounds.sndbank"))
+
+
+def test_released_channels_are_reserved_again(mixer):
+    pygame.mixer.init()
+    footsteps = reserve_channels(2)
+    voices = reserve_channels(3)
+    assert [channel.id for channel in footsteps.channels] == [0, 1]
+    assert [channel.id for channel in voices.channels] == [2, 3, 4]
+
+    footsteps.release()
+    assert [channel.id for channel in reserve_channels(1).channels] == [0]
+    voices.release()
+    assert [channel.id for channel in reserve_channels(4).channels] == [1, 2, 3, 4]
+
+    # the reservations don't outlive the mixer
+    pygame.quit()
+    pygame.mixer.init()
+    assert [channel.id for channel in reserve_channels(1).channels] == [0]
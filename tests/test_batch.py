@@ -0,0 +1,96 @@
+import pytest
+
+from pygame_ios.batch import BatchError, load_batch
+
+OUTPUT_NAME = "pygame-ios-template"
+# a valid job, the invalid batch files add to it
+JOB = "[[job]]\nproject = 'games/rpg'\nscript = 'main.py'\npygame_ce = '2.5.5'\n"
+
+
+@pytest.fixture
+def root(tmp_path):
+    for project in ("rpg", "shooter"):
+        (tmp_path / "games" / project).mkdir(parents=True)
+        (tmp_path / "games" / project / "main.py").write_text("")
+    (tmp_path / "template.zip").write_bytes(b"")
+    return tmp_path
+
+
+def load(root, text: str):
+    (root / "batch.toml").write_text(text)
+    return load_batch(str(root / "batch.toml"), OUTPUT_NAME)
+
+
+def test_jobs_take_their_settings_from_the_defaults(root):
+    jobs, settings = load(
+        root,
+        """
+        jobs = 2
+        report = "report.json"
+
+        [defaults]
+        script = "main.py"
+        pygame_ce = 2.5
+        precompile = true
+        template = "template.zip"
+
+        [[job]]
+        project = "games/rpg"
+
+        [[job]]
+        name = "shooter-release"
+        project = "games/shooter"
+        pygame_ce = "2.5.4"
+        template = ""
+        output = "build/shooter"
+        """,
+    )
+    assert settings == {"jobs": 2, "report": str(root / "report.json")}
+
+    rpg, shooter = jobs
+    assert (rpg.name, rpg.pygame_ce, rpg.precompile) == ("rpg-2.5", "2.5", True)
+    assert rpg.output == str(root / "games" / "rpg" / OUTPUT_NAME)
+    assert rpg.template_key == f"zip:{root / 'template.zip'}"
+    assert (shooter.name, shooter.template, shooter.template_key) == ("shooter-release", None, "release:2.5.4")
+    assert shooter.output == str(root / "build" / "shooter")
+
+
+def test_outputs_inside_a_project_are_not_copied(root):
+    jobs, _ = load(
+        root,
+        """
+        [[job]]
+        project = "games"
+        script = "rpg/main.py"
+        pygame_ce = "2.5.5"
+
+        [[job]]
+        project = "games/rpg"
+        script = "main.py"
+        pygame_ce = "2.5.5"
+        output = "games/builds/rpg"
+        """,
+    )
+    assert jobs[0].ignore_names == {OUTPUT_NAME, "builds"}
+    assert jobs[1].ignore_names == {OUTPUT_NAME}
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("jobs = 2", "doesn't define any"),
+        ("[[job]\n", "is not valid TOML"),
+        ("[defaults]\noutput = 'build'\n[[job]]", "Unknown setting output in \\[defaults\\]"),
+        (JOB + "pygame = '2.5.5'", "Unknown setting pygame in job 1"),
+        ("[[job]]\nproject = 'games/rpg'\nscript = 'main.py'", "job 1 doesn't set pygame_ce"),
+        (JOB + "optimize = true", "optimize in job 1 must be a int"),
+        (JOB.replace("main.py", "game.py"), "Entry script game.py"),
+        (JOB + "template = 'x.zip'", "does not exist"),
+        (JOB + JOB + "name = 'rpg-2'", "would both build into"),
+        (JOB + "name = 'rpg'\n" + JOB + "name = 'rpg'", "more than one job called rpg"),
+        ("jobs = 0\n" + JOB, "jobs must be"),
+    ],
+)
+def test_invalid_batch_files(root, text, message):
+    with pytest.raises(BatchError, match=message):
+        load(root, text)
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from pygame_ios.__main__ import fetch_template
+from pygame_ios.cache import METADATA_TTL_ENV, TemplateCache
+
+TEMPLATE_PATH = "/releases/download/v1/pygame-ios-template-2.5.6.zip"
+TEMPLATE = os.urandom(64 * 1024)
+
+
+@pytest.fixture
+def release(server, monkeypatch):
+    # metadata is always checked again, so every fetch sends conditional requests
+    monkeypatch.setenv(METADATA_TTL_ENV, "0")
+    server.add_release("v1", ["2.5.6"])
+    server.files[TEMPLATE_PATH] = TEMPLATE
+    return server
+
+
+def test_downloads_template_once(release, tmp_path):
+    cache = TemplateCache(str(tmp_path))
+    path = fetch_template(cache, "2.5.6")
+    with open(path, "rb") as f:
+        assert f.read() == TEMPLATE
+
+    # unchanged metadata is answered with a 304, and the template comes from the cache
+    release.requests.clear()
+    assert fetch_template(TemplateCache(str(tmp_path)), "2.5.6") == path
+    assert release.requests_to("/releases/latest")[0]["If-None-Match"]
+    assert release.requests_to("/pygame-ce.json")[0]["If-None-Match"]
+    assert not release.requests_to(TEMPLATE_PATH)
+
+
+def test_new_release_is_downloaded(release, tmp_path):
+    cache = TemplateCache(str(tmp_path))
+    fetch_template(cache, "2.5.6")
+
+    release.add_release("v2", ["2.5.6"])
+    release.files["/releases/download/v2/pygame-ios-template-2.5.6.zip"] = b"new"
+    path = fetch_template(cache, "2.5.6")
+    assert path == cache.template_path("v2", "2.5.6")
+    with open(path, "rb") as f:
+        assert f.read() == b"new"
+
+
+def test_offline_uses_only_the_cache(release, tmp_path):
+    cache = TemplateCache(str(tmp_path))
+    path = fetch_template(cache, "2.5.6")
+
+    release.requests.clear()
+    assert fetch_template(cache, "2.5.6", offline=True) == path
+    assert not release.requests
+    with pytest.raises(SystemExit):
+        fetch_template(cache, "2.5.7", offline=True)
+
+
+def test_unsupported_version(release, tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        fetch_template(TemplateCache(str(tmp_path)), "2.4.0")
+    assert "There is no Xcode template for pygame-ce version v2.4.0" in capsys.readouterr().out
+    assert not release.requests_to(TEMPLATE_PATH)
@@ -0,0 +1,37 @@
+import random
+
+import pygame
+
+from pygame_ios.collision import SpatialGrid, merge_tiles
+
+
+def test_merge_tiles_covers_every_tile_once():
+    tiles = {(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (5, 5), (4, 7), (5, 7)}
+    rects = merge_tiles(tiles)
+    assert rects == [(0, 0, 3, 2), (5, 5, 1, 1), (4, 7, 2, 1)]
+    covered = [(x + i, y + j) for x, y, w, h in rects for i in range(w) for j in range(h)]
+    assert sorted(covered) == sorted(tiles)
+
+
+def test_query_many_matches_query():
+    rng = random.Random(1)
+    grid = SpatialGrid(
+        (rng.uniform(-200, 1000), rng.uniform(-200, 1000), rng.uniform(1, 150), rng.uniform(1, 150))
+        for _ in range(300)
+    )
+    queries = [
+        (rng.uniform(-300, 1100), rng.uniform(-300, 1100), rng.uniform(0, 200), rng.uniform(0, 200))
+        for _ in range(500)
+    ]
+    # rects lying exactly on cell borders, and plain Rects
+    queries += [(64, 64, 64, 64), (0, 0, 0, 0), pygame.Rect(100, 100, 300, 20)]
+
+    assert grid.query_many(queries) == [grid.query(rect) for rect in queries]
+    assert any(grid.query_many(queries))
+
+
+def test_rect_ending_on_a_cell_border_is_only_in_its_own_cells():
+    grid = SpatialGrid([(0, 0, 64, 64)])
+    assert list(grid.cells) == [(0, 0)]
+    assert grid.query((64, 0, 10, 10)) == []
+    assert grid.query_many([(64, 0, 10, 10), (60, 0, 10, 10)]) == [[], [pygame.FRect(0, 0, 64, 64)]]
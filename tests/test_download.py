@@ -0,0 +1,79 @@
+import os
+
+from conftest import etag_of
+
+from pygame_ios.__main__ import download_file
+
+PATH = "/releases/download/v1/pygame-ios-template-2.5.6.zip"
+BODY = os.urandom(300 * 1024)
+
+
+def download(server, tmp_path) -> bytes:
+    dest_path = tmp_path / "template.zip"
+    download_file(server.url + PATH, str(dest_path))
+    assert os.listdir(tmp_path) == ["template.zip"]
+    return dest_path.read_bytes()
+
+
+# what an interrupted download leaves behind
+def write_part(tmp_path, data: bytes, validator: str):
+    (tmp_path / "template.zip.part").write_bytes(data)
+    (tmp_path / "template.zip.part.validator").write_text(validator)
+
+
+def test_full_download(server, tmp_path):
+    server.files[PATH] = BODY
+    assert download(server, tmp_path) == BODY
+    assert "Range" not in server.requests_to(PATH)[0]
+
+
+def test_resumes_partial_download(server, tmp_path, capsys):
+    server.files[PATH] = BODY
+    write_part(tmp_path, BODY[:1000], etag_of(BODY))
+
+    assert download(server, tmp_path) == BODY
+    headers = server.requests_to(PATH)[0]
+    assert headers["Range"] == "bytes=1000-"
+    assert headers["If-Range"] == etag_of(BODY)
+    assert "Resuming download from" in capsys.readouterr().out
+
+
+def test_restarts_when_the_file_changed(server, tmp_path, capsys):
+    old_body = os.urandom(len(BODY))
+    server.files[PATH] = BODY
+    write_part(tmp_path, old_body[:1000], etag_of(old_body))
+
+    # the server sends the whole new file instead of the rest of it, which replaces the partial file
+    assert download(server, tmp_path) == BODY
+    assert "downloading it again" in capsys.readouterr().out
+
+
+def test_partial_file_without_validator_is_downloaded_again(server, tmp_path):
+    server.files[PATH] = BODY
+    (tmp_path / "template.zip.part").write_bytes(b"x" * 1000)
+
+    assert download(server, tmp_path) == BODY
+    assert "Range" not in server.requests_to(PATH)[0]
+
+
+def test_resumed_download_without_content_length(server, tmp_path, capsys):
+    server.files[PATH] = BODY
+    server.send_length = False
+    write_part(tmp_path, BODY[: 100 * 1024], etag_of(BODY))
+
+    assert download(server, tmp_path) == BODY
+    # the size is unknown, so only what was downloaded is shown
+    progress = capsys.readouterr().out.rsplit("\r", 1)[-1]
+    assert progress.startswith("0.2 MB, ")
+    assert "-" not in progress and "%" not in progress
+
+
+def test_restarts_when_the_range_starts_elsewhere(server, tmp_path, capsys):
+    server.files[PATH] = BODY
+    server.range_start = 0
+    write_part(tmp_path, BODY[:1000], etag_of(BODY))
+
+    # appending the whole file to the partial one would leave 1000 bytes too many
+    assert download(server, tmp_path) == BODY
+    assert [headers.get("Range") for headers in server.requests_to(PATH)] == ["bytes=1000-", None]
+    assert "different part of the file" in capsys.readouterr().out
@@ -0,0 +1,66 @@
+import zipfile
+
+from pygame_ios.__main__ import extract_template_zip
+from pygame_ios.extract import STAMP_NAME, extract_template, is_extracted_from
+
+
+def make_zip(path, files: dict[str, str]) -> str:
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, text in files.items():
+            zf.writestr(name, text)
+    return str(path)
+
+
+def test_extract_records_the_zip(tmp_path):
+    zip_path = make_zip(tmp_path / "a.zip", {"pygame-ios/project.pbxproj": "old"})
+    template = tmp_path / "template"
+    stats = extract_template(zip_path, str(template))
+    assert stats.extracted_files == 1
+    assert (template / "pygame-ios" / "project.pbxproj").read_text() == "old"
+    assert is_extracted_from(zip_path, str(template))
+
+
+def test_update_keeps_changed_files_and_removes_old_ones(tmp_path):
+    template = tmp_path / "template"
+    old_zip = make_zip(
+        tmp_path / "old.zip",
+        {"project.pbxproj": "old", "Info.plist": "old", "Frameworks/old.so": "x", "Frameworks/edited.so": "x"},
+    )
+    extract_template(old_zip, str(template))
+    (template / "project.pbxproj").write_text("signed")
+    (template / "Frameworks" / "edited.so").write_text("mine")
+
+    new_zip = make_zip(tmp_path / "new.zip", {"project.pbxproj": "new", "Info.plist": "new", "Frameworks/new.so": "y"})
+    stats = extract_template(new_zip, str(template))
+
+    assert (template / "project.pbxproj").read_text() == "signed"
+    assert (template / "Info.plist").read_text() == "new"
+    assert (template / "Frameworks" / "new.so").read_text() == "y"
+    assert not (template / "Frameworks" / "old.so").exists()
+    assert (template / "Frameworks" / "edited.so").read_text() == "mine"
+    assert sorted(stats.kept_files) == ["Frameworks/edited.so", "project.pbxproj"]
+    assert stats.removed_files == 1
+
+
+def test_overwrite_replaces_changed_files(tmp_path):
+    template = tmp_path / "template"
+    extract_template(make_zip(tmp_path / "old.zip", {"project.pbxproj": "old"}), str(template))
+    (template / "project.pbxproj").write_text("signed")
+
+    extract_template(make_zip(tmp_path / "new.zip", {"project.pbxproj": "new"}), str(template), overwrite=True)
+    assert (template / "project.pbxproj").read_text() == "new"
+
+
+def test_template_without_stamp_is_left_alone(tmp_path, capsys):
+    template = tmp_path / "template"
+    template.mkdir()
+    (template / "project.pbxproj").write_text("signed")
+    zip_path = make_zip(tmp_path / "a.zip", {"project.pbxproj": "new"})
+
+    assert not extract_template_zip(zip_path, str(template))
+    assert (template / "project.pbxproj").read_text() == "signed"
+    assert not (template / STAMP_NAME).exists()
+    assert "--update-template" in capsys.readouterr().out
+
+    assert extract_template_zip(zip_path, str(template), update=True)
+    assert (template / "project.pbxproj").read_text() == "new"
@@ -0,0 +1,58 @@
+import pytest
+
+from pygame_ios.loop import FixedStepLoop
+
+STEP = 0.25
+
+
+# Runs a loop against a fake clock, so frame times are exact
+class Harness:
+    def __init__(self, **kwargs):
+        self.now = 0.0
+        self.updates = []
+        self.renders = []
+        self.loop = FixedStepLoop(self.updates.append, self.renders.append, step=STEP, **kwargs)
+        self.loop.timer = lambda: self.now
+
+    def frame(self, elapsed: float) -> int:
+        self.now += elapsed
+        before = len(self.updates)
+        self.loop.tick()
+        return len(self.updates) - before
+
+
+def test_updates_catch_up_with_real_time():
+    harness = Harness()
+    assert harness.frame(0) == 1
+    assert [harness.frame(elapsed) for elapsed in (0.25, 0.125, 0.125, 0.75)] == [1, 0, 1, 3]
+    assert set(harness.updates) == {STEP}
+    assert harness.frame(0.125) == 0
+    assert harness.renders[-1] == pytest.approx(0.5)
+
+
+def test_steps_are_capped_and_the_rest_is_dropped():
+    harness = Harness(max_steps=3)
+    harness.frame(0)
+    assert harness.frame(2.125) == 3
+    assert harness.loop.overloaded
+    assert harness.loop.dropped_time == pytest.approx(1.25)
+    # the fraction of a step is kept, so the next frame doesn't jump
+    assert harness.loop.alpha == pytest.approx(0.5)
+
+    assert harness.frame(0.125) == 1
+    assert not harness.loop.overloaded
+
+
+def test_rendering_is_skipped_while_overloaded_but_not_for_long():
+    harness = Harness(max_steps=1, max_skipped_renders=2)
+    harness.frame(0)
+    assert len(harness.renders) == 1
+    for _ in range(6):
+        harness.frame(1.0)
+    # two skipped frames, then one rendered anyway
+    assert len(harness.renders) == 3
+
+
+def test_update_can_stop_the_loop():
+    loop = FixedStepLoop(lambda dt: True, lambda alpha: pytest.fail("rendered after stopping"))
+    assert loop.tick()
@@ -0,0 +1,80 @@
+import base64
+import json
+
+import pytest
+
+from pygame_ios.mapfile import EMPTY_TILE, CompiledMap, compile_map, load_map
+
+# a 4 by 3 map export, like Sprite Fusion's map.json
+EXPORT = {
+    "tileSize": 16,
+    "mapWidth": 4,
+    "mapHeight": 3,
+    "layers": [
+        {
+            "name": "Objects",
+            "collider": False,
+            "tiles": [{"id": "7", "x": 1, "y": 2, "attributes": {"spawn": "player"}}],
+        },
+        {
+            "name": "Walls",
+            "collider": True,
+            "tiles": [{"id": "1", "x": 0, "y": 0}, {"id": "2", "x": 3, "y": 1}, {"id": "3", "x": 9, "y": 9}],
+        },
+    ],
+}
+
+
+def test_map_export_round_trip(tmp_path):
+    (tmp_path / "map.json").write_text(json.dumps(EXPORT))
+    (tmp_path / "spritesheet.png").write_bytes(b"\x89PNG sheet")
+    compile_map(str(tmp_path / "map.json"), str(tmp_path / "map.pgmap"))
+
+    tilemap = load_map(str(tmp_path / "map.pgmap"))
+    assert (tilemap.tile_size, tilemap.width, tilemap.height) == (16, 4, 3)
+    assert [(layer.name, layer.collider) for layer in tilemap.layers] == [("Objects", False), ("Walls", True)]
+    # the tile outside the map is dropped
+    assert list(tilemap.layer("Walls").grid) == [1, *[EMPTY_TILE] * 6, 2, *[EMPTY_TILE] * 4]
+    assert tilemap.tile("Objects", 1, 2) == 7
+    assert tilemap.collider_tiles() == [(0, 0), (3, 1)]
+    assert tilemap.is_collider(3, 1) and not tilemap.is_collider(1, 2)
+    assert tilemap.find_entity("spawn", "player") == (1, 2, 7, "Objects", {"spawn": "player"})
+    assert tilemap.spritesheet().tobytes() == b"\x89PNG sheet"
+
+
+def test_project_file_is_trimmed_to_the_painted_area(tmp_path):
+    sheet = base64.b64encode(b"\x89PNG project").decode()
+    project = {
+        "tileSize": 8,
+        "spriteSheets": {"sheet": {"base64": "data:image/png;base64," + sheet}},
+        "layers": [
+            {
+                "name": "Ground",
+                "collider": False,
+                "tiles": [
+                    {"id": "4", "x": 16, "y": 8, "spriteSheetId": "sheet"},
+                    {
+                        "id": "5",
+                        "x": 32,
+                        "y": 16,
+                        "spriteSheetId": "sheet",
+                        "attributes": [{"key": "door", "value": 1}],
+                    },
+                ],
+            }
+        ],
+    }
+    (tmp_path / "project.json").write_text(json.dumps(project))
+    compile_map(str(tmp_path / "project.json"), str(tmp_path / "map.pgmap"))
+
+    tilemap = load_map(str(tmp_path / "map.pgmap"))
+    assert (tilemap.width, tilemap.height) == (3, 2)
+    assert tilemap.tile("Ground", 0, 0) == 4
+    assert tilemap.tile("Ground", 2, 1) == 5
+    assert tilemap.find_entity("door", 1).layer == "Ground"
+    assert tilemap.spritesheet().tobytes() == b"\x89PNG project"
+
+
+def test_other_files_are_rejected():
+    with pytest.raises(ValueError):
+        CompiledMap(bytes(1024))
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from pygame_ios.__main__ import FOLDER_NAME, precompile_project, sync_project
+from pygame_ios.precompile import bytecode_path, find_python, precompile_tree
+
+pytestmark = pytest.mark.skipif(find_python() is None, reason="needs the template's Python version")
+
+
+def build(project):
+    settings = {"optimize": 0, "strip_sources": False}
+    stats = sync_project(str(project), "game.py", bytecode=settings)
+    precompile_project(str(project), 0, False, packages=False)
+    return stats
+
+
+def test_source_with_an_older_timestamp_is_compiled_again(tmp_path):
+    (tmp_path / "game.py").write_text("VALUE = 1\n")
+    (tmp_path / "other.py").write_text("OTHER = 1\n")
+    build(tmp_path)
+    app_dir = tmp_path / FOLDER_NAME / "pygame-ios" / "app" / "pygame-ios"
+    pyc = bytecode_path(str(app_dir / "__main__.py"))
+    other_pyc = bytecode_path(str(app_dir / "other.py"))
+    other_mtime = os.stat(other_pyc).st_mtime_ns
+    old_pyc = open(pyc, "rb").read()
+
+    # like a checkout of an older commit, the new contents have a timestamp older than the bytecode
+    (tmp_path / "game.py").write_text("VALUE = 2\n")
+    os.utime(tmp_path / "game.py", ns=(1_000_000_000, 1_000_000_000))
+    assert build(tmp_path).copied_files == 1
+
+    assert open(pyc, "rb").read() != old_pyc
+    assert os.stat(other_pyc).st_mtime_ns == other_mtime
+
+
+def test_compiled_sources_decide_what_is_up_to_date(tmp_path):
+    source = tmp_path / "module.py"
+    source.write_text("VALUE = 1\n")
+    python = find_python()
+    assert precompile_tree(str(tmp_path), python).modules == 1
+
+    source.write_text("VALUE = 2\n")
+    os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+    # going by timestamps the bytecode looks newer than the source
+    assert precompile_tree(str(tmp_path), python).up_to_date == 1
+    assert precompile_tree(str(tmp_path), python, compiled=set()).modules == 1
+    assert precompile_tree(str(tmp_path), python, compiled={str(source)}).up_to_date == 1
@@ -0,0 +1,49 @@
+import pytest
+
+from pygame_ios.loop import FixedStepLoop
+from pygame_ios.profiler import Profiler
+
+
+def test_ring_buffer_keeps_the_last_frames():
+    profiler = Profiler(frames=3, enabled=True)
+    for _ in range(5):
+        profiler.start_frame()
+        profiler.mark("update")
+        profiler.mark("draw")
+        profiler.end_frame()
+    frames = profiler.frames()
+    assert len(frames) == 3
+    assert all(set(phases) == {"update", "draw"} for _, _, phases in frames)
+    assert [start for start, _, _ in frames] == sorted(start for start, _, _ in frames)
+
+
+def test_marks_outside_a_frame_are_ignored():
+    profiler = Profiler(enabled=True)
+    profiler.mark("loading")
+    assert profiler.frames() == []
+    assert profiler.phases == []
+
+
+def test_frames_that_stop_the_loop_or_raise_are_recorded():
+    profiler = Profiler(enabled=True)
+
+    def update(dt):
+        raise RuntimeError("broken update")
+
+    loop = FixedStepLoop(update, lambda alpha: None, events=lambda: False, profiler=profiler)
+    with pytest.raises(RuntimeError):
+        loop.tick()
+    assert not profiler.in_frame
+
+    loop.events = lambda: True
+    assert loop.tick()
+    assert len(profiler.frames()) == 2
+    assert not profiler.in_frame
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    profiler.start_frame()
+    profiler.mark("draw")
+    profiler.end_frame()
+    assert profiler.frames() == []
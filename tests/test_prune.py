@@ -0,0 +1,40 @@
+from pygame_ios.prune import REASON_NOT_REFERENCED, REASON_WILDCARD, prune_files
+
+
+def make_project(tmp_path, files: dict[str, str]) -> dict[str, str]:
+    paths = {}
+    for rel, text in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        paths[rel] = str(path)
+    return paths
+
+
+def test_dynamic_path_does_not_keep_the_whole_folder(tmp_path):
+    files = make_project(
+        tmp_path,
+        {
+            "__main__.py": 'SPRITES = ["player.png"]\nfor name in SPRITES:\n    load(f"assets/{name}")\n',
+            "assets/player.png": "",
+            "assets/unused.png": "",
+        },
+    )
+    kept, dropped = prune_files(files)
+    assert "assets/player.png" in kept
+    assert dropped == {"assets/unused.png": REASON_WILDCARD.format("assets/*")}
+
+
+def test_partial_file_name_keeps_matching_files(tmp_path):
+    files = make_project(
+        tmp_path,
+        {
+            "__main__.py": 'for i in range(3):\n    load(f"footstep{i}.wav")\n',
+            "footstep1.wav": "",
+            "footstep2.wav": "",
+            "music.ogg": "",
+        },
+    )
+    kept, dropped = prune_files(files)
+    assert {"footstep1.wav", "footstep2.wav"} <= kept.keys()
+    assert dropped == {"music.ogg": REASON_NOT_REFERENCED}
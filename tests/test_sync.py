@@ -0,0 +1,38 @@
+import os
+
+from pygame_ios.ignore import IgnoreRules
+from pygame_ios.sync import collect_project_files, walk_project
+
+
+def test_symlink_to_parent_folder_is_not_followed(tmp_path):
+    (tmp_path / "game.py").write_text("")
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "map.json").write_text("{}")
+    os.symlink("..", tmp_path / "assets" / "up")
+    os.symlink(tmp_path, tmp_path / "self")
+
+    assert sorted(collect_project_files(str(tmp_path), "game.py", set())) == ["__main__.py", "assets/map.json"]
+
+
+def test_symlinked_folders_are_followed(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "game.py").write_text("")
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "font.ttf").write_text("")
+    os.symlink(tmp_path / "shared", project / "fonts")
+    os.symlink(tmp_path / "shared", project / "more_fonts")
+
+    files = collect_project_files(str(project), "game.py", set())
+    assert sorted(files) == ["__main__.py", "fonts/font.ttf", "more_fonts/font.ttf"]
+
+
+def test_walking_a_subfolder_keeps_paths_relative_to_the_project(tmp_path):
+    (tmp_path / "levels" / "one" / "cache").mkdir(parents=True)
+    (tmp_path / "levels" / "one" / "map.json").write_text("{}")
+    (tmp_path / "other").mkdir()
+    rules = IgnoreRules(["cache/"])
+
+    walked = [(rel_root, names) for _, rel_root, names in walk_project(str(tmp_path), set(), rules, "levels")]
+    assert walked == [("levels/", []), ("levels/one/", ["map.json"])]
+    assert list(walk_project(str(tmp_path), set(), rules, "levels/one/cache")) == []
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from pygame_ios.__main__ import FOLDER_NAME, sync_project
+from pygame_ios.watch import InotifyWatcher, _load_inotify, watch_project
+
+
+# Runs watch mode on a project in a thread, like `pygame_ios project game.py 2.5.6 --watch`
+@pytest.fixture(params=[True, False], ids=["inotify", "polling"])
+def watched(request, tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "game.py").write_text("print('hello')\n")
+    (project / "assets").mkdir()
+    (project / "assets" / "map.json").write_text("{}")
+    sync_project(str(project), "game.py")
+
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=watch_project,
+        args=(str(project), lambda: sync_project(str(project), "game.py"), {FOLDER_NAME}),
+        kwargs={"interval": 0.05, "debounce": 0.05, "stop_event": stop_event, "use_inotify": request.param},
+    )
+    thread.start()
+    # give the watcher time to take its first look at the project
+    time.sleep(0.2)
+    yield project
+    stop_event.set()
+    thread.join()
+
+
+def synced_tree(project) -> dict[str, str]:
+    app_dir = project / FOLDER_NAME / "pygame-ios" / "app" / "pygame-ios"
+    return {path.relative_to(app_dir).as_posix(): path.read_text() for path in app_dir.rglob("*") if path.is_file()}
+
+
+def wait_for_tree(project, expected: dict[str, str], timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while synced_tree(project) != expected and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert synced_tree(project) == expected
+
+
+def test_initial_sync_renames_the_entry_script(watched):
+    assert synced_tree(watched) == {"__main__.py": "print('hello')\n", "assets/map.json": "{}"}
+
+
+def test_syncs_created_modified_and_deleted_files(watched):
+    (watched / "game.py").write_text("print('changed')\n")
+    wait_for_tree(watched, {"__main__.py": "print('changed')\n", "assets/map.json": "{}"})
+
+    (watched / "levels").mkdir()
+    (watched / "levels" / "one.json").write_text("[1]")
+    wait_for_tree(
+        watched, {"__main__.py": "print('changed')\n", "assets/map.json": "{}", "levels/one.json": "[1]"}
+    )
+
+    (watched / "assets" / "map.json").unlink()
+    wait_for_tree(watched, {"__main__.py": "print('changed')\n", "levels/one.json": "[1]"})
+
+
+@pytest.mark.skipif(_load_inotify() is None, reason="needs inotify")
+def test_inotify_only_walks_new_folders(tmp_path, monkeypatch):
+    (tmp_path / "assets").mkdir()
+    watcher = InotifyWatcher(str(tmp_path), set(), None)
+    walked = []
+    add_watches = watcher.add_watches
+    monkeypatch.setattr(watcher, "add_watches", lambda subfolder="": walked.append(subfolder) or add_watches(subfolder))
+    try:
+        (tmp_path / "assets" / "levels").mkdir()
+        assert watcher.wait(1.0, threading.Event())
+        assert walked == ["assets/levels"]
+
+        # the new folder is watched too
+        (tmp_path / "assets" / "levels" / "one.json").write_text("[1]")
+        assert watcher.wait(1.0, threading.Event())
+        assert sorted(watcher.watches.values()) == ["", "assets", "assets/levels"]
+    finally:
+        watcher.close()